@@ -0,0 +1,223 @@
+"""
+Микробенчмарк приема OSC-пакетов.
+Сравнивает прием через ThreadingOSCUDPServer из python-osc с пакетным приемом
+в предвыделенные буферы (osc.batch_receiver) по пропускной способности без
+потерь и объему памяти, выделяемой на обработку одного пакета.
+
+Пакеты отправляются с заданной частотой, которая ступенчато растет; для каждой
+ступени показываются доставленные и потерянные пакеты. Пропускная способность
+пути - наибольшая частота, на которой не потерян ни один пакет: при отправке
+без пауз пакеты теряются в буфере сокета ядра, и замер показывал бы его
+переполнение, а не скорость приема.
+
+Запуск из корня проекта:
+    python -m benchmarks.osc_receive_benchmark [--rates 5000,10000,20000,40000,80000] [--step-s 0.5]
+"""
+
+import argparse
+import os
+import socket
+import sys
+import threading
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pythonosc import dispatcher as osc_dispatcher, osc_server
+from pythonosc.osc_message_builder import OscMessageBuilder
+
+from osc.batch_receiver import BatchUDPReceiver
+from osc.ingest import IngestQueue
+from osc.listeners import Listener, ListenerSpec
+from osc.timed_dispatcher import TimedDispatcher
+
+BENCH_ADDRESS = "/bench/RecordStartShogunLive"
+HOST = "127.0.0.1"
+
+class Counter:
+    """Счетчик вызовов обработчика"""
+
+    def __init__(self):
+        self.count = 0
+
+    def handler(self, address: str, *args: Any, context: Any = None) -> None:
+        self.count += 1
+
+def build_packet() -> bytes:
+    """Типичное сообщение контроллера: адрес, число и имя дубля"""
+    builder = OscMessageBuilder(BENCH_ADDRESS)
+    builder.add_arg(1)
+    builder.add_arg("Take_001")
+    return builder.build().dgram
+
+def start_threading_server(counter: Counter) -> Tuple[Tuple[str, int], Callable[[], None]]:
+    """Запускает ThreadingOSCUDPServer с обработчиком-счетчиком"""
+    disp = osc_dispatcher.Dispatcher()
+    disp.map(BENCH_ADDRESS, counter.handler)
+    server = osc_server.ThreadingOSCUDPServer((HOST, 0), disp)
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+
+    def stop() -> None:
+        server.shutdown()
+        server.server_close()
+    return server.server_address, stop
+
+def start_batch_receiver(counter: Counter) -> Tuple[Tuple[str, int], Callable[[], None]]:
+    """Запускает пакетный приемник с очередью приема и диспетчером приложения"""
+    disp = TimedDispatcher()
+    disp.replace_timed_routes({BENCH_ADDRESS: counter.handler})
+    # Без ограничения частоты: бенчмарк шлет все пакеты с одного адреса
+    ingest = IngestQueue(disp.dispatch_packet, max_size=10000, source_rate=0)
+    ingest.start()
+    listener = Listener(ListenerSpec(HOST, 0))
+    receiver = BatchUDPReceiver([listener], ingest)
+    thread = threading.Thread(target=receiver.serve_forever, daemon=True)
+    thread.start()
+
+    def stop() -> None:
+        receiver.stop()
+        thread.join()
+        receiver.close()
+        listener.close()
+        ingest.stop()
+    return listener.socket.getsockname(), stop
+
+def wait_for(counter: Counter, target: int, idle_timeout: float = 1.0) -> float:
+    """Ждет обработки target пакетов или прекращения роста счетчика; возвращает время окончания"""
+    last_count, last_change = counter.count, time.perf_counter()
+    while counter.count < target:
+        time.sleep(0.001)
+        if counter.count != last_count:
+            last_count, last_change = counter.count, time.perf_counter()
+        elif time.perf_counter() - last_change > idle_timeout:
+            return last_change
+    return time.perf_counter()
+
+def measure_throughput(start: Callable, rate: float, duration: float) -> Dict[str, float]:
+    """
+    Отправляет пакеты с заданной частотой и считает доставленные и потерянные
+
+    Args:
+        start: Запуск пути приема
+        rate: Частота отправки, пакетов/с
+        duration: Длительность отправки, с
+
+    Returns:
+        Dict[str, float]: Отправлено, доставлено, потеряно и частота доставки, пакетов/с
+    """
+    counter = Counter()
+    address, stop = start(counter)
+    packet = build_packet()
+    packets = max(int(rate * duration), 1)
+    interval = 1.0 / rate
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        started = time.perf_counter()
+        for index in range(packets):
+            # Отправка по расписанию: при опережении уступаем процессор потокам приема
+            while time.perf_counter() - started < index * interval:
+                time.sleep(0)
+            sender.sendto(packet, address)
+        finished = wait_for(counter, packets)
+    finally:
+        sender.close()
+        stop()
+    elapsed = finished - started
+    return {
+        "sent": packets,
+        "received": counter.count,
+        "lost": packets - counter.count,
+        "packets_per_s": counter.count / elapsed if elapsed > 0 else 0.0,
+    }
+
+def loss_free_throughput(start: Callable, rates: List[float], duration: float) -> Tuple[float, List[Dict[str, float]]]:
+    """
+    Находит наибольшую частоту отправки, на которой не теряется ни один пакет
+
+    Ступени проходятся по возрастанию до первой ступени с потерями.
+
+    Returns:
+        Tuple: Частота доставки на последней ступени без потерь (0 - потери на первой) и результаты ступеней
+    """
+    best = 0.0
+    steps = []
+    for rate in sorted(rates):
+        result = measure_throughput(start, rate, duration)
+        result["rate"] = rate
+        steps.append(result)
+        if result["lost"]:
+            break
+        best = result["packets_per_s"]
+    return best, steps
+
+def measure_allocations(start: Callable, packets: int) -> Dict[str, float]:
+    """
+    Измеряет пиковый объем памяти, выделяемой при обработке одного пакета
+
+    Пакеты отправляются по одному, перед каждым сбрасывается пик tracemalloc.
+    В замер входит вся работа процесса между отправкой и вызовом обработчика.
+    """
+    counter = Counter()
+    address, stop = start(counter)
+    packet = build_packet()
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    total_bytes = 0
+    measured = 0
+    try:
+        # Прогрев кешей маршрутизации и пулов
+        for _ in range(100):
+            sender.sendto(packet, address)
+        wait_for(counter, 100)
+
+        tracemalloc.start()
+        for _ in range(packets):
+            target = counter.count + 1
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            sender.sendto(packet, address)
+            while counter.count < target:
+                pass
+            _, peak = tracemalloc.get_traced_memory()
+            total_bytes += peak - current
+            measured += 1
+        tracemalloc.stop()
+    finally:
+        sender.close()
+        stop()
+    return {"bytes_per_packet": total_bytes / measured if measured else 0.0}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Сравнение путей приема OSC-пакетов")
+    parser.add_argument("--rates", type=str, default="5000,10000,20000,40000,80000",
+                        help="Ступени частоты отправки через запятую, пакетов/с")
+    parser.add_argument("--step-s", type=float, default=0.5, help="Длительность отправки на каждой ступени, с")
+    parser.add_argument("--alloc-packets", type=int, default=500, help="Пакетов для замера выделения памяти")
+    args = parser.parse_args()
+
+    paths = {
+        "ThreadingOSCUDPServer": start_threading_server,
+        "Пакетный прием": start_batch_receiver,
+    }
+    rates = [float(rate) for rate in args.rates.split(",") if rate.strip()]
+    summary = []
+    for name, start in paths.items():
+        print(name)
+        print(f"  {'отправка, пак/с':>16}{'отправлено':>12}{'доставлено':>12}{'потеряно':>10}{'доставка, пак/с':>17}")
+        best, steps = loss_free_throughput(start, rates, args.step_s)
+        for step in steps:
+            print(f"  {step['rate']:>16.0f}{step['sent']:>12}{step['received']:>12}{step['lost']:>10}"
+                  f"{step['packets_per_s']:>17.0f}")
+        allocations = measure_allocations(start, args.alloc_packets)
+        summary.append((name, best, steps[-1], allocations["bytes_per_packet"]))
+
+    print(f"\n{'Путь приема':<24}{'без потерь, пак/с':>19}{'байт/пакет':>12}")
+    for name, best, last, bytes_per_packet in summary:
+        # Если потерь не было и на последней ступени, предел пути выше проверенных частот
+        limit = f"{best:.0f}" + ("" if last["lost"] else "+")
+        print(f"{name:<24}{limit:>19}{bytes_per_packet:>12.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Бенчмарк всей цепочки от OSC-команды до записи на имитации Shogun Live.
+Приложение без интерфейса (OSC-сервер и рабочий поток с SimulatedShogunBackend)
+принимает по UDP команды запуска и остановки записи, а бенчмарк измеряет время
+от отправки команды до подтверждения /ShogunLiveCommandAck и долю успешных
+команд при заданной задержке, сбоях и перезапусках имитации. Работает на
+машинах без Shogun Live и без библиотек Shogun Live.
+
+Запуск из корня проекта:
+    python -m benchmarks.pipeline_benchmark [--commands 100] [--latency-ms 5]
+                                            [--failure-rate 0.05] [--restart-interval 10]
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pythonosc.osc_message_builder import OscMessageBuilder
+
+import config
+from osc.osc_server import OSCServer
+from osc.packet_parser import parse_packet
+from shogun.backends import SimulatedShogunBackend
+from shogun.shogun_client import ShogunWorker
+
+def build_command(address: str, command_id: int) -> bytes:
+    """Кодирует команду записи с идентификатором"""
+    builder = OscMessageBuilder(address)
+    builder.add_arg(command_id)
+    return builder.build().dgram
+
+def measure(args: argparse.Namespace) -> Dict[str, float]:
+    """
+    Отправляет команды записи и ждет подтверждения каждой
+
+    Args:
+        args: Параметры командной строки
+
+    Returns:
+        Dict[str, float]: Задержка подтверждений, мс, и доля успешных команд
+    """
+    backend = SimulatedShogunBackend(latency_ms=args.latency_ms, failure_rate=args.failure_rate,
+                                     restart_interval=args.restart_interval)
+    worker = ShogunWorker(backend)
+    worker_thread = threading.Thread(target=worker.run, daemon=True)
+    worker_thread.start()
+    server = OSCServer("127.0.0.1", args.port, worker, destinations=[])
+    server_thread = threading.Thread(target=server.run, daemon=True)
+    server_thread.start()
+    time.sleep(1.0)
+
+    client = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    client.settimeout(5.0)
+    latencies: List[float] = []
+    succeeded = 0
+    for command_id in range(1, args.commands + 1):
+        address = config.OSC_START_RECORDING if command_id % 2 else config.OSC_STOP_RECORDING
+        started = time.perf_counter()
+        client.sendto(build_command(address, command_id), ("127.0.0.1", args.port))
+        try:
+            while True:
+                data, _ = client.recvfrom(4096)
+                reply_address, reply_args, _ = parse_packet(data)[0]
+                if reply_address == config.OSC_COMMAND_ACK_ADDRESS and reply_args[0] == command_id:
+                    break
+        except socket.timeout:
+            continue
+        latencies.append((time.perf_counter() - started) * 1000)
+        succeeded += 1 if reply_args[2] else 0
+        time.sleep(args.interval)
+
+    client.close()
+    server.stop()
+    worker.stop()
+    worker_thread.join(5)
+    return {
+        "median_ms": statistics.median(latencies) if latencies else 0.0,
+        "p95_ms": statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else 0.0,
+        "max_ms": max(latencies) if latencies else 0.0,
+        "acked": len(latencies),
+        "succeeded": succeeded,
+        "restarts": backend.restarts,
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Цепочка OSC-команда -> запись на имитации Shogun Live")
+    parser.add_argument("--commands", type=int, default=100, help="Команд запуска и остановки записи")
+    parser.add_argument("--interval", type=float, default=0.05, help="Пауза между командами, с")
+    parser.add_argument("--port", type=int, default=15555, help="UDP-порт OSC-сервера")
+    parser.add_argument("--latency-ms", type=float, default=config.SHOGUN_SIM_LATENCY_MS,
+                        help="Задержка ответа имитации, мс")
+    parser.add_argument("--failure-rate", type=float, default=config.SHOGUN_SIM_FAILURE_RATE,
+                        help="Доля запросов к имитации, завершающихся ошибкой")
+    parser.add_argument("--restart-interval", type=float, default=config.SHOGUN_SIM_RESTART_INTERVAL,
+                        help="Период перезапуска имитации, с (0 - без перезапусков)")
+    args = parser.parse_args()
+
+    result = measure(args)
+    print(f"Команд: {args.commands}, подтверждено: {result['acked']}, успешно: {result['succeeded']}, "
+          f"перезапусков имитации: {result['restarts']}")
+    print(f"Подтверждение: медиана {result['median_ms']:.1f} мс, 95% {result['p95_ms']:.1f} мс, "
+          f"максимум {result['max_ms']:.1f} мс")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Микробенчмарк проверки процесса Shogun Live.
+Сравнивает прежний полный обход таблицы процессов (psutil.process_iter на каждой
+проверке) с ShogunProcessWatcher по времени и процессорному времени одной проверки.
+Роль Shogun Live играет процесс самого бенчмарка.
+
+Запуск из корня проекта:
+    python -m benchmarks.process_watch_benchmark [--checks 200]
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import Callable, Dict, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import psutil
+
+from shogun.process_watcher import PROCESS_ABSENT, ShogunProcessWatcher
+
+MISSING_NAME = "ShogunLiveBenchmarkMissing"  # Имя, которого нет среди процессов
+
+def legacy_scan(names: Tuple[str, ...]) -> Callable[[], bool]:
+    """Проверка в прежнем виде: полный обход процессов с поиском подстроки в имени"""
+    def check() -> bool:
+        for proc in psutil.process_iter(['pid', 'name']):
+            proc_name = proc.info['name']
+            if proc_name and any(name in proc_name for name in names):
+                return True
+        return False
+    return check
+
+def watcher_check(names: Tuple[str, ...]) -> Callable[[], bool]:
+    """Проверка через ShogunProcessWatcher (отсрочка обхода как в приложении)"""
+    watcher = ShogunProcessWatcher(names)
+    return lambda: watcher.check() != PROCESS_ABSENT
+
+def measure(check: Callable[[], bool], checks: int) -> Dict[str, float]:
+    """Выполняет проверки подряд и возвращает среднее время и процессорное время одной проверки"""
+    check()  # Прогрев: первый обход watcher находит процесс
+    wall, cpu = time.perf_counter(), time.process_time()
+    for _ in range(checks):
+        check()
+    return {
+        "wall_us": (time.perf_counter() - wall) / checks * 1e6,
+        "cpu_us": (time.process_time() - cpu) / checks * 1e6,
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Сравнение способов проверки процесса Shogun Live")
+    parser.add_argument("--checks", type=int, default=200, help="Проверок в каждом замере")
+    args = parser.parse_args()
+
+    running = (psutil.Process().name(),)
+    missing = (MISSING_NAME,)
+    cases = {
+        "Обход, процесс запущен": (legacy_scan, running),
+        "Watcher, процесс запущен": (watcher_check, running),
+        "Обход, процесс не запущен": (legacy_scan, missing),
+        "Watcher, процесс не запущен": (watcher_check, missing),
+    }
+    print(f"Процессов в системе: {len(psutil.pids())}")
+    print(f"{'Способ проверки':<30}{'мкс/проверка':>14}{'CPU мкс':>10}")
+    for name, (factory, names) in cases.items():
+        result = measure(factory(names), args.checks)
+        print(f"{name:<30}{result['wall_us']:>14.1f}{result['cpu_us']:>10.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Бенчмарк быстрого и медленного пути команд записи.
+Рабочий поток управляет имитацией Shogun Live (SimulatedShogunBackend) с заданной
+задержкой ответа; бенчмарк поочередно запускает и останавливает запись и
+сравнивает задержку команд и число обращений к Shogun Live за команду, когда
+соединение считается подтвержденным (быстрый путь) и когда проверки выполняются
+перед каждой командой (медленный путь). Снимок состояния монитора командам
+не передается, чтобы сравнивались только сами пути.
+
+Запуск из корня проекта:
+    python -m benchmarks.record_path_benchmark [--commands 40] [--latency-ms 5]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from shogun.backends import SimulatedShogunBackend
+from shogun.record_paths import PATH_FAST, PATH_SLOW
+from shogun.shogun_client import ShogunWorker
+
+def measure(fast_path_max_age_ms: int, commands: int, latency_ms: float) -> Dict[str, float]:
+    """
+    Измеряет задержку команд записи, отправленных через исполнитель команд
+
+    Args:
+        fast_path_max_age_ms: Значение shogun_fast_path_max_age_ms (0 - только медленный путь)
+        commands: Количество команд (запуски и остановки поочередно)
+        latency_ms: Задержка ответа имитации на каждый запрос, мс
+
+    Returns:
+        Dict[str, float]: Медиана и максимум задержки, мс, обращений за команду,
+                          доля быстрого пути и расхождения при проверке
+    """
+    config.SHOGUN_SNAPSHOT_MAX_AGE_MS = 0
+    config.SHOGUN_FAST_PATH_MAX_AGE_MS = fast_path_max_age_ms
+    backend = SimulatedShogunBackend(latency_ms=latency_ms, failure_rate=0, restart_interval=0, push=False)
+    worker = ShogunWorker(backend)
+    thread = threading.Thread(target=worker.run, daemon=True)
+    thread.start()
+    time.sleep(1.0)
+
+    latencies: List[float] = []
+    for index in range(commands):
+        time.sleep(0.2)
+        started = time.perf_counter()
+        if index % 2 == 0:
+            worker.submit_command("start_recording", worker.startcapture).result(10)
+        else:
+            worker.submit_command("stop_recording", worker.stopcapture).result(10)
+        latencies.append((time.perf_counter() - started) * 1000)
+    time.sleep(0.5)  # Проверки состояния после последней команды
+
+    worker.stop()
+    thread.join(5)
+    stats = worker.record_paths.get_stats()
+    executed = stats[PATH_FAST]["count"] + stats[PATH_SLOW]["count"]
+    round_trips = sum(stats[path]["round_trips_per_command"] * stats[path]["count"]
+                      for path in (PATH_FAST, PATH_SLOW))
+    return {
+        "median_ms": statistics.median(latencies),
+        "max_ms": max(latencies),
+        "round_trips": round_trips / executed if executed else 0.0,
+        "fast_share": stats[PATH_FAST]["count"] / executed if executed else 0.0,
+        "verify_mismatches": stats["verify_mismatches"],
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Быстрый и медленный путь команд записи")
+    parser.add_argument("--commands", type=int, default=40, help="Запусков и остановок записи в каждом замере")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="Задержка ответа Shogun Live, мс")
+    args = parser.parse_args()
+
+    print(f"{'Путь':<12}{'медиана, мс':>14}{'максимум, мс':>14}{'обращений':>12}"
+          f"{'быстрых, %':>12}{'расхождений':>14}")
+    for name, max_age_ms in (("Быстрый", 1000), ("Медленный", 0)):
+        result = measure(max_age_ms, args.commands, args.latency_ms)
+        print(f"{name:<12}{result['median_ms']:>14.1f}{result['max_ms']:>14.1f}{result['round_trips']:>12.2f}"
+              f"{result['fast_share'] * 100:>12.0f}{result['verify_mismatches']:>14}")
+
+if __name__ == "__main__":
+    main()
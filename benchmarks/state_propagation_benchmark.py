@@ -0,0 +1,80 @@
+"""
+Бенчмарк распространения изменений состояния Shogun Live.
+Оператор имитации Shogun Live (SimulatedShogunBackend) начинает и останавливает
+запись, а бенчмарк измеряет время до сигнала recording_signal рабочего потока
+при подписке на уведомления и при одном только опросе.
+
+Запуск из корня проекта:
+    python -m benchmarks.state_propagation_benchmark [--transitions 20]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtCore import Qt
+
+from shogun.backends import SimulatedShogunBackend
+from shogun.shogun_client import ShogunWorker
+
+def measure(push: bool, transitions: int) -> Dict[str, float]:
+    """
+    Измеряет задержку от действия оператора до сигнала о состоянии записи
+
+    Args:
+        push: Имитация поддерживает подписку на уведомления
+        transitions: Количество запусков и остановок записи
+
+    Returns:
+        Dict[str, float]: Медиана и максимум задержки, мс, и число запросов к API
+    """
+    backend = SimulatedShogunBackend(latency_ms=0, failure_rate=0, restart_interval=0, push=push)
+    fake = backend.server()
+    worker = ShogunWorker(backend)
+    signalled = threading.Event()
+    # Сигнал обрабатывается прямо в потоке мониторинга: цикла событий Qt здесь нет
+    worker.recording_signal.connect(lambda recording: signalled.set(), Qt.DirectConnection)
+    thread = threading.Thread(target=worker.run, daemon=True)
+    thread.start()
+    time.sleep(1.0)
+
+    latencies: List[float] = []
+    calls_before = fake.calls
+    for index in range(transitions):
+        time.sleep(random.uniform(0.2, 1.5))  # Действие оператора в случайный момент такта
+        signalled.clear()
+        started = time.perf_counter()
+        if index % 2 == 0:
+            fake.operator_start()
+        else:
+            fake.operator_stop()
+        signalled.wait(10)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    worker.stop()
+    thread.join(5)
+    return {
+        "median_ms": statistics.median(latencies),
+        "max_ms": max(latencies),
+        "api_calls": fake.calls - calls_before,
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Задержка распространения изменений состояния Shogun Live")
+    parser.add_argument("--transitions", type=int, default=20, help="Запусков и остановок записи в каждом замере")
+    args = parser.parse_args()
+
+    print(f"{'Источник изменений':<24}{'медиана, мс':>14}{'максимум, мс':>14}{'запросов API':>14}")
+    for name, push in (("Подписка", True), ("Только опрос", False)):
+        result = measure(push, args.transitions)
+        print(f"{name:<24}{result['median_ms']:>14.1f}{result['max_ms']:>14.1f}{result['api_calls']:>14}")
+
+if __name__ == "__main__":
+    main()
@@ -19,7 +19,31 @@ DEFAULT_SETTINGS = {
     "osc_port": 5555,
     "osc_enabled": True,
     "osc_broadcast_port": 9000,  # Порт для отправки OSC-сообщений
-    "osc_broadcast_ip": "255.255.255.255"  # IP для отправки OSC-сообщений (широковещательный)
+    "osc_broadcast_ip": "255.255.255.255",  # IP для отправки OSC-сообщений (широковещательный)
+    "osc_engine": "threading",  # Движок приема OSC-сообщений: "threading", "asyncio" или "batch"
+    "command_coalesce_window_ms": 50,  # Окно схлопывания одинаковых команд, мс (0 - отключено)
+    "command_coalesce_pending": True,  # Схлопывать с еще не выполненной командой и после окна
+    "osc_destinations": [],  # Дополнительные адресаты OSC-уведомлений в виде "ip:port"
+    "osc_send_bundle_max_bytes": 1400,  # Максимальный размер бандла уведомлений, байт (в пределах MTU)
+    "osc_routes": {},  # Дополнительные маршруты: {"OSC-адрес или шаблон": "имя команды"}
+    "osc_listeners": [],  # Дополнительные приемники: "ip:port" или "группа:port@ip_интерфейса"
+    "osc_tcp_port": 0,  # TCP-порт приема OSC с SLIP-кадрированием (0 - отключен)
+    "osc_command_acks": True,  # Отвечать отправителю команды подтверждением с результатом
+    "shogun_scan_backoff_min": 1.0,  # Интервал поиска процесса Shogun Live после его завершения, с
+    "shogun_scan_backoff_max": 5.0,  # Максимальный интервал поиска, пока Shogun Live не запущен, с
+    "shogun_poll_fast_ms": 100,  # Интервал опроса Shogun Live вокруг запуска/остановки записи и смены имени, мс
+    "shogun_poll_normal_ms": 1000,  # Обычный интервал опроса Shogun Live, мс
+    "shogun_poll_idle_ms": 3000,  # Интервал опроса при долгом отсутствии изменений, мс
+    "shogun_poll_fast_window": 3.0,  # Длительность частого опроса после перехода, с
+    "shogun_poll_idle_after": 30.0,  # Время без изменений до перехода к редкому опросу, с
+    "shogun_api_timeout_ms": 2000,  # Срок одного вызова Shogun Live API, мс
+    "shogun_hosts": {},  # Дополнительные машины Shogun Live: {"имя": "адрес"}
+    "shogun_snapshot_max_age_ms": 500,  # Возраст снимка состояния, при котором команды пропускают проверки, мс (0 - всегда проверять)
+    "shogun_fast_path_max_age_ms": 1000,  # Давность последнего успешного вызова API, при которой команды записи выполняются без проверок, мс (0 - всегда проверять)
+    "osc_ingest_queue_size": 1000,  # Максимальная длина очереди приема OSC-пакетов
+    "osc_drop_policy": "priority",  # Политика при переполнении: "drop_oldest", "drop_newest" или "priority"
+    "osc_source_rate": 200.0,  # Допустимая частота пакетов от одного IP, пакетов/с (0 - без ограничения)
+    "osc_source_burst": 400  # Допустимый всплеск пакетов от одного IP
 }
 
 # Менеджер настроек
@@ -42,19 +66,44 @@ def load_settings() -> Dict[str, Any]:
     settings_dict = DEFAULT_SETTINGS.copy()
     
     # Используем QSettings для хранения настроек
-    for key in DEFAULT_SETTINGS.keys():
+    for key, default in DEFAULT_SETTINGS.items():
         if settings.contains(key):
-            value = settings.value(key)
-            # Преобразуем строковые значения 'true'/'false' в булевы
-            if isinstance(value, str) and value.lower() in ['true', 'false']:
-                value = value.lower() == 'true'
-            # Преобразуем числовые значения из строк в числа
-            elif key in ['osc_port', 'osc_broadcast_port'] and isinstance(value, str) and value.isdigit():
-                value = int(value)
-            settings_dict[key] = value
+            settings_dict[key] = _convert_setting(settings.value(key), default)
     
     return settings_dict
 
+def _convert_setting(value: Any, default: Any) -> Any:
+    """
+    Приводит сохраненное значение настройки к типу значения по умолчанию
+    
+    QSettings на некоторых платформах возвращает все значения строками.
+    
+    Args:
+        value: Сохраненное значение
+        default: Значение по умолчанию, определяющее тип
+        
+    Returns:
+        Any: Приведенное значение или значение по умолчанию при ошибке
+    """
+    if not isinstance(value, str):
+        return value
+    try:
+        if isinstance(default, bool):
+            return value.lower() == 'true'
+        if isinstance(default, int):
+            return int(value)
+        if isinstance(default, float):
+            return float(value)
+        if isinstance(default, (list, dict)):
+            return json.loads(value)
+    except ValueError:
+        logging.getLogger('ShogunOSC').warning(f"Некорректное значение настройки: '{value}'")
+        return default
+    # Строковые 'true'/'false' для настроек без значения по умолчанию другого типа
+    if value.lower() in ['true', 'false']:
+        return value.lower() == 'true'
+    return value
+
 def save_settings(settings_dict: Dict[str, Any]) -> None:
     """
     Сохранение настроек приложения
@@ -64,6 +113,9 @@ def save_settings(settings_dict: Dict[str, Any]) -> None:
     """
     try:
         for key, value in settings_dict.items():
+            # Списки и словари храним в JSON: QSettings теряет их структуру на некоторых платформах
+            if isinstance(value, (list, dict)):
+                value = json.dumps(value, ensure_ascii=False)
             settings.setValue(key, value)
         settings.sync()
     except Exception as e:
@@ -72,6 +124,71 @@ def save_settings(settings_dict: Dict[str, Any]) -> None:
 # Загружаем настройки
 app_settings = load_settings()
 
+# Перечитывание настроек на лету
+SETTINGS_RELOAD_INTERVAL_MS = 1000  # Период проверки изменений в app_settings и файле настроек
+
+# Настройки на момент последнего применения и последнее прочитанное содержимое хранилища
+_applied_settings = dict(app_settings)
+_stored_settings = dict(app_settings)
+
+def poll_settings_changes() -> Dict[str, Any]:
+    """
+    Находит настройки, измененные с момента предыдущего вызова
+    
+    Учитываются изменения словаря app_settings внутри приложения и изменения
+    хранилища настроек другими программами или вручную. При расхождении
+    приоритет у изменения внутри приложения. Производные параметры модуля
+    (частоты, политики, маршруты) обновляются сразу.
+    
+    Returns:
+        Dict[str, Any]: Измененные настройки и их новые значения
+    """
+    global _stored_settings
+    changed = {key: value for key, value in app_settings.items()
+               if _applied_settings.get(key) != value}
+    
+    # sync() перечитывает хранилище, если его изменил другой процесс
+    settings.sync()
+    stored = load_settings()
+    for key, value in stored.items():
+        if (_stored_settings.get(key) != value and key not in changed
+                and app_settings.get(key) != value):
+            app_settings[key] = value
+            changed[key] = value
+    _stored_settings = stored
+    
+    if changed:
+        _applied_settings.update(changed)
+        _apply_runtime_settings()
+    return changed
+
+def _apply_runtime_settings() -> None:
+    """Обновляет параметры модуля, которые компоненты читают при каждом использовании"""
+    global DARK_MODE, OSC_ROUTES, COMMAND_COALESCE_WINDOW_MS, COMMAND_COALESCE_PENDING, OSC_COMMAND_ACKS
+    global DEFAULT_OSC_DROP_POLICY, OSC_INGEST_QUEUE_SIZE, OSC_SOURCE_RATE, OSC_SOURCE_BURST
+    global SHOGUN_SNAPSHOT_MAX_AGE_MS, SHOGUN_POLL_FAST_MS, SHOGUN_POLL_NORMAL_MS, SHOGUN_POLL_IDLE_MS
+    global SHOGUN_POLL_FAST_WINDOW, SHOGUN_POLL_IDLE_AFTER, SHOGUN_HOSTS, SHOGUN_API_TIMEOUT_MS
+    global SHOGUN_FAST_PATH_MAX_AGE_MS, OSC_SEND_BUNDLE_MAX_BYTES
+    DARK_MODE = app_settings.get("dark_mode", False)
+    OSC_ROUTES = app_settings.get("osc_routes", {})
+    COMMAND_COALESCE_WINDOW_MS = app_settings.get("command_coalesce_window_ms", 50)
+    COMMAND_COALESCE_PENDING = app_settings.get("command_coalesce_pending", True)
+    OSC_COMMAND_ACKS = app_settings.get("osc_command_acks", True)
+    DEFAULT_OSC_DROP_POLICY = app_settings.get("osc_drop_policy", OSC_DROP_PRIORITY)
+    OSC_INGEST_QUEUE_SIZE = app_settings.get("osc_ingest_queue_size", 1000)
+    OSC_SOURCE_RATE = app_settings.get("osc_source_rate", 200.0)
+    OSC_SOURCE_BURST = app_settings.get("osc_source_burst", 400)
+    SHOGUN_SNAPSHOT_MAX_AGE_MS = app_settings.get("shogun_snapshot_max_age_ms", 500)
+    SHOGUN_FAST_PATH_MAX_AGE_MS = app_settings.get("shogun_fast_path_max_age_ms", 1000)
+    OSC_SEND_BUNDLE_MAX_BYTES = app_settings.get("osc_send_bundle_max_bytes", 1400)
+    SHOGUN_POLL_FAST_MS = app_settings.get("shogun_poll_fast_ms", 100)
+    SHOGUN_POLL_NORMAL_MS = app_settings.get("shogun_poll_normal_ms", 1000)
+    SHOGUN_POLL_IDLE_MS = app_settings.get("shogun_poll_idle_ms", 3000)
+    SHOGUN_POLL_FAST_WINDOW = app_settings.get("shogun_poll_fast_window", 3.0)
+    SHOGUN_POLL_IDLE_AFTER = app_settings.get("shogun_poll_idle_after", 30.0)
+    SHOGUN_HOSTS = app_settings.get("shogun_hosts", {})
+    SHOGUN_API_TIMEOUT_MS = app_settings.get("shogun_api_timeout_ms", 2000)
+
 # Флаг темной темы
 DARK_MODE = app_settings.get("dark_mode", False)
 
@@ -80,35 +197,180 @@ IMPORT_SUCCESS = True
 IMPORT_ERROR = ""
 
 try:
-    # Библиотеки для Shogun Live
-    from vicon_core_api import Client
-    from shogun_live_api import CaptureServices
-    
     # Библиотеки для OSC
     from pythonosc import dispatcher, osc_server
 except ImportError as e:
     IMPORT_SUCCESS = False
     IMPORT_ERROR = str(e)
 
+# Библиотеки Shogun Live нужны только для работы с настоящей программой (не для --simulate)
+SHOGUN_API_AVAILABLE = True
+SHOGUN_API_ERROR = ""
+
+try:
+    import vicon_core_api
+    import shogun_live_api
+except ImportError as e:
+    SHOGUN_API_AVAILABLE = False
+    SHOGUN_API_ERROR = str(e)
+
+def missing_libraries(simulate: bool = False) -> str:
+    """
+    Возвращает описание ошибки импорта библиотек, необходимых в выбранном режиме
+    
+    Args:
+        simulate: Используется имитация Shogun Live (библиотеки Shogun Live не нужны)
+        
+    Returns:
+        str: Текст ошибки импорта или пустая строка, если все библиотеки доступны
+    """
+    if not IMPORT_SUCCESS:
+        return IMPORT_ERROR
+    if not simulate and not SHOGUN_API_AVAILABLE:
+        return SHOGUN_API_ERROR
+    return ""
+
 # Настройки OSC-сервера из параметров приложения
 DEFAULT_OSC_IP = app_settings.get("osc_ip", "0.0.0.0")
 DEFAULT_OSC_PORT = app_settings.get("osc_port", 5555)
+DEFAULT_OSC_LISTENERS = app_settings.get("osc_listeners", [])
+DEFAULT_OSC_TCP_PORT = app_settings.get("osc_tcp_port", 0)
 DEFAULT_OSC_BROADCAST_IP = app_settings.get("osc_broadcast_ip", "255.255.255.255")
 DEFAULT_OSC_BROADCAST_PORT = app_settings.get("osc_broadcast_port", 9000)
+DEFAULT_OSC_DESTINATIONS = app_settings.get("osc_destinations", [])
+
+# Очередь отправки OSC-уведомлений
+OSC_SEND_QUEUE_SIZE = 1000   # Максимальная длина очереди, сверх нее сообщения отбрасываются
+OSC_SEND_CACHE_SIZE = 256    # Количество закодированных сообщений в кеше
+# Накопившиеся сообщения делятся на бандлы не больше этого размера (датаграмма без фрагментации)
+OSC_SEND_BUNDLE_MAX_BYTES = app_settings.get("osc_send_bundle_max_bytes", 1400)
+
+# Движки приема OSC-сообщений
+OSC_ENGINE_THREADING = "threading"  # Цикл select по сокетам приемников в потоке сервера
+OSC_ENGINE_ASYNCIO = "asyncio"      # asyncio DatagramProtocol: один цикл событий
+OSC_ENGINE_BATCH = "batch"          # Чтение пачками в предвыделенные буферы
+OSC_ENGINES = {
+    OSC_ENGINE_THREADING: "Потоковый (цикл select)",
+    OSC_ENGINE_ASYNCIO: "asyncio (один цикл событий)",
+    OSC_ENGINE_BATCH: "Пакетный (предвыделенные буферы)",
+}
+DEFAULT_OSC_ENGINE = app_settings.get("osc_engine", OSC_ENGINE_THREADING)
+
+# Очередь приема OSC-пакетов и ограничение частоты по IP-адресам отправителей
+OSC_DROP_OLDEST = "drop_oldest"    # Вытеснять самый старый пакет
+OSC_DROP_NEWEST = "drop_newest"    # Отбрасывать новый пакет
+OSC_DROP_PRIORITY = "priority"     # Команды записи вытесняют прочие пакеты и не ограничиваются по частоте
+OSC_DROP_POLICIES = {
+    OSC_DROP_OLDEST: "Отбрасывать старые",
+    OSC_DROP_NEWEST: "Отбрасывать новые",
+    OSC_DROP_PRIORITY: "Приоритет команд записи",
+}
+DEFAULT_OSC_DROP_POLICY = app_settings.get("osc_drop_policy", OSC_DROP_PRIORITY)
+OSC_INGEST_QUEUE_SIZE = app_settings.get("osc_ingest_queue_size", 1000)
+OSC_SOURCE_RATE = app_settings.get("osc_source_rate", 200.0)
+OSC_SOURCE_BURST = app_settings.get("osc_source_burst", 400)
+OSC_MAX_PACKET_SIZE = 8192    # Размер буфера приема потокового движка
+OSC_RECV_BATCH_SIZE = 64      # Максимум датаграмм за одно пробуждение пакетного приемника
+OSC_RECV_BUFFER_SIZE = 2048   # Размер буфера датаграммы, более длинные датаграммы отбрасываются
+OSC_INGEST_MAX_SOURCES = 256  # Максимальное количество отслеживаемых IP-адресов
+OSC_DROP_SUMMARY_INTERVAL_MS = 5000  # Период сводки отброшенных пакетов в GUI и журнале
+
+# Прием OSC по TCP (SLIP, OSC 1.1)
+OSC_TCP_ACK_ADDRESS = "/ack"   # Подтверждение пакета: [номер пакета в соединении, "ok"/"error"/"dropped"]
+OSC_TCP_MAX_FRAME = 65536      # Максимальный размер SLIP-кадра, байт
+OSC_TCP_MAX_PENDING = 256      # Неподтвержденных пакетов на соединение до приостановки чтения
+OSC_TCP_START_TIMEOUT = 2.0    # Ожидание запуска TCP-сервера, с
+
+# Подтверждения выполнения команд отправителю:
+# [id команды, OSC-адрес, 1/0 - успех, имя тейка, время обработки на сервере в мкс]
+OSC_COMMAND_ACKS = app_settings.get("osc_command_acks", True)
+OSC_COMMAND_ACK_ADDRESS = "/ShogunLiveCommandAck"
 
 # OSC-адреса для управления Shogun Live
 OSC_START_RECORDING = "/RecordStartShogunLive"
 OSC_STOP_RECORDING = "/RecordStopShogunLive"
 OSC_CAPTURE_NAME_CHANGED = "/ShogunLiveCaptureName"  # Новый адрес для уведомления об изменении имени захвата
+OSC_RECORDING_STATE = "/ShogunLiveRecording"  # Уведомление об изменении состояния записи (1/0)
+OSC_SET_CAPTURE_NAME = "/SetCaptureName"
+OSC_START_RECORDING_NAMED = "/RecordStartNamed"  # Установка имени захвата и запуск записи одной командой
+OSC_BUNDLE_ACK_ADDRESS = "#bundle"  # OSC-адрес в подтверждении пакета команд из одного бандла
+
+# Команды, на которые можно направить OSC-адреса, и встроенные маршруты
+OSC_COMMAND_START_RECORDING = "start_recording"
+OSC_COMMAND_STOP_RECORDING = "stop_recording"
+OSC_COMMAND_SET_CAPTURE_NAME = "set_capture_name"
+OSC_COMMAND_START_RECORDING_NAMED = "start_recording_named"
+OSC_DEFAULT_ROUTES = {
+    OSC_START_RECORDING: OSC_COMMAND_START_RECORDING,
+    OSC_STOP_RECORDING: OSC_COMMAND_STOP_RECORDING,
+    OSC_SET_CAPTURE_NAME: OSC_COMMAND_SET_CAPTURE_NAME,
+    OSC_START_RECORDING_NAMED: OSC_COMMAND_START_RECORDING_NAMED,
+}
+OSC_ROUTES = app_settings.get("osc_routes", {})  # Псевдонимы из настроек
+OSC_ROUTE_CACHE_SIZE = 4096  # Количество адресов в кеше сопоставления шаблонов
+
+# Агрегация неизвестного OSC-трафика
+OSC_UNKNOWN_MAX_ADDRESSES = 1000       # Максимальное количество адресов в таблице
+OSC_UNKNOWN_SAMPLES = 3                # Примеров аргументов на адрес
+OSC_UNKNOWN_SAMPLE_EVERY = 100         # Сохранять пример каждого N-го сообщения
+OSC_UNKNOWN_SUMMARY_TOP = 5            # Адресов в периодической сводке
+OSC_UNKNOWN_SUMMARY_INTERVAL_MS = 5000  # Период отправки сводки в GUI
+
+# Планирование команд записи по временным меткам OSC-бандлов
+OSC_MAX_SCHEDULE_AHEAD = 60.0      # Максимальный горизонт планирования, с
+SCHEDULE_SPIN_WINDOW = 0.02        # Длительность активного ожидания перед запуском, с
+SCHEDULE_BATCH_LEAD = 0.2          # Пакет команд ставится в очередь раньше метки на это время, с (имя до запуска)
+SCHEDULE_LATE_THRESHOLD_MS = 1.0   # Отклонение, после которого запуск считается опоздавшим, мс
 
 # Настройки логирования
 LOG_FORMAT = '%(asctime)s [%(levelname)s] %(message)s'
 LOG_MAX_LINES = 1000
 
+# Окно схлопывания одинаковых команд от нескольких контроллеров
+COMMAND_COALESCE_WINDOW_MS = app_settings.get("command_coalesce_window_ms", 50)
+# Присоединять одинаковую команду к предыдущей, пока та не выполнена, даже после окна
+COMMAND_COALESCE_PENDING = app_settings.get("command_coalesce_pending", True)
+
+# Наблюдение за процессом Shogun Live
+SHOGUN_PROCESS_NAMES = ("ShogunLive", "Shogun Live")  # Подстроки имени процесса
+SHOGUN_SCAN_BACKOFF_MIN = app_settings.get("shogun_scan_backoff_min", 1.0)
+SHOGUN_SCAN_BACKOFF_MAX = app_settings.get("shogun_scan_backoff_max", 5.0)
+
+# Дополнительные машины Shogun Live, выполняющие команды записи одновременно с основной
+SHOGUN_HOSTS = app_settings.get("shogun_hosts", {})
+SHOGUN_HOST_PREPARE_TIMEOUT = 0.5  # Ожидание готовности потоков машин перед общим сигналом, с
+SHOGUN_HOST_CALL_TIMEOUT = 1.0     # Ожидание ответа машин после общего сигнала, с (меньше срока вызова API)
+
+# Вызовы Shogun Live API вне цикла событий
+SHOGUN_API_TIMEOUT_MS = app_settings.get("shogun_api_timeout_ms", 2000)
+SHOGUN_API_STALL_MS = 1000  # Длительность вызова, после которой сторожевой поток сообщает о зависании, мс
+SHOGUN_API_WORKERS = 4      # Потоков для вызовов API (зависший вызов занимает поток до завершения)
+SHOGUN_OWNER_CALL_TIMEOUT = 10.0  # Ожидание служебной операции исполнителя (опрос, подключение), с
+
+# Адаптивная частота опроса Shogun Live
+SHOGUN_POLL_FAST_MS = app_settings.get("shogun_poll_fast_ms", 100)
+SHOGUN_POLL_NORMAL_MS = app_settings.get("shogun_poll_normal_ms", 1000)
+SHOGUN_POLL_IDLE_MS = app_settings.get("shogun_poll_idle_ms", 3000)
+SHOGUN_POLL_FAST_WINDOW = app_settings.get("shogun_poll_fast_window", 3.0)
+SHOGUN_POLL_IDLE_AFTER = app_settings.get("shogun_poll_idle_after", 30.0)
+
+# Имитация Shogun Live (запуск с --simulate), значения по умолчанию для параметров командной строки
+SHOGUN_SIM_LATENCY_MS = 5.0        # Задержка ответа на каждый запрос, мс
+SHOGUN_SIM_FAILURE_RATE = 0.0      # Доля запросов, завершающихся ошибкой соединения
+SHOGUN_SIM_RESTART_INTERVAL = 0.0  # Период перезапуска имитации, с (0 - без перезапусков)
+SHOGUN_SIM_RESTART_DOWNTIME = 2.0  # Сколько имитация недоступна при перезапуске, с
+
+# Снимок состояния Shogun Live, используемый командами вместо собственных проверок
+SHOGUN_SNAPSHOT_MAX_AGE_MS = app_settings.get("shogun_snapshot_max_age_ms", 500)
+# Давность подтверждения соединения, при которой запуск и остановка записи выполняются
+# сразу, а итоговое состояние проверяется после команды
+SHOGUN_FAST_PATH_MAX_AGE_MS = app_settings.get("shogun_fast_path_max_age_ms", 1000)
+
 # Настройки для проверки соединения с Shogun Live
-MAX_RECONNECT_ATTEMPTS = 10
-BASE_RECONNECT_DELAY = 1
-MAX_RECONNECT_DELAY = 15
+MAX_RECONNECT_ATTEMPTS = 5   # Неудачных проб подряд до размыкания цепи (команды отклоняются сразу)
+BASE_RECONNECT_DELAY = 1     # Пауза после первой неудачной пробы, с
+MAX_RECONNECT_DELAY = 15     # Максимальная пауза и интервал проб при разомкнутой цепи, с
+RECONNECT_JITTER = 0.5       # Доля паузы, на которую она случайно сокращается
 
 # Названия статусов для понятного отображения
 STATUS_CONNECTED = "Подключено"
@@ -126,4 +388,4 @@ def get_app_version() -> str:
     Returns:
         str: Версия приложения
     """
-    return APP_VERSION
\ No newline at end of file
+    return APP_VERSION
@@ -20,6 +20,8 @@ from PyQt5.QtGui import QTextCursor, QIcon
 
 from gui.status_panel import StatusPanel
 from gui.log_panel import LogPanel
+from gui.metrics_dialog import MetricsDialog, save_metrics_to_file
+from shogun.backends import ShogunBackend, SimulatedShogunBackend
 from shogun.shogun_client import ShogunWorker
 from osc.osc_server import OSCServer, format_osc_message
 from logger.custom_logger import add_text_widget_handler
@@ -29,13 +31,22 @@ import config
 class ShogunOSCApp(QMainWindow):
     """Главное окно приложения. Отвечает за организацию 
     интерфейса и координацию работы всех компонентов."""
-    def __init__(self):
+    def __init__(self, backend: Optional[ShogunBackend] = None):
+        """
+        Args:
+            backend: Бэкенд Shogun Live (по умолчанию - настоящий Shogun Live)
+        """
         super().__init__()
         self.logger = logging.getLogger('ShogunOSC')
         
         # Инициализация рабочих потоков
-        self.shogun_worker = ShogunWorker()
+        self.shogun_worker = ShogunWorker(backend)
+        self.simulated = isinstance(self.shogun_worker.backend, SimulatedShogunBackend)
         self.osc_server = None  # Будет создан после настройки интерфейса
+        self._stopping_servers = []  # Остановленные серверы, поток которых еще завершается
+        self._start_pending = False  # Запуск сервера ждет освобождения портов прежним
+        self.metrics_dialog = None  # Окно диагностики создается по требованию
+        self._last_recording_state = False  # Последнее отправленное по OSC состояние записи
         
         # Настройка интерфейса
         self.init_ui()
@@ -46,22 +57,26 @@ class ShogunOSCApp(QMainWindow):
         # Запуск рабочих потоков
         self.shogun_worker.start()
         
+        if self.simulated:
+            self.logger.warning("Работа с имитацией Shogun Live (--simulate): команды записи выполняет имитация")
+        
         # Проверка импорта библиотек
-        if not config.IMPORT_SUCCESS:
-            self.logger.critical(f"Ошибка импорта библиотек: {config.IMPORT_ERROR}")
-            self.log_panel.log_text.append(f'<span style="color:red;font-weight:bold;">ОШИБКА ИМПОРТА БИБЛИОТЕК: {config.IMPORT_ERROR}</span>')
+        import_error = config.missing_libraries(self.simulated)
+        if import_error:
+            self.logger.critical(f"Ошибка импорта библиотек: {import_error}")
+            self.log_panel.log_text.append(f'<span style="color:red;font-weight:bold;">ОШИБКА ИМПОРТА БИБЛИОТЕК: {import_error}</span>')
             self.log_panel.log_text.append('<span style="color:red;">Убедитесь, что установлены необходимые библиотеки:</span>')
             self.log_panel.log_text.append('<span style="color:blue;">pip install vicon-core-api shogun-live-api python-osc psutil PyQt5</span>')
             
             # Показываем диалог с ошибкой
             self.show_error_dialog("Ошибка импорта библиотек", 
-                                  f"Не удалось импортировать необходимые библиотеки: {config.IMPORT_ERROR}\n\n"
+                                  f"Не удалось импортировать необходимые библиотеки: {import_error}\n\n"
                                   "Убедитесь, что установлены все зависимости:\n"
                                   "pip install vicon-core-api shogun-live-api python-osc psutil PyQt5")
     
     def init_ui(self):
         """Инициализация пользовательского интерфейса"""
-        self.setWindowTitle("Shogun OSC GUI")
+        self.setWindowTitle("Shogun OSC GUI (имитация Shogun Live)" if self.simulated else "Shogun OSC GUI")
         self.setMinimumSize(800, 600)
         
         # Создаем панель статуса первой, до применения темы
@@ -96,6 +111,21 @@ class ShogunOSCApp(QMainWindow):
         if self.status_panel.osc_panel.osc_enabled.isChecked():
             self.start_osc_server()
         
+        # Периодическая сводка неизвестного OSC-трафика вместо сообщения на каждый пакет
+        self.unknown_traffic_timer = QTimer(self)
+        self.unknown_traffic_timer.timeout.connect(self.show_unknown_traffic_summary)
+        self.unknown_traffic_timer.start(config.OSC_UNKNOWN_SUMMARY_INTERVAL_MS)
+        
+        # Периодическая сводка входящих пакетов, отброшенных очередью приема
+        self.drop_summary_timer = QTimer(self)
+        self.drop_summary_timer.timeout.connect(self.show_drop_summary)
+        self.drop_summary_timer.start(config.OSC_DROP_SUMMARY_INTERVAL_MS)
+        
+        # Изменения настроек в app_settings и в файле настроек применяются без перезапуска
+        self.settings_reload_timer = QTimer(self)
+        self.settings_reload_timer.timeout.connect(self.reload_settings)
+        self.settings_reload_timer.start(config.SETTINGS_RELOAD_INTERVAL_MS)
+        
         # Настраиваем таймер автосохранения настроек
         self.settings_timer = QTimer(self)
         self.settings_timer.timeout.connect(self.auto_save_settings)
@@ -130,6 +160,17 @@ class ShogunOSCApp(QMainWindow):
         self.theme_action.triggered.connect(self.toggle_theme)
         settings_menu.addAction(self.theme_action)
         
+        # Меню "Диагностика"
+        diagnostics_menu = menubar.addMenu("Диагностика")
+        
+        latency_action = QAction("Статистика задержек...", self)
+        latency_action.triggered.connect(self.show_metrics)
+        diagnostics_menu.addAction(latency_action)
+        
+        save_latency_action = QAction("Сохранить статистику задержек...", self)
+        save_latency_action.triggered.connect(lambda: save_metrics_to_file(self, self.collect_stats))
+        diagnostics_menu.addAction(save_latency_action)
+        
         # Меню "Справка"
         help_menu = menubar.addMenu("Справка")
         
@@ -158,6 +199,12 @@ class ShogunOSCApp(QMainWindow):
         # Сигналы от панели состояния
         self.status_panel.osc_panel.osc_enabled.stateChanged.connect(self.toggle_osc_server)
         
+        # Адреса приема применяются к работающему серверу по завершении ввода
+        osc_panel = self.status_panel.osc_panel
+        for widget in (osc_panel.ip_input, osc_panel.port_input,
+                       osc_panel.listeners_input, osc_panel.tcp_port_input):
+            widget.editingFinished.connect(self.apply_receive_settings)
+        
         # Сигналы от Shogun Worker для обновления статусной строки
         self.shogun_worker.connection_signal.connect(self.update_status_bar)
         self.shogun_worker.recording_signal.connect(self.update_recording_status)
@@ -173,20 +220,51 @@ class ShogunOSCApp(QMainWindow):
         self.status_panel.shogun_panel.update_capture_name(new_name)
         
         # Отправляем OSC-сообщение об изменении имени захвата
-        if self.osc_server:
-            # Получаем настройки отправки из панели OSC
-            broadcast_settings = self.status_panel.osc_panel.get_broadcast_settings()
-            
-            # Обновляем настройки в конфигурации
-            config.app_settings["osc_broadcast_ip"] = broadcast_settings["ip"]
-            config.app_settings["osc_broadcast_port"] = broadcast_settings["port"]
+        if self.send_osc_notification(config.OSC_CAPTURE_NAME_CHANGED, new_name):
+            self.logger.info(f"Отправлено OSC-сообщение: {config.OSC_CAPTURE_NAME_CHANGED} -> '{new_name}'")
+            # Добавляем в журнал OSC-сообщений
+            self.log_panel.add_osc_message(config.OSC_CAPTURE_NAME_CHANGED, f"'{new_name}'")
+    
+    def send_osc_notification(self, address, value):
+        """
+        Ставит OSC-уведомление в очередь отправки всем адресатам
+        
+        Args:
+            address: OSC-адрес уведомления
+            value: Значение уведомления
             
-            # Отправляем сообщение
-            success = self.osc_server.send_osc_message(config.OSC_CAPTURE_NAME_CHANGED, new_name)
-            if success:
-                self.logger.info(f"Отправлено OSC-сообщение: {config.OSC_CAPTURE_NAME_CHANGED} -> '{new_name}'")
-                # Добавляем в журнал OSC-сообщений
-                self.log_panel.add_osc_message(config.OSC_CAPTURE_NAME_CHANGED, f"'{new_name}'")
+        Returns:
+            bool: True если уведомление поставлено в очередь
+        """
+        if not self.osc_server:
+            return False
+        
+        # Получаем настройки отправки из панели OSC
+        broadcast_settings = self.status_panel.osc_panel.get_broadcast_settings()
+        
+        # Обновляем настройки в конфигурации
+        config.app_settings["osc_broadcast_ip"] = broadcast_settings["ip"]
+        config.app_settings["osc_broadcast_port"] = broadcast_settings["port"]
+        config.app_settings["osc_destinations"] = broadcast_settings["destinations"]
+        
+        self.osc_server.set_destinations(self.status_panel.osc_panel.get_destinations())
+        return self.osc_server.send_osc_message(address, value)
+    
+    def show_unknown_traffic_summary(self):
+        """Добавляет в журнал OSC-сообщений сводку неизвестного трафика"""
+        if not self.osc_server:
+            return
+        summary = self.osc_server.take_unknown_summary()
+        if summary:
+            self.log_panel.add_osc_message("Неизвестные адреса", summary)
+    
+    def show_drop_summary(self):
+        """Добавляет в журнал OSC-сообщений сводку отброшенных входящих пакетов"""
+        if not self.osc_server:
+            return
+        summary = self.osc_server.take_drop_summary()
+        if summary:
+            self.log_panel.add_osc_message("Отброшено", summary)
     
     def update_status_bar(self, connected):
         """Обновление статусной строки при изменении состояния подключения"""
@@ -197,6 +275,11 @@ class ShogunOSCApp(QMainWindow):
     
     def update_recording_status(self, is_recording):
         """Обновление статусной строки при изменении состояния записи"""
+        # Уведомляем получателей OSC только при фактическом изменении состояния
+        if is_recording != self._last_recording_state:
+            self._last_recording_state = is_recording
+            self.send_osc_notification(config.OSC_RECORDING_STATE, 1 if is_recording else 0)
+        
         if is_recording:
             self.status_bar.showMessage("Запись активна")
         else:
@@ -211,36 +294,151 @@ class ShogunOSCApp(QMainWindow):
             self.stop_osc_server()
     
     def start_osc_server(self):
-        """Запуск OSC-сервера"""
+        """
+        Запуск OSC-сервера
+        
+        Если прежний сервер еще освобождает порты, запуск откладывается до
+        завершения его потока: без SO_REUSEPORT (в Windows) новый сокет не
+        привязался бы к занятому порту. Адреса приема работающего сервера
+        меняются без перезапуска (apply_receive_settings).
+        """
         ip = self.status_panel.osc_panel.ip_input.text()
         port = self.status_panel.osc_panel.port_input.value()
+        engine = self.status_panel.osc_panel.get_engine()
         
         # Останавливаем предыдущий сервер, если был
         self.stop_osc_server()
+        if self._stopping_servers:
+            self._start_pending = True
+            self.status_panel.osc_panel.engine_input.setEnabled(False)
+            self.logger.info("OSC-сервер будет запущен после освобождения портов прежним сервером")
+            return
         
         # Создаем и запускаем новый сервер
-        self.osc_server = OSCServer(ip, port, self.shogun_worker)
+        self.osc_server = OSCServer(ip, port, self.shogun_worker, engine,
+                                    self.status_panel.osc_panel.get_destinations(),
+                                    self.status_panel.osc_panel.get_listeners(),
+                                    self.status_panel.osc_panel.tcp_port_input.value())
         self.osc_server.message_signal.connect(self.log_panel.add_osc_message)
         self.osc_server.start()
         
-        # Блокируем изменение настроек при запущенном сервере
-        self.status_panel.osc_panel.ip_input.setEnabled(False)
-        self.status_panel.osc_panel.port_input.setEnabled(False)
+        # Адреса приема перенастраиваются на лету, движок меняется только перезапуском
+        self.status_panel.osc_panel.engine_input.setEnabled(False)
         
-        self.logger.info(f"OSC-сервер запущен на {ip}:{port}")
+        self.logger.info(f"OSC-сервер запущен на {ip}:{port} (движок: {engine})")
     
     def stop_osc_server(self):
-        """Остановка OSC-сервера"""
-        if self.osc_server and self.osc_server.isRunning():
-            self.osc_server.stop()
-            self.osc_server.wait()  # Ждем завершения потока
-            self.osc_server = None
-            
-            # Разблокируем настройки
-            self.status_panel.osc_panel.ip_input.setEnabled(True)
-            self.status_panel.osc_panel.port_input.setEnabled(True)
-            
-            self.logger.info("OSC-сервер остановлен")
+        """Остановка OSC-сервера без ожидания завершения его потока"""
+        self._start_pending = False
+        server = self.osc_server
+        if server is None:
+            return
+        self.osc_server = None
+        # Ссылка сохраняется до завершения потока, иначе QThread будет уничтожен работающим;
+        # finished подключается до проверки isRunning, чтобы не пропустить завершение между ними
+        self._stopping_servers.append(server)
+        server.finished.connect(lambda: self._on_server_finished(server))
+        server.stop()
+        if not server.isRunning():
+            self._on_server_finished(server)
+        
+        self.status_panel.osc_panel.engine_input.setEnabled(True)
+        self.logger.info("OSC-сервер остановлен")
+    
+    def _on_server_finished(self, server):
+        """Забывает остановленный сервер и выполняет отложенный запуск, когда порты освобождены"""
+        if server in self._stopping_servers:
+            self._stopping_servers.remove(server)
+        if self._start_pending and not self._stopping_servers:
+            self._start_pending = False
+            self.start_osc_server()
+    
+    def apply_receive_settings(self):
+        """Перенастраивает приемники работающего OSC-сервера по значениям панели"""
+        if not self.osc_server:
+            return
+        panel = self.status_panel.osc_panel
+        if not self.osc_server.reconfigure(panel.ip_input.text(), panel.port_input.value(),
+                                           panel.get_listeners(), panel.tcp_port_input.value()):
+            self.status_bar.showMessage("Адрес приема OSC не изменен: порт недоступен", 5000)
+    
+    def reload_settings(self):
+        """Применяет настройки, измененные в app_settings или в файле настроек"""
+        try:
+            changed = config.poll_settings_changes()
+        except Exception as e:
+            self.logger.error(f"Ошибка при перечитывании настроек: {e}")
+            return
+        if changed:
+            self.apply_settings(changed)
+    
+    def apply_settings(self, changed):
+        """
+        Применяет измененные настройки к интерфейсу и работающим компонентам
+        
+        Args:
+            changed: Измененные настройки и их новые значения
+        """
+        panel = self.status_panel.osc_panel
+        self.logger.info("Применены измененные настройки: " + ", ".join(sorted(changed)))
+        
+        # Обновляем поля панели, не вызывая их сигналов
+        fields = {
+            "osc_ip": (panel.ip_input, lambda value: panel.ip_input.setText(str(value))),
+            "osc_port": (panel.port_input, lambda value: panel.port_input.setValue(int(value))),
+            "osc_listeners": (panel.listeners_input,
+                              lambda value: panel.listeners_input.setText(", ".join(value))),
+            "osc_tcp_port": (panel.tcp_port_input, lambda value: panel.tcp_port_input.setValue(int(value))),
+            "osc_broadcast_ip": (panel.broadcast_ip_input,
+                                 lambda value: panel.broadcast_ip_input.setText(str(value))),
+            "osc_broadcast_port": (panel.broadcast_port_input,
+                                   lambda value: panel.broadcast_port_input.setValue(int(value))),
+            "osc_destinations": (panel.destinations_input,
+                                 lambda value: panel.destinations_input.setText(", ".join(value))),
+        }
+        for key, (widget, setter) in fields.items():
+            if key in changed:
+                widget.blockSignals(True)
+                setter(changed[key])
+                widget.blockSignals(False)
+        
+        if "dark_mode" in changed and changed["dark_mode"] != self.theme_action.isChecked():
+            self.apply_theme(changed["dark_mode"])
+        if "command_coalesce_window_ms" in changed:
+            self.shogun_worker.command_coalescer.window_ms = config.COMMAND_COALESCE_WINDOW_MS
+        if "command_coalesce_pending" in changed:
+            self.shogun_worker.command_coalescer.merge_pending = config.COMMAND_COALESCE_PENDING
+        if "shogun_api_timeout_ms" in changed:
+            self.shogun_worker.api.timeout_ms = config.SHOGUN_API_TIMEOUT_MS
+        if "shogun_hosts" in changed:
+            self.shogun_worker.host_pool.configure(config.SHOGUN_HOSTS)
+        if any(key.startswith("shogun_poll_") for key in changed):
+            self.shogun_worker.poll_scheduler.configure(
+                config.SHOGUN_POLL_FAST_MS, config.SHOGUN_POLL_NORMAL_MS, config.SHOGUN_POLL_IDLE_MS,
+                config.SHOGUN_POLL_FAST_WINDOW, config.SHOGUN_POLL_IDLE_AFTER)
+        if "osc_engine" in changed:
+            engine_index = panel.engine_input.findData(changed["osc_engine"])
+            if engine_index >= 0:
+                panel.engine_input.setCurrentIndex(engine_index)
+        if "osc_enabled" in changed:
+            # Переключение флажка само запускает или останавливает сервер
+            panel.osc_enabled.setChecked(bool(changed["osc_enabled"]))
+        
+        if not self.osc_server:
+            return
+        if "osc_engine" in changed and changed["osc_engine"] != self.osc_server.engine:
+            self.logger.info("Движок приема OSC изменен, сервер перезапускается")
+            self.start_osc_server()
+            return
+        if changed.keys() & {"osc_ip", "osc_port", "osc_listeners", "osc_tcp_port"}:
+            self.apply_receive_settings()
+        if changed.keys() & {"osc_broadcast_ip", "osc_broadcast_port", "osc_destinations"}:
+            self.osc_server.set_destinations(panel.get_destinations())
+        if "osc_routes" in changed:
+            self.osc_server.set_routes(config.OSC_ROUTES)
+        if changed.keys() & {"osc_ingest_queue_size", "osc_drop_policy", "osc_source_rate", "osc_source_burst"}:
+            self.osc_server.configure_ingest(config.OSC_INGEST_QUEUE_SIZE, config.DEFAULT_OSC_DROP_POLICY,
+                                             config.OSC_SOURCE_RATE, config.OSC_SOURCE_BURST)
     
     def apply_theme(self, dark_mode=False):
         """Применяет выбранную тему ко всему приложению"""
@@ -270,6 +468,31 @@ class ShogunOSCApp(QMainWindow):
         """Переключение между светлой и тёмной темой"""
         self.apply_theme(not config.DARK_MODE)
     
+    def collect_stats(self):
+        """Собирает статистику компонентов для окна диагностики и выгрузки в файл"""
+        stats = {
+            "Исполнитель команд": self.shogun_worker.command_executor.get_stats(),
+            "Схлопывание команд": self.shogun_worker.command_coalescer.get_stats(),
+            "Запуск по временным меткам": self.shogun_worker.fire_drift_stats.as_dict(),
+            "Процесс Shogun Live": self.shogun_worker.backend.get_stats(),
+            "Опрос Shogun Live": self.shogun_worker.get_monitor_stats(),
+            "Переподключение к Shogun Live": self.shogun_worker.reconnect.get_stats(),
+            "Машины Shogun Live": self.shogun_worker.host_pool.get_stats(),
+            "Вызовы Shogun Live API": self.shogun_worker.api.get_stats(),
+            "Пути команд записи": self.shogun_worker.record_paths.get_stats(),
+        }
+        if self.osc_server:
+            stats.update(self.osc_server.get_stats())
+        return stats
+    
+    def show_metrics(self):
+        """Отображает окно диагностики задержек"""
+        if self.metrics_dialog is None:
+            self.metrics_dialog = MetricsDialog(self.collect_stats, self)
+        self.metrics_dialog.show()
+        self.metrics_dialog.raise_()
+        self.metrics_dialog.refresh_timer.start(1000)
+    
     def show_about(self):
         """Отображает окно 'О программе'"""
         about_text = (
@@ -337,11 +560,15 @@ class ShogunOSCApp(QMainWindow):
         config.app_settings["osc_ip"] = self.status_panel.osc_panel.ip_input.text()
         config.app_settings["osc_port"] = self.status_panel.osc_panel.port_input.value()
         config.app_settings["osc_enabled"] = self.status_panel.osc_panel.osc_enabled.isChecked()
+        config.app_settings["osc_engine"] = self.status_panel.osc_panel.get_engine()
+        config.app_settings["osc_listeners"] = self.status_panel.osc_panel.get_listener_settings()
+        config.app_settings["osc_tcp_port"] = self.status_panel.osc_panel.tcp_port_input.value()
         
         # Сохраняем настройки отправки OSC-сообщений
         broadcast_settings = self.status_panel.osc_panel.get_broadcast_settings()
         config.app_settings["osc_broadcast_ip"] = broadcast_settings["ip"]
         config.app_settings["osc_broadcast_port"] = broadcast_settings["port"]
+        config.app_settings["osc_destinations"] = broadcast_settings["destinations"]
         
         config.save_settings(config.app_settings)
     
@@ -366,6 +593,8 @@ class ShogunOSCApp(QMainWindow):
                 self.shogun_worker.wait(1000)  # Ждем завершения потока с таймаутом
             
             self.stop_osc_server()
+            for server in list(self._stopping_servers):
+                server.wait(1000)
             
             self.logger.info("Приложение закрыто")
             event.accept()
@@ -0,0 +1,163 @@
+"""
+Окно диагностики: задержки команд и статистика компонентов.
+"""
+
+import logging
+from datetime import datetime
+from typing import Any, Callable, Dict
+
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QPushButton,
+                             QTextEdit, QFileDialog, QMessageBox)
+from PyQt5.QtCore import QTimer
+
+from metrics.latency import latency_recorder
+
+def format_latency_table(snapshot: Dict[str, Any]) -> str:
+    """
+    Форматирует сводку задержек в HTML-таблицу
+
+    Args:
+        snapshot: Сводка LatencyRecorder.snapshot()
+
+    Returns:
+        str: HTML-таблица
+    """
+    if not snapshot:
+        return "<p>Нет данных о задержках команд</p>"
+
+    rows = []
+    for command, data in snapshot.items():
+        rows.append(f'<tr><td colspan="7"><b>{command}</b> (ошибок: {data["failures"]})</td></tr>')
+        for stage, hist in data["stages"].items():
+            rows.append(
+                f"<tr><td>&nbsp;&nbsp;{stage}</td><td>{hist['count']}</td>"
+                f"<td>{hist['p50_ms']:.3f}</td><td>{hist['p95_ms']:.3f}</td>"
+                f"<td>{hist['p99_ms']:.3f}</td><td>{hist['max_ms']:.3f}</td>"
+                f"<td>{hist['avg_ms']:.3f}</td></tr>")
+    header = ("<tr><th>Этап</th><th>N</th><th>p50, мс</th><th>p95, мс</th>"
+              "<th>p99, мс</th><th>max, мс</th><th>avg, мс</th></tr>")
+    return f'<table cellspacing="0" cellpadding="3">{header}{"".join(rows)}</table>'
+
+def format_section(title: str, data: Any) -> str:
+    """
+    Форматирует раздел статистики компонента
+
+    Args:
+        title: Заголовок раздела
+        data: Словарь статистики
+
+    Returns:
+        str: HTML-фрагмент
+    """
+    def render(value: Any, indent: int = 0) -> str:
+        pad = "&nbsp;" * (indent * 4)
+        if isinstance(value, dict):
+            return "".join(
+                f"{pad}{key}:<br>{render(item, indent + 1)}" if isinstance(item, dict)
+                else f"{pad}{key}: {item}<br>"
+                for key, item in value.items())
+        return f"{pad}{value}<br>"
+
+    return f"<h4>{title}</h4>{render(data)}"
+
+class MetricsDialog(QDialog):
+    """Окно с периодически обновляемой статистикой задержек"""
+
+    def __init__(self, collect_stats: Callable[[], Dict[str, Any]], parent=None):
+        """
+        Args:
+            collect_stats: Функция, возвращающая дополнительные разделы статистики
+            parent: Родительский виджет
+        """
+        super().__init__(parent)
+        self.logger = logging.getLogger('ShogunOSC')
+        self.collect_stats = collect_stats
+        self.setWindowTitle("Диагностика задержек")
+        self.resize(700, 500)
+        self.init_ui()
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.refresh_timer.start(1000)
+        self.refresh()
+
+    def init_ui(self):
+        """Инициализация интерфейса окна"""
+        layout = QVBoxLayout()
+
+        self.stats_text = QTextEdit()
+        self.stats_text.setReadOnly(True)
+        layout.addWidget(self.stats_text)
+
+        buttons_layout = QHBoxLayout()
+
+        refresh_button = QPushButton("Обновить")
+        refresh_button.clicked.connect(self.refresh)
+        buttons_layout.addWidget(refresh_button)
+
+        reset_button = QPushButton("Сбросить задержки")
+        reset_button.clicked.connect(self.reset)
+        buttons_layout.addWidget(reset_button)
+
+        save_button = QPushButton("Сохранить в файл")
+        save_button.clicked.connect(self.save)
+        buttons_layout.addWidget(save_button)
+
+        close_button = QPushButton("Закрыть")
+        close_button.clicked.connect(self.close)
+        buttons_layout.addWidget(close_button)
+
+        layout.addLayout(buttons_layout)
+        self.setLayout(layout)
+
+    def refresh(self):
+        """Обновление отображаемой статистики"""
+        html = "<h4>Задержки команд</h4>" + format_latency_table(latency_recorder.snapshot())
+        for title, data in self.collect_stats().items():
+            html += format_section(title, data)
+
+        scroll = self.stats_text.verticalScrollBar().value()
+        self.stats_text.setHtml(html)
+        self.stats_text.verticalScrollBar().setValue(scroll)
+
+    def reset(self):
+        """Сброс накопленных гистограмм задержек"""
+        latency_recorder.reset()
+        self.logger.info("Статистика задержек сброшена")
+        self.refresh()
+
+    def save(self):
+        """Сохранение статистики в JSON-файл"""
+        save_metrics_to_file(self, self.collect_stats)
+
+    def closeEvent(self, event):
+        """Останавливаем обновление при закрытии окна"""
+        self.refresh_timer.stop()
+        super().closeEvent(event)
+
+def save_metrics_to_file(parent, collect_stats: Callable[[], Dict[str, Any]]) -> None:
+    """
+    Сохраняет статистику задержек и компонентов в JSON-файл через диалог выбора файла
+
+    Args:
+        parent: Родительский виджет для диалогов
+        collect_stats: Функция, возвращающая дополнительные разделы статистики
+    """
+    logger = logging.getLogger('ShogunOSC')
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename, _ = QFileDialog.getSaveFileName(
+        parent,
+        "Сохранить статистику задержек",
+        f"shogun_osc_latency_{timestamp}.json",
+        "JSON Files (*.json);;All Files (*)"
+    )
+    if not filename:  # Пользователь отменил сохранение
+        return
+
+    try:
+        latency_recorder.dump(filename, collect_stats())
+        logger.info(f"Статистика задержек сохранена в файл: {filename}")
+    except Exception as e:
+        logger.error(f"Ошибка при сохранении статистики: {e}")
+        QMessageBox.critical(parent, "Ошибка сохранения",
+                             f"Не удалось сохранить статистику:\n{str(e)}")
@@ -2,16 +2,16 @@
 Панель статуса состояния Shogun Live и настроек OSC.
 """
 
-import asyncio
 import logging
-import threading
 
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, 
                             QLabel, QPushButton, QGroupBox, QGridLayout,
-                            QLineEdit, QSpinBox, QCheckBox)
-from PyQt5.QtCore import Qt
+                            QLineEdit, QSpinBox, QCheckBox, QComboBox)
+from PyQt5.QtCore import Qt, QTimer
 
 import config
+from osc.listeners import parse_listeners
+from osc.osc_sender import parse_destinations
 from styles.app_styles import set_status_style
 
 class ShogunPanel(QGroupBox):
@@ -47,6 +47,11 @@ class ShogunPanel(QGroupBox):
         self.capture_name_label = QLabel("Нет данных")
         layout.addWidget(self.capture_name_label, 3, 1)
         
+        # Состояние очереди команд и время выполнения последних команд
+        layout.addWidget(QLabel("Очередь команд:"), 4, 0)
+        self.executor_label = QLabel("0")
+        layout.addWidget(self.executor_label, 4, 1)
+        
         # Кнопки управления
         button_layout = QHBoxLayout()
         
@@ -64,8 +69,13 @@ class ShogunPanel(QGroupBox):
         self.stop_button.setEnabled(False)
         button_layout.addWidget(self.stop_button)
         
-        layout.addLayout(button_layout, 4, 0, 1, 2)
+        layout.addLayout(button_layout, 5, 0, 1, 2)
         self.setLayout(layout)
+        
+        # Периодическое обновление статистики исполнителя команд
+        self.executor_timer = QTimer(self)
+        self.executor_timer.timeout.connect(self.update_executor_stats)
+        self.executor_timer.start(500)
     
     def connect_signals(self):
         """Подключение сигналов от Shogun Worker"""
@@ -111,46 +121,35 @@ class ShogunPanel(QGroupBox):
     
     def reconnect_shogun(self):
         """Запуск переподключения к Shogun Live"""
-        threading.Thread(target=self._run_reconnect).start()
-    
-    def _run_reconnect(self):
-        """Выполнение переподключения в отдельном потоке"""
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            result = loop.run_until_complete(self.shogun_worker.reconnect_shogun())
-            if result:
-                self.logger.info("Переподключение выполнено успешно")
-            else:
-                self.logger.error("Не удалось переподключиться")
-        finally:
-            loop.close()
+        # Ручное переподключение выполняется и при разомкнутой цепи
+        future = self.shogun_worker.submit_command("reconnect", self.shogun_worker.reconnect_shogun, True)
+        future.add_done_callback(self._on_reconnect_done)
+    
+    def _on_reconnect_done(self, future):
+        """Логирование результата переподключения (вызывается в потоке исполнителя)"""
+        if not future.exception() and future.result():
+            self.logger.info("Переподключение выполнено успешно")
+        else:
+            self.logger.error("Не удалось переподключиться")
     
     def start_recording(self):
         """Запуск записи"""
-        threading.Thread(target=self._run_start_recording).start()
-    
-    def _run_start_recording(self):
-        """Запуск записи в отдельном потоке"""
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            loop.run_until_complete(self.shogun_worker.startcapture())
-        finally:
-            loop.close()
+        self.shogun_worker.submit_command("start_recording", self.shogun_worker.startcapture)
     
     def stop_recording(self):
         """Остановка записи"""
-        threading.Thread(target=self._run_stop_recording).start()
-    
-    def _run_stop_recording(self):
-        """Остановка записи в отдельном потоке"""
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            loop.run_until_complete(self.shogun_worker.stopcapture())
-        finally:
-            loop.close()
+        self.shogun_worker.submit_command("stop_recording", self.shogun_worker.stopcapture)
+    
+    def update_executor_stats(self):
+        """Обновление информации об очереди команд"""
+        stats = self.shogun_worker.command_executor.get_stats()
+        text = f"{stats['queue_depth']}"
+        if stats['current_command']:
+            text += f" (выполняется: {stats['current_command']})"
+        last_times = [f"{name}: {data['last_ms']:.0f} мс" for name, data in stats['commands'].items()]
+        if last_times:
+            text += " | " + ", ".join(last_times)
+        self.executor_label.setText(text)
 
 class OSCPanel(QGroupBox):
     """Панель настроек OSC-сервера"""
@@ -175,38 +174,86 @@ class OSCPanel(QGroupBox):
         self.port_input.setValue(config.DEFAULT_OSC_PORT)
         layout.addWidget(self.port_input, 2, 1)
         
+        layout.addWidget(QLabel("Движок:"), 3, 0)
+        self.engine_input = QComboBox()
+        for engine, title in config.OSC_ENGINES.items():
+            self.engine_input.addItem(title, engine)
+        engine_index = self.engine_input.findData(config.DEFAULT_OSC_ENGINE)
+        self.engine_input.setCurrentIndex(max(engine_index, 0))
+        layout.addWidget(self.engine_input, 3, 1)
+        
+        layout.addWidget(QLabel("Доп. приемники:"), 4, 0)
+        self.listeners_input = QLineEdit(", ".join(config.DEFAULT_OSC_LISTENERS))
+        self.listeners_input.setPlaceholderText("ip:port, группа:port@ip_интерфейса")
+        self.listeners_input.setToolTip("Дополнительные порты и группы многоадресной рассылки "
+                                        "на выбранных сетевых интерфейсах")
+        layout.addWidget(self.listeners_input, 4, 1)
+        
+        layout.addWidget(QLabel("TCP-порт:"), 5, 0)
+        self.tcp_port_input = QSpinBox()
+        self.tcp_port_input.setRange(0, 65535)
+        self.tcp_port_input.setSpecialValueText("отключен")
+        self.tcp_port_input.setToolTip("Прием OSC по TCP (SLIP, OSC 1.1) с подтверждением каждой команды")
+        self.tcp_port_input.setValue(config.DEFAULT_OSC_TCP_PORT)
+        layout.addWidget(self.tcp_port_input, 5, 1)
+        
         # Настройки отправки OSC-сообщений
-        layout.addWidget(QLabel("<b>Настройки отправки:</b>"), 3, 0, 1, 2)
+        layout.addWidget(QLabel("<b>Настройки отправки:</b>"), 6, 0, 1, 2)
         
-        layout.addWidget(QLabel("IP:"), 4, 0)
+        layout.addWidget(QLabel("IP:"), 7, 0)
         self.broadcast_ip_input = QLineEdit(config.DEFAULT_OSC_BROADCAST_IP)
-        layout.addWidget(self.broadcast_ip_input, 4, 1)
+        layout.addWidget(self.broadcast_ip_input, 7, 1)
         
-        layout.addWidget(QLabel("Порт:"), 5, 0)
+        layout.addWidget(QLabel("Порт:"), 8, 0)
         self.broadcast_port_input = QSpinBox()
         self.broadcast_port_input.setRange(1000, 65535)
         self.broadcast_port_input.setValue(config.DEFAULT_OSC_BROADCAST_PORT)
-        layout.addWidget(self.broadcast_port_input, 5, 1)
+        layout.addWidget(self.broadcast_port_input, 8, 1)
+        
+        layout.addWidget(QLabel("Доп. адресаты:"), 9, 0)
+        self.destinations_input = QLineEdit(", ".join(config.DEFAULT_OSC_DESTINATIONS))
+        self.destinations_input.setPlaceholderText("ip:port, ip:port")
+        layout.addWidget(self.destinations_input, 9, 1)
         
         self.osc_enabled = QCheckBox("Включить OSC-сервер")
         self.osc_enabled.setChecked(config.app_settings.get("osc_enabled", True))
-        layout.addWidget(self.osc_enabled, 6, 0, 1, 2)
+        layout.addWidget(self.osc_enabled, 10, 0, 1, 2)
         
         # Информация о командах OSC
-        layout.addWidget(QLabel("<b>Доступные команды:</b>"), 7, 0, 1, 2)
-        layout.addWidget(QLabel(f"Старт записи: {config.OSC_START_RECORDING}"), 8, 0, 1, 2)
-        layout.addWidget(QLabel(f"Стоп записи: {config.OSC_STOP_RECORDING}"), 9, 0, 1, 2)
-        layout.addWidget(QLabel(f"Установка имени: /SetCaptureName [имя]"), 10, 0, 1, 2)
-        layout.addWidget(QLabel(f"Уведомление об изменении: {config.OSC_CAPTURE_NAME_CHANGED}"), 11, 0, 1, 2)
+        layout.addWidget(QLabel("<b>Доступные команды:</b>"), 11, 0, 1, 2)
+        layout.addWidget(QLabel(f"Старт записи: {config.OSC_START_RECORDING}"), 12, 0, 1, 2)
+        layout.addWidget(QLabel(f"Стоп записи: {config.OSC_STOP_RECORDING}"), 13, 0, 1, 2)
+        layout.addWidget(QLabel(f"Установка имени: {config.OSC_SET_CAPTURE_NAME} [имя]"), 14, 0, 1, 2)
+        layout.addWidget(QLabel(f"Уведомление об изменении: {config.OSC_CAPTURE_NAME_CHANGED}"), 15, 0, 1, 2)
+        layout.addWidget(QLabel(f"Уведомление о записи: {config.OSC_RECORDING_STATE} [1/0]"), 16, 0, 1, 2)
         
         self.setLayout(layout)
         
+    def get_engine(self):
+        """Получение выбранного движка приема OSC-сообщений"""
+        return self.engine_input.currentData()
+    
+    def get_listener_settings(self):
+        """Получение списка дополнительных приемников в виде строк из настроек"""
+        return [item.strip() for item in self.listeners_input.text().split(",") if item.strip()]
+    
+    def get_listeners(self):
+        """Получение дополнительных приемников OSC-сервера"""
+        return parse_listeners(self.get_listener_settings())
+    
     def get_broadcast_settings(self):
         """Получение настроек для отправки OSC-сообщений"""
+        extra = [item.strip() for item in self.destinations_input.text().split(",") if item.strip()]
         return {
             "ip": self.broadcast_ip_input.text(),
-            "port": self.broadcast_port_input.value()
+            "port": self.broadcast_port_input.value(),
+            "destinations": extra
         }
+    
+    def get_destinations(self):
+        """Получение полного списка адресатов OSC-уведомлений (ip, port)"""
+        broadcast = self.get_broadcast_settings()
+        return parse_destinations([(broadcast["ip"], broadcast["port"])] + broadcast["destinations"])
 
 class StatusPanel(QWidget):
     """Составная панель статуса и настроек"""
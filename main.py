@@ -22,6 +22,14 @@ def parse_arguments():
     parser.add_argument('--log-file', action='store_true', help='Включить логирование в файл')
     parser.add_argument('--log-dir', type=str, help='Директория для файлов логов')
     parser.add_argument('--debug', action='store_true', help='Включить отладочный режим')
+    parser.add_argument('--simulate', action='store_true',
+                        help='Работать с имитацией Shogun Live вместо настоящей программы')
+    parser.add_argument('--sim-latency-ms', type=float, default=config.SHOGUN_SIM_LATENCY_MS,
+                        help='Задержка ответа имитации на каждый запрос, мс')
+    parser.add_argument('--sim-failure-rate', type=float, default=config.SHOGUN_SIM_FAILURE_RATE,
+                        help='Доля запросов к имитации, завершающихся ошибкой соединения')
+    parser.add_argument('--sim-restart-interval', type=float, default=config.SHOGUN_SIM_RESTART_INTERVAL,
+                        help='Период перезапуска имитации, с (0 - без перезапусков)')
     return parser.parse_args()
 
 def show_error_message(message, details=None):
@@ -50,18 +58,20 @@ def main():
         log_system_info(logger)
         
         # Проверяем успешность импорта библиотек в config
-        if not config.IMPORT_SUCCESS:
-            error_msg = f"Ошибка импорта библиотек: {config.IMPORT_ERROR}"
+        import_error = config.missing_libraries(args.simulate)
+        if import_error:
+            error_msg = f"Ошибка импорта библиотек: {import_error}"
             logger.critical(error_msg)
             print(error_msg)
             print("Убедитесь, что установлены необходимые библиотеки:")
             print("pip install vicon-core-api shogun-live-api python-osc psutil PyQt5")
+            print("Для работы без Shogun Live запустите приложение с --simulate")
             
             # Создаем приложение только для показа ошибки
             app = QApplication(sys.argv)
             show_error_message(
                 "Ошибка импорта необходимых библиотек", 
-                f"Ошибка: {config.IMPORT_ERROR}\n\n"
+                f"Ошибка: {import_error}\n\n"
                 "Убедитесь, что установлены необходимые библиотеки:\n"
                 "pip install vicon-core-api shogun-live-api python-osc psutil PyQt5"
             )
@@ -69,6 +79,11 @@ def main():
         
         # Импортируем GUI только после проверки зависимостей
         from gui.main_window import ShogunOSCApp
+        from shogun.backends import create_backend
+        
+        backend = create_backend(args.simulate, latency_ms=args.sim_latency_ms,
+                                 failure_rate=args.sim_failure_rate,
+                                 restart_interval=args.sim_restart_interval)
         
         # Создаем приложение
         app = QApplication(sys.argv)
@@ -86,7 +101,7 @@ def main():
             app.processEvents()
         
         # Создаем главное окно
-        window = ShogunOSCApp()
+        window = ShogunOSCApp(backend)
         
         # Применяем тему при запуске если нужно
         if config.DARK_MODE:
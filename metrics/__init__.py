@@ -0,0 +1,3 @@
+"""
+Пакет сбора метрик производительности приложения
+"""
\ No newline at end of file
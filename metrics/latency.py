@@ -0,0 +1,209 @@
+"""
+Измерение сквозной задержки команд от приема UDP-пакета до ответа Shogun Live.
+Каждая команда сопровождается трассой с отметками этапов, длительности этапов
+накапливаются в гистограммах по каждой команде.
+"""
+
+import bisect
+import contextvars
+import json
+import math
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+# Этапы обработки команды в порядке прохождения
+STAGE_RECEIVED = "received"                      # Датаграмма принята сокетом
+STAGE_DISPATCHED = "dispatched"                  # Вызван обработчик OSC-команды
+STAGE_QUEUED = "queued"                          # Команда поставлена в очередь (команды из GUI)
+STAGE_PICKED_UP = "picked_up"                    # Исполнитель взял команду из очереди (с ожиданием в таймере)
+STAGE_CONNECTION_CHECKED = "connection_checked"  # Проверены соединение и состояние записи
+STAGE_FIRE_WAIT = "fire_wait"                    # Дождались временной метки бандла
+STAGE_API_CALL = "api_call"                      # Вернулся вызов Shogun Live API
+STAGE_COMPLETED = "completed"                    # Команда полностью выполнена
+
+TOTAL = "total"  # Ключ гистограммы полной длительности
+
+# Логарифмические корзины гистограммы: 20 корзин на декаду (шаг ~12%) от 1 мкс до 100 с
+_BUCKETS_PER_DECADE = 20
+_DECADES = 8
+_BUCKET_BOUNDS_US = [10 ** (i / _BUCKETS_PER_DECADE) for i in range(_DECADES * _BUCKETS_PER_DECADE + 1)]
+
+class LatencyHistogram:
+    """Гистограмма задержек с логарифмическими корзинами (от 1 мкс до 100 с)"""
+
+    BOUNDS: List[float] = _BUCKET_BOUNDS_US  # Верхние границы корзин в микросекундах
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS) + 1)
+        self.count = 0
+        self.sum_us = 0.0
+        self.min_us = math.inf
+        self.max_us = 0.0
+
+    def add(self, value_us: float) -> None:
+        """
+        Добавляет измерение
+
+        Args:
+            value_us: Задержка в микросекундах
+        """
+        self.counts[bisect.bisect_left(self.BOUNDS, value_us)] += 1
+        self.count += 1
+        self.sum_us += value_us
+        self.min_us = min(self.min_us, value_us)
+        self.max_us = max(self.max_us, value_us)
+
+    def percentile(self, q: float) -> float:
+        """
+        Оценивает перцентиль по границам корзин
+
+        Args:
+            q: Перцентиль от 0 до 100
+
+        Returns:
+            float: Оценка задержки в микросекундах (не больше максимума)
+        """
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(self.count * q / 100))
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                bound = self.BOUNDS[index] if index < len(self.BOUNDS) else self.max_us
+                return min(bound, self.max_us)
+        return self.max_us
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Возвращает сводку гистограммы в миллисекундах"""
+        return {
+            "count": self.count,
+            "min_ms": round(self.min_us / 1000, 3) if self.count else 0.0,
+            "avg_ms": round(self.sum_us / self.count / 1000, 3) if self.count else 0.0,
+            "p50_ms": round(self.percentile(50) / 1000, 3),
+            "p95_ms": round(self.percentile(95) / 1000, 3),
+            "p99_ms": round(self.percentile(99) / 1000, 3),
+            "max_ms": round(self.max_us / 1000, 3),
+        }
+
+class CommandTrace:
+    """Трасса одной команды: последовательность отметок этапов"""
+
+    def __init__(self, command: str, received_at: Optional[float] = None):
+        """
+        Args:
+            command: Название команды
+            received_at: Время приема пакета (time.perf_counter) или None
+        """
+        self.command = command
+        self.marks: List[Tuple[str, float]] = []
+        if received_at is not None:
+            self.marks.append((STAGE_RECEIVED, received_at))
+
+    def mark(self, stage: str) -> None:
+        """
+        Отмечает завершение этапа
+
+        Args:
+            stage: Название этапа
+        """
+        self.marks.append((stage, time.perf_counter()))
+
+    def stage_durations(self) -> List[Tuple[str, float]]:
+        """
+        Возвращает длительности этапов (от предыдущей отметки) в микросекундах
+
+        Returns:
+            List[Tuple[str, float]]: Пары (этап, длительность)
+        """
+        return [(stage, (at - prev_at) * 1_000_000)
+                for (_, prev_at), (stage, at) in zip(self.marks, self.marks[1:])]
+
+    def total_us(self) -> float:
+        """Полная длительность от первой до последней отметки в микросекундах"""
+        if len(self.marks) < 2:
+            return 0.0
+        return (self.marks[-1][1] - self.marks[0][1]) * 1_000_000
+
+class LatencyRecorder:
+    """Хранилище гистограмм задержек по командам и этапам"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Dict[str, LatencyHistogram]] = {}
+        self._failures: Dict[str, int] = {}
+
+    def record(self, trace: CommandTrace, success: bool = True) -> None:
+        """
+        Добавляет трассу выполненной команды в гистограммы
+
+        Args:
+            trace: Трасса команды
+            success: Завершилась ли команда успешно
+        """
+        if len(trace.marks) < 2:
+            return
+        with self._lock:
+            stages = self._histograms.setdefault(trace.command, {})
+            for stage, duration_us in trace.stage_durations():
+                stages.setdefault(stage, LatencyHistogram()).add(duration_us)
+            stages.setdefault(TOTAL, LatencyHistogram()).add(trace.total_us())
+            if not success:
+                self._failures[trace.command] = self._failures.get(trace.command, 0) + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Возвращает сводку по всем командам
+
+        Returns:
+            Dict[str, Any]: {команда: {"failures": N, "stages": {этап: сводка}}}
+        """
+        with self._lock:
+            return {
+                command: {
+                    "failures": self._failures.get(command, 0),
+                    "stages": {stage: histogram.as_dict() for stage, histogram in stages.items()},
+                }
+                for command, stages in self._histograms.items()
+            }
+
+    def dump(self, filename: str, extra: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Сохраняет сводку в JSON-файл
+
+        Args:
+            filename: Путь к файлу
+            extra: Дополнительные разделы статистики для сохранения
+        """
+        data = {
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "latency": self.snapshot(),
+        }
+        if extra:
+            data.update(extra)
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+    def reset(self) -> None:
+        """Очищает накопленные гистограммы"""
+        with self._lock:
+            self._histograms.clear()
+            self._failures.clear()
+
+# Общее хранилище задержек приложения
+latency_recorder = LatencyRecorder()
+
+# Трасса команды, выполняемой в текущем контексте исполнителя
+current_trace: contextvars.ContextVar = contextvars.ContextVar('current_trace', default=None)
+
+def mark_stage(stage: str) -> None:
+    """
+    Отмечает этап в трассе текущей команды, если она есть
+
+    Args:
+        stage: Название этапа
+    """
+    trace = current_trace.get()
+    if trace is not None:
+        trace.mark(stage)
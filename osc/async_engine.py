@@ -0,0 +1,65 @@
+"""
+Движок приема OSC-сообщений на базе asyncio.
+Прием выполняется в одном долгоживущем цикле событий без создания отдельного
+потока на каждую датаграмму; пакеты передаются в очередь приема или диспетчер.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Optional, Tuple
+
+from osc.ingest import IngestQueue
+from osc.listeners import Listener
+
+class OSCDatagramProtocol(asyncio.DatagramProtocol):
+    """Протокол asyncio, передающий принятые датаграммы в очередь приема OSC"""
+
+    def __init__(self, osc_dispatcher: IngestQueue, listener: Optional[Listener] = None):
+        super().__init__()
+        self.logger = logging.getLogger('ShogunOSC')
+        self.dispatcher = osc_dispatcher
+        self.listener = listener  # Приемник, для которого ведется счетчик пакетов
+        self.transport: Optional[asyncio.DatagramTransport] = None
+
+    def connection_made(self, transport: Any) -> None:
+        """Сохраняет транспорт после открытия сокета"""
+        self.transport = transport
+
+    def datagram_received(self, data: bytes, client_address: Tuple[str, int]) -> None:
+        """
+        Передает принятую датаграмму дальше прямо в цикле событий
+
+        Args:
+            data: Содержимое датаграммы
+            client_address: Адрес отправителя
+        """
+        received_at = time.perf_counter()
+        if self.listener is not None:
+            self.listener.received += 1
+        try:
+            self.dispatcher.call_handlers_for_packet(data, client_address, received_at)
+        except Exception as e:
+            self.logger.error(f"Ошибка при обработке OSC-датаграммы от {client_address}: {e}")
+
+    def error_received(self, exc: Exception) -> None:
+        """Обрабатывает ошибки сокета (например, ICMP port unreachable)"""
+        self.logger.debug(f"Ошибка сокета OSC-сервера: {exc}")
+
+async def create_udp_endpoint(loop: asyncio.AbstractEventLoop, listener: Listener,
+                              osc_dispatcher: IngestQueue
+                              ) -> Tuple[asyncio.DatagramTransport, OSCDatagramProtocol]:
+    """
+    Создает UDP-эндпоинт OSC-сервера на сокете приемника в указанном цикле событий
+
+    Args:
+        loop: Цикл событий
+        listener: Открытый приемник
+        osc_dispatcher: Очередь приема (или диспетчер) с методом call_handlers_for_packet
+
+    Returns:
+        Tuple[asyncio.DatagramTransport, OSCDatagramProtocol]: Транспорт и протокол
+    """
+    return await loop.create_datagram_endpoint(
+        lambda: OSCDatagramProtocol(osc_dispatcher, listener),
+        sock=listener.socket)
@@ -0,0 +1,219 @@
+"""
+Пакетный прием OSC-датаграмм в предвыделенные буферы.
+За одно пробуждение из сокетов всех приемников вычитываются накопившиеся
+датаграммы (до размера пачки) в переиспользуемые буферы пула; в очередь приема передаются
+memoryview на эти буферы, а буфер возвращается в пул после обработки пакета.
+"""
+
+import errno
+import logging
+import select
+import socket
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+import config
+from osc.ingest import IngestQueue
+from osc.listeners import Listener
+from osc.packet_parser import BytesLike
+
+# Код ошибки Windows для датаграммы, не поместившейся в буфер
+_WSAEMSGSIZE = 10040
+
+class BatchUDPReceiver:
+    """UDP-приемник OSC-пакетов с пулом буферов и чтением пачками"""
+
+    def __init__(self, listeners: List[Listener], ingest: IngestQueue,
+                 batch_size: int = config.OSC_RECV_BATCH_SIZE,
+                 buffer_size: int = config.OSC_RECV_BUFFER_SIZE):
+        """
+        Args:
+            listeners: Открытые приемники; их сокеты переводятся в неблокирующий режим
+            ingest: Очередь приема, получающая пакеты
+            batch_size: Максимальное количество датаграмм с одного сокета за одно пробуждение
+            buffer_size: Размер буфера одной датаграммы; более длинные датаграммы отбрасываются
+        """
+        self.logger = logging.getLogger('ShogunOSC')
+        self.ingest = ingest
+        self.batch_size = batch_size
+        self.buffer_size = buffer_size
+        # Пара сокетов для мгновенного пробуждения при остановке и перенастройке
+        self._wake_reader, self._wake_writer = socket.socketpair()
+        self._wake_reader.setblocking(False)
+        self._running = True
+
+        self._buffers: List[bytearray] = []
+        self._views: Dict[int, memoryview] = {}
+        self._free: Deque[bytearray] = deque()
+        self.set_listeners(listeners)
+        self._scratch = memoryview(bytearray(buffer_size))  # Для вычитывания при пустом пуле
+        # recvmsg_into сообщает об обрезанных датаграммах флагом MSG_TRUNC (нет в Windows)
+        self._use_recvmsg = hasattr(socket.socket, "recvmsg_into") and hasattr(socket, "MSG_TRUNC")
+
+        self.wakeups = 0
+        self.datagrams = 0
+        self.max_batch = 0
+        self.truncated = 0       # Датаграммы длиннее буфера
+        self.pool_exhausted = 0  # Датаграммы, отброшенные из-за отсутствия свободных буферов
+
+    def set_listeners(self, listeners: List[Listener]) -> None:
+        """
+        Заменяет набор приемников; вызывается до запуска или в потоке serve_forever
+
+        Args:
+            listeners: Открытые приемники; их сокеты переводятся в неблокирующий режим
+        """
+        self.listeners = list(listeners)
+        self._by_socket: Dict[socket.socket, Listener] = {}
+        for listener in self.listeners:
+            listener.socket.setblocking(False)
+            self._by_socket[listener.socket] = listener
+        self.resize_pool()
+
+    def resize_pool(self) -> None:
+        """
+        Дополняет пул буферов до размера очереди приема; вызывается до запуска или в потоке serve_forever
+
+        Буферов хватает на заполненную очередь приема и по одной пачке с каждого
+        сокета. При уменьшении очереди пул не сокращается: часть буферов может
+        находиться в очереди, а лишние свободные буферы не мешают приему.
+        """
+        pool_size = self.ingest.max_size + self.batch_size * max(len(self.listeners), 1)
+        while len(self._buffers) < pool_size:
+            buffer = bytearray(self.buffer_size)
+            self._buffers.append(buffer)
+            self._views[id(buffer)] = memoryview(buffer)
+            self._free.append(buffer)
+
+    def _release(self, data: BytesLike, status: str) -> None:
+        """Возвращает буфер обработанного или вытесненного пакета в пул"""
+        self._free.append(data.obj)
+
+    def _receive(self, sock: socket.socket, view: memoryview) -> Tuple[int, Any]:
+        """
+        Читает одну датаграмму из сокета в буфер
+
+        Returns:
+            Tuple[int, Any]: Длина датаграммы (-1 если она обрезана) и адрес отправителя
+        """
+        if self._use_recvmsg:
+            nbytes, _, flags, client_address = sock.recvmsg_into([view])
+            if flags & socket.MSG_TRUNC:
+                return -1, client_address
+            return nbytes, client_address
+        try:
+            return sock.recvfrom_into(view)
+        except OSError as e:
+            if getattr(e, "winerror", None) == _WSAEMSGSIZE or e.errno == errno.EMSGSIZE:
+                return -1, None
+            raise
+
+    def serve_forever(self, poll_interval: float = 0.5,
+                      on_wake: Optional[Callable[[], None]] = None) -> None:
+        """
+        Принимает датаграммы до вызова stop()
+
+        Args:
+            poll_interval: Максимальное время ожидания в select, с
+            on_wake: Вызывается в потоке приема после wake(), например для замены приемников;
+                     перед ним пул буферов дополняется до размера очереди приема
+        """
+        while self._running:
+            sockets = list(self._by_socket) + [self._wake_reader]
+            readable, _, _ = select.select(sockets, [], [], poll_interval)
+            if not self._running:
+                break
+            if readable:
+                self.wakeups += 1
+            for sock in readable:
+                listener = self._by_socket.get(sock)
+                if listener is not None:
+                    self._receive_batch(listener)
+            if self._wake_reader in readable:
+                try:
+                    self._wake_reader.recv(64)
+                except OSError:
+                    pass
+                self.resize_pool()
+                if on_wake is not None:
+                    on_wake()
+
+    def _receive_batch(self, listener: Listener) -> None:
+        """Вычитывает накопившиеся в сокете приемника датаграммы, не больше размера пачки"""
+        sock = listener.socket
+        count = 0
+        for _ in range(self.batch_size):
+            buffer = self._free.popleft() if self._free else None
+            view = self._views[id(buffer)] if buffer is not None else self._scratch
+            try:
+                nbytes, client_address = self._receive(sock, view)
+            except (BlockingIOError, InterruptedError):
+                if buffer is not None:
+                    self._free.appendleft(buffer)
+                break
+            except OSError as e:
+                # Например, ICMP port unreachable от предыдущей отправки в Windows
+                if buffer is not None:
+                    self._free.appendleft(buffer)
+                self.logger.debug(f"Ошибка приема OSC-датаграммы: {e}")
+                continue
+
+            count += 1
+            if nbytes < 0 or buffer is None:
+                if nbytes < 0:
+                    self.truncated += 1
+                else:
+                    self.pool_exhausted += 1
+                if buffer is not None:
+                    self._free.appendleft(buffer)
+                continue
+
+            if not self.ingest.submit(view[:nbytes], client_address, time.perf_counter(), self._release):
+                # Пакет отклонен очередью: буфер остается у приемника
+                self._free.appendleft(buffer)
+
+        self.datagrams += count
+        listener.received += count
+        if count > self.max_batch:
+            self.max_batch = count
+
+    def wake(self) -> None:
+        """Прерывает ожидание select, чтобы serve_forever дополнил пул буферов и вызвал on_wake"""
+        try:
+            self._wake_writer.send(b"\0")
+        except OSError:
+            pass
+
+    def stop(self) -> None:
+        """Прерывает ожидание и завершает serve_forever"""
+        self._running = False
+        try:
+            self._wake_writer.send(b"\0")
+        except OSError:
+            pass
+
+    def close(self) -> None:
+        """Закрывает служебные сокеты (сокеты приемников закрывает их владелец)"""
+        for sock in (self._wake_reader, self._wake_writer):
+            try:
+                sock.close()
+            except OSError:
+                pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Возвращает статистику пакетного приема
+
+        Returns:
+            Dict[str, Any]: Количество пробуждений, датаграмм и отброшенных датаграмм
+        """
+        return {
+            "wakeups": self.wakeups,
+            "datagrams": self.datagrams,
+            "avg_batch": round(self.datagrams / self.wakeups, 2) if self.wakeups else 0,
+            "max_batch": self.max_batch,
+            "free_buffers": len(self._free),
+            "truncated": self.truncated,
+            "pool_exhausted": self.pool_exhausted,
+        }
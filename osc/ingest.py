@@ -0,0 +1,340 @@
+"""
+Ограниченная очередь приема OSC-пакетов с ограничением частоты по источникам.
+Сетевой поток только ставит датаграммы в очередь; разбор и диспетчеризацию
+выполняет один поток-обработчик. Каждый IP-адрес отправителя ограничен
+корзиной токенов, а при переполнении очереди действует выбранная политика отбрасывания.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+import config
+from osc.packet_parser import BytesLike, ParseError
+
+# Итог обработки пакета, передаваемый в on_done
+PACKET_DISPATCHED = "ok"     # Обработчики вызваны
+PACKET_FAILED = "error"      # Ошибка при разборе или обработке
+PACKET_DROPPED = "dropped"   # Вытеснен из очереди
+
+# Элемент очереди: (порядковый номер, данные, адрес отправителя, время приема, уведомление о завершении)
+_Item = Tuple[int, BytesLike, Tuple[str, int], float, Optional[Callable[[BytesLike, str], None]]]
+
+class TokenBucket:
+    """Корзина токенов: средняя частота rate в секунду с допустимым всплеском burst"""
+
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def consume(self, now: float) -> bool:
+        """
+        Забирает один токен
+
+        Args:
+            now: Текущее время (time.monotonic)
+
+        Returns:
+            bool: True если токен был, False если частота превышена
+        """
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
+
+class SourceStats:
+    """Счетчики приема для одного IP-адреса отправителя"""
+
+    __slots__ = ("bucket", "accepted", "rate_limited", "dropped")
+
+    def __init__(self, rate: float, burst: float):
+        self.bucket = TokenBucket(rate, burst)
+        self.accepted = 0
+        self.rate_limited = 0  # Отброшено корзиной токенов
+        self.dropped = 0       # Отброшено при переполнении очереди
+
+    def as_dict(self) -> Dict[str, int]:
+        """Возвращает счетчики в виде словаря"""
+        return {"accepted": self.accepted, "rate_limited": self.rate_limited, "dropped": self.dropped}
+
+class IngestQueue(threading.Thread):
+    """Поток диспетчеризации OSC-пакетов из ограниченной очереди приема"""
+
+    def __init__(self, dispatch: Callable[[BytesLike, Tuple[str, int], float], Any],
+                 is_priority: Optional[Callable[[BytesLike], bool]] = None,
+                 max_size: int = config.OSC_INGEST_QUEUE_SIZE,
+                 drop_policy: str = config.DEFAULT_OSC_DROP_POLICY,
+                 source_rate: float = config.OSC_SOURCE_RATE,
+                 source_burst: float = config.OSC_SOURCE_BURST,
+                 max_sources: int = config.OSC_INGEST_MAX_SOURCES):
+        """
+        Args:
+            dispatch: Обработчик пакета dispatch(data, client_address, received_at);
+                      ошибка разбора сообщается исключением ParseError
+            is_priority: Проверка, содержит ли пакет команду записи (для политики priority)
+            max_size: Максимальная длина очереди
+            drop_policy: Политика при переполнении (config.OSC_DROP_POLICIES)
+            source_rate: Допустимая средняя частота пакетов от одного IP, пакетов/с (0 - без ограничения)
+            source_burst: Допустимый всплеск пакетов от одного IP
+            max_sources: Максимальное количество отслеживаемых IP-адресов
+        """
+        super().__init__(name="OSCIngest", daemon=True)
+        self.logger = logging.getLogger('ShogunOSC')
+        if drop_policy not in config.OSC_DROP_POLICIES:
+            self.logger.warning(f"Неизвестная политика отбрасывания '{drop_policy}', "
+                                f"используется '{config.OSC_DROP_OLDEST}'")
+            drop_policy = config.OSC_DROP_OLDEST
+        self._dispatch = dispatch
+        self._is_priority = is_priority
+        self.max_size = max_size
+        self.drop_policy = drop_policy
+        self.source_rate = source_rate
+        self.source_burst = max(source_burst, 1.0)
+        self.max_sources = max_sources
+        self._condition = threading.Condition()
+        # Команды записи хранятся отдельно, чтобы при переполнении вытеснять только
+        # прочие пакеты; порядковые номера сохраняют исходный порядок обработки
+        self._normal: Deque[_Item] = deque()
+        self._priority: Deque[_Item] = deque()
+        self._sequence = 0
+        self._running = True
+        self._sources: "OrderedDict[str, SourceStats]" = OrderedDict()
+        self.processed = 0
+        self.max_depth = 0
+        # Общие счетчики не уменьшаются при вытеснении адреса из таблицы источников
+        self.rate_limited_total = 0
+        self.dropped_total = 0
+        self._reported = (0, 0)  # Значения счетчиков отбрасывания на момент прошлой сводки
+
+    def configure(self, max_size: int, drop_policy: str, source_rate: float, source_burst: float) -> None:
+        """
+        Применяет новые ограничения без остановки потока
+
+        Пакеты, уже стоящие в очереди сверх нового размера, не отбрасываются:
+        ограничение действует для новых пакетов.
+
+        Args:
+            max_size: Максимальная длина очереди
+            drop_policy: Политика при переполнении (config.OSC_DROP_POLICIES)
+            source_rate: Допустимая средняя частота пакетов от одного IP, пакетов/с (0 - без ограничения)
+            source_burst: Допустимый всплеск пакетов от одного IP
+        """
+        if drop_policy not in config.OSC_DROP_POLICIES:
+            self.logger.warning(f"Неизвестная политика отбрасывания '{drop_policy}', политика не изменена")
+            drop_policy = self.drop_policy
+        with self._condition:
+            self.max_size = max_size
+            self.drop_policy = drop_policy
+            self.source_rate = source_rate
+            self.source_burst = max(source_burst, 1.0)
+            for source in self._sources.values():
+                source.bucket.rate = self.source_rate
+                source.bucket.burst = self.source_burst
+
+    def call_handlers_for_packet(self, data: BytesLike, client_address: Tuple[str, int],
+                                 received_at: Optional[float] = None) -> List:
+        """
+        Ставит пакет в очередь приема
+
+        Сигнатура совпадает с диспетчером python-osc, поэтому очередь может
+        использоваться вместо него в серверах python-osc и в asyncio-движке.
+
+        Args:
+            data: Содержимое пакета
+            client_address: Адрес отправителя
+            received_at: Время приема пакета (time.perf_counter), по умолчанию - текущее
+
+        Returns:
+            List: Пустой список (ответы отправителю не формируются)
+        """
+        if received_at is None:
+            received_at = time.perf_counter()
+        self.submit(data, client_address, received_at)
+        return []
+
+    def submit(self, data: BytesLike, client_address: Tuple[str, int], received_at: float,
+               on_done: Optional[Callable[[BytesLike, str], None]] = None) -> bool:
+        """
+        Ставит пакет в очередь с учетом ограничения частоты и политики отбрасывания
+
+        Args:
+            data: Содержимое пакета (bytes или memoryview на буфер приема)
+            client_address: Адрес отправителя
+            received_at: Время приема пакета (time.perf_counter)
+            on_done: Вызывается как on_done(data, итог) в потоке очереди после обработки или
+                     вытеснения принятого пакета (возврат буфера, подтверждение отправителю).
+                     Для отклоненного пакета не вызывается: итог сообщает возвращаемое значение
+
+        Returns:
+            bool: True если пакет поставлен в очередь
+        """
+        # При других политиках пакет не разбирается вовсе
+        priority = self._check_priority(data)
+
+        with self._condition:
+            source = self._source(client_address[0])
+            # Команды записи при политике priority не ограничиваются по частоте:
+            # повторы одной команды схлопываются дальше в CommandCoalescer
+            if (self.source_rate > 0 and not source.bucket.consume(time.monotonic())
+                    and not priority):
+                source.rate_limited += 1
+                self.rate_limited_total += 1
+                return False
+
+            if len(self._normal) + len(self._priority) >= self.max_size and not self._make_room(priority):
+                source.dropped += 1
+                self.dropped_total += 1
+                return False
+
+            self._sequence += 1
+            item = (self._sequence, data, client_address, received_at, on_done)
+            (self._priority if priority else self._normal).append(item)
+            source.accepted += 1
+            depth = len(self._normal) + len(self._priority)
+            if depth > self.max_depth:
+                self.max_depth = depth
+            self._condition.notify()
+            return True
+
+    def _source(self, ip: str) -> SourceStats:
+        """Возвращает счетчики IP-адреса, вытесняя давно не встречавшиеся адреса"""
+        source = self._sources.get(ip)
+        if source is None:
+            if len(self._sources) >= self.max_sources:
+                self._sources.popitem(last=False)
+            source = SourceStats(self.source_rate, self.source_burst)
+            self._sources[ip] = source
+        else:
+            self._sources.move_to_end(ip)
+        return source
+
+    def _make_room(self, priority: bool) -> bool:
+        """
+        Освобождает место в заполненной очереди согласно политике
+
+        Args:
+            priority: Является ли новый пакет командой записи
+
+        Returns:
+            bool: True если место освобождено, False если новый пакет нужно отбросить
+        """
+        if self.drop_policy == config.OSC_DROP_NEWEST:
+            return False
+        if self.drop_policy == config.OSC_DROP_PRIORITY:
+            # Прочие пакеты не вытесняют друг друга, а команда записи вытесняет самый старый прочий пакет
+            if not priority or not self._normal:
+                return False
+            victim = self._normal.popleft()
+        else:
+            victim = self._pop_oldest()
+        self._count_drop(victim[2][0])
+        if victim[4] is not None:
+            victim[4](victim[1], PACKET_DROPPED)
+        return True
+
+    def _check_priority(self, data: BytesLike) -> bool:
+        """Проверяет, является ли пакет командой записи при политике priority"""
+        return (self.drop_policy == config.OSC_DROP_PRIORITY
+                and self._is_priority is not None and self._is_priority(data))
+
+    def _count_drop(self, ip: str) -> None:
+        """Учитывает вытесненный из очереди пакет"""
+        self.dropped_total += 1
+        source = self._sources.get(ip)
+        if source is not None:
+            source.dropped += 1
+
+    def _pop_oldest(self) -> _Item:
+        """Извлекает самый ранний по порядку поступления пакет"""
+        if not self._priority or (self._normal and self._normal[0][0] < self._priority[0][0]):
+            return self._normal.popleft()
+        return self._priority.popleft()
+
+    def run(self) -> None:
+        """Основной цикл: извлекает пакеты в порядке поступления и передает их диспетчеру"""
+        while True:
+            with self._condition:
+                while self._running and not self._normal and not self._priority:
+                    self._condition.wait()
+                if not self._running:
+                    break
+                _, data, client_address, received_at, on_done = self._pop_oldest()
+
+            status = PACKET_DISPATCHED
+            try:
+                self._dispatch(data, client_address, received_at)
+            except ParseError as e:
+                status = PACKET_FAILED
+                self.logger.debug(f"Не удалось разобрать OSC-пакет от {client_address}: {e}")
+            except Exception as e:
+                status = PACKET_FAILED
+                self.logger.error(f"Ошибка при обработке OSC-пакета от {client_address}: {e}")
+            finally:
+                if on_done is not None:
+                    try:
+                        on_done(data, status)
+                    except Exception as e:
+                        self.logger.error(f"Ошибка при завершении обработки OSC-пакета: {e}")
+            self.processed += 1
+
+    def stop(self) -> None:
+        """Останавливает поток; необработанные пакеты отбрасываются"""
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+
+    @property
+    def depth(self) -> int:
+        """Текущая длина очереди"""
+        return len(self._normal) + len(self._priority)
+
+    def _totals(self) -> Tuple[int, int]:
+        """Суммарные счетчики (ограничено по частоте, отброшено при переполнении)"""
+        return self.rate_limited_total, self.dropped_total
+
+    def take_drop_summary(self) -> Optional[str]:
+        """
+        Формирует сводку отброшенных пакетов с момента предыдущего вызова
+
+        Returns:
+            Optional[str]: Текст сводки или None, если пакеты не отбрасывались
+        """
+        with self._condition:
+            rate_limited, dropped = self._totals()
+            new_limited = rate_limited - self._reported[0]
+            new_dropped = dropped - self._reported[1]
+            self._reported = (rate_limited, dropped)
+            if new_limited <= 0 and new_dropped <= 0:
+                return None
+            noisy = sorted(self._sources.items(),
+                           key=lambda item: item[1].rate_limited + item[1].dropped, reverse=True)[:3]
+        sources = ", ".join(ip for ip, source in noisy if source.rate_limited or source.dropped)
+        return (f"ограничено по частоте: {new_limited}, отброшено при переполнении очереди: "
+                f"{new_dropped} (источники: {sources})")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Возвращает статистику очереди приема
+
+        Returns:
+            Dict[str, Any]: Глубина очереди, счетчики отбрасывания и счетчики по источникам
+        """
+        with self._condition:
+            rate_limited, dropped = self._totals()
+            return {
+                "drop_policy": self.drop_policy,
+                "queue_depth": self.depth,
+                "max_depth": self.max_depth,
+                "processed": self.processed,
+                "rate_limited": rate_limited,
+                "dropped": dropped,
+                "sources": {ip: source.as_dict() for ip, source in self._sources.items()},
+            }
@@ -0,0 +1,160 @@
+"""
+Приемники OSC-сервера: одноадресные порты и группы многоадресной рассылки.
+Все приемники одного сервера передают пакеты в общую очередь приема и
+общую таблицу маршрутов; для каждого приемника ведется счетчик пакетов.
+"""
+
+import errno
+import ipaddress
+import logging
+import socket
+import sys
+import time
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import config
+
+# SO_REUSEPORT позволяет привязать новый сокет к занятому порту до закрытия старого
+# при перенастройке; в Windows опции нет, а SO_REUSEADDR там небезопасен
+REUSE_PORT = hasattr(socket, "SO_REUSEPORT") and sys.platform != "win32"
+
+# В Linux сокет по умолчанию получает пакеты всех групп, в которые вступил любой
+# сокет процесса на этом порту; опция отключает это (в модуле socket константы нет)
+IP_MULTICAST_ALL = getattr(socket, "IP_MULTICAST_ALL", 49) if sys.platform.startswith("linux") else None
+
+class ListenerSpec(NamedTuple):
+    """Описание приемника: адрес и порт, для многоадресной рассылки - группа и интерфейс"""
+    ip: str                      # IP-адрес интерфейса ("0.0.0.0" - все интерфейсы)
+    port: int
+    group: Optional[str] = None  # Группа многоадресной рассылки или None
+
+    @property
+    def name(self) -> str:
+        """Название приемника для журнала и статистики"""
+        if self.group:
+            return f"{self.group}:{self.port}@{self.ip}"
+        return f"{self.ip}:{self.port}"
+
+def parse_listeners(values: Iterable[Any]) -> List[ListenerSpec]:
+    """
+    Разбирает список приемников из настроек
+
+    Поддерживаются записи "ip:port" для одноадресного приема на интерфейсе и
+    "группа:port@ip_интерфейса" (или "группа:port") для многоадресной рассылки.
+
+    Args:
+        values: Приемники из настроек
+
+    Returns:
+        List[ListenerSpec]: Корректные приемники без повторов
+    """
+    listeners = []
+    for value in values:
+        try:
+            address, _, interface = str(value).strip().partition("@")
+            host, port = address.rsplit(":", 1)
+            host = host.strip()
+            if ipaddress.IPv4Address(host).is_multicast:
+                interface = interface.strip() or "0.0.0.0"
+                ipaddress.IPv4Address(interface)
+                spec = ListenerSpec(interface, int(port), host)
+            else:
+                if interface:
+                    raise ValueError("интерфейс указывается только для многоадресной группы")
+                spec = ListenerSpec(host, int(port))
+            if not 0 < spec.port < 65536:
+                raise ValueError("некорректный порт")
+        except ValueError as e:
+            logging.getLogger('ShogunOSC').warning(f"Некорректный приемник OSC '{value}': {e}")
+            continue
+        if spec not in listeners:
+            listeners.append(spec)
+    return listeners
+
+class Listener:
+    """Открытый сокет приемника со счетчиками"""
+
+    def __init__(self, spec: ListenerSpec):
+        """
+        Открывает сокет и при необходимости вступает в группу многоадресной рассылки
+
+        Args:
+            spec: Описание приемника
+
+        Raises:
+            OSError: Если не удалось открыть сокет или вступить в группу
+        """
+        self.spec = spec
+        self.received = 0
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            # Одинаковые опции для обоих видов приемников, чтобы они могли делить порт
+            if REUSE_PORT:
+                self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+            if IP_MULTICAST_ALL is not None:
+                # Только группы, в которые вступил сам сокет: без повторной доставки другим приемникам
+                self.socket.setsockopt(socket.IPPROTO_IP, IP_MULTICAST_ALL, 0)
+            if spec.group:
+                # Привязка к адресу группы отсекает остальной трафик порта; в Windows к адресу
+                # группы привязаться нельзя, и сокет привязывается к адресу интерфейса
+                self.socket.bind((spec.ip if sys.platform == "win32" else spec.group, spec.port))
+                membership = socket.inet_aton(spec.group) + socket.inet_aton(spec.ip)
+                self.socket.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, membership)
+            else:
+                self.socket.bind((spec.ip, spec.port))
+        except OSError:
+            self.socket.close()
+            raise
+
+    @property
+    def name(self) -> str:
+        """Название приемника"""
+        return self.spec.name
+
+    def close(self) -> None:
+        """Закрывает сокет приемника"""
+        try:
+            self.socket.close()
+        except OSError:
+            pass
+
+    def drain(self, submit: Callable[[bytes, Tuple[str, int], float], Any], limit: int) -> int:
+        """
+        Вычитывает датаграммы, уже принятые сокетом, перед его закрытием
+
+        Args:
+            submit: Прием пакета submit(data, client_address, received_at)
+            limit: Максимальное количество датаграмм (отправитель может продолжать слать на старый адрес)
+
+        Returns:
+            int: Количество вычитанных датаграмм
+        """
+        count = 0
+        try:
+            self.socket.setblocking(False)
+            for _ in range(limit):
+                data, client_address = self.socket.recvfrom(config.OSC_MAX_PACKET_SIZE)
+                count += 1
+                submit(data, client_address, time.perf_counter())
+        except (BlockingIOError, InterruptedError):
+            pass
+        except OSError as e:
+            logging.getLogger('ShogunOSC').debug(f"Ошибка при вычитывании приемника {self.name}: {e}")
+        self.received += count
+        return count
+
+def is_address_in_use(error: OSError) -> bool:
+    """Проверяет, что порт занят (в том числе другим приемником этого же сервера)"""
+    return error.errno in (errno.EADDRINUSE, getattr(errno, "WSAEADDRINUSE", None))
+
+def listener_stats(listeners: Iterable[Listener]) -> Dict[str, int]:
+    """
+    Возвращает количество принятых пакетов по приемникам
+
+    Args:
+        listeners: Открытые приемники
+
+    Returns:
+        Dict[str, int]: Название приемника -> количество пакетов
+    """
+    return {listener.name: listener.received for listener in listeners}
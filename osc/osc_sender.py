@@ -0,0 +1,360 @@
+"""
+Неблокирующая отправка OSC-сообщений на несколько адресатов.
+Сообщения ставятся в очередь и отправляются отдельным потоком; сообщения,
+накопившиеся к моменту отправки, упаковываются в OSC-бандлы не больше
+OSC_SEND_BUNDLE_MAX_BYTES, чтобы датаграмма не фрагментировалась.
+"""
+
+import logging
+import queue
+import socket
+import struct
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pythonosc.parsing import osc_types
+
+import config
+
+# Заголовок бандла и временная метка "немедленно" (0x00000000 00000001)
+_BUNDLE_PREFIX = osc_types.write_string("#bundle") + struct.pack(">Q", 1)
+
+class OSCEncoder:
+    """Кодировщик OSC-сообщений с кешем адресов и готовых датаграмм"""
+
+    def __init__(self, cache_size: int = config.OSC_SEND_CACHE_SIZE):
+        self.cache_size = cache_size
+        self._addresses: Dict[str, bytes] = {}
+        self._messages: "OrderedDict[Tuple[str, Tuple[Any, ...]], bytes]" = OrderedDict()
+
+    def encode_message(self, address: str, args: Tuple[Any, ...]) -> bytes:
+        """
+        Кодирует OSC-сообщение, используя ранее закодированные буферы
+
+        Args:
+            address: OSC-адрес
+            args: Аргументы сообщения
+
+        Returns:
+            bytes: Датаграмма OSC-сообщения
+        """
+        key = (address, args)
+        try:
+            dgram = self._messages[key]
+            self._messages.move_to_end(key)
+            return dgram
+        except (KeyError, TypeError):
+            pass
+
+        encoded_address = self._addresses.get(address)
+        if encoded_address is None:
+            encoded_address = osc_types.write_string(address)
+            self._addresses[address] = encoded_address
+
+        type_tags = ","
+        parts = []
+        for arg in args:
+            tag, data = self._encode_arg(arg)
+            type_tags += tag
+            parts.append(data)
+        dgram = encoded_address + osc_types.write_string(type_tags) + b"".join(parts)
+
+        try:
+            self._messages[key] = dgram
+            if len(self._messages) > self.cache_size:
+                self._messages.popitem(last=False)
+        except TypeError:
+            # Нехешируемые аргументы не кешируются
+            pass
+        return dgram
+
+    @staticmethod
+    def _encode_arg(arg: Any) -> Tuple[str, bytes]:
+        """Кодирует один аргумент: возвращает тег типа и данные"""
+        if isinstance(arg, bool):
+            return ("T" if arg else "F"), b""
+        if arg is None:
+            return "N", b""
+        if isinstance(arg, int):
+            return "i", osc_types.write_int(arg)
+        if isinstance(arg, float):
+            return "f", osc_types.write_float(arg)
+        if isinstance(arg, (bytes, bytearray)):
+            return "b", osc_types.write_blob(bytes(arg))
+        return "s", osc_types.write_string(str(arg))
+
+    @staticmethod
+    def encode_bundle(dgrams: List[bytes]) -> bytes:
+        """
+        Упаковывает датаграммы сообщений в бандл с немедленным выполнением
+
+        Args:
+            dgrams: Датаграммы OSC-сообщений
+
+        Returns:
+            bytes: Датаграмма OSC-бандла
+        """
+        parts = [_BUNDLE_PREFIX]
+        for dgram in dgrams:
+            parts.append(struct.pack(">i", len(dgram)))
+            parts.append(dgram)
+        return b"".join(parts)
+
+class DestinationStats:
+    """Счетчики отправки для одного адресата"""
+
+    def __init__(self):
+        self.sent = 0
+        self.errors = 0
+        self.last_error = ""
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Возвращает счетчики в виде словаря"""
+        return {"sent": self.sent, "errors": self.errors, "last_error": self.last_error}
+
+def parse_destinations(values: Iterable[Any]) -> List[Tuple[str, int]]:
+    """
+    Разбирает список адресатов вида "ip:port" или (ip, port)
+
+    Args:
+        values: Адресаты из настроек
+
+    Returns:
+        List[Tuple[str, int]]: Корректные адресаты без повторов
+    """
+    destinations = []
+    for value in values:
+        try:
+            if isinstance(value, str):
+                host, port = value.rsplit(":", 1)
+            else:
+                host, port = value
+            destination = (host.strip(), int(port))
+        except (TypeError, ValueError):
+            logging.getLogger('ShogunOSC').warning(f"Некорректный адресат OSC: {value}")
+            continue
+        if destination not in destinations:
+            destinations.append(destination)
+    return destinations
+
+class OSCSender(threading.Thread):
+    """Поток отправки OSC-сообщений с очередью и рассылкой нескольким адресатам"""
+
+    _STOP = object()  # Маркер остановки потока
+
+    def __init__(self, destinations: List[Tuple[str, int]],
+                 queue_size: int = config.OSC_SEND_QUEUE_SIZE):
+        """
+        Args:
+            destinations: Список адресатов (ip, port)
+            queue_size: Максимальная длина очереди отправки
+        """
+        super().__init__(name="OSCSender", daemon=True)
+        self.logger = logging.getLogger('ShogunOSC')
+        self.encoder = OSCEncoder()
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._destinations = list(destinations)
+        self._stats: Dict[Tuple[str, int], DestinationStats] = {}
+        self.dropped = 0   # Сообщения, отброшенные из-за переполнения очереди
+        self.bundles = 0   # Отправленные бандлы из нескольких сообщений
+        self.replies = 0   # Сообщения, отправленные отдельным адресатам через send_to
+        self.reply_errors = 0
+        self._socket: Optional[socket.socket] = None
+
+    def set_destinations(self, destinations: List[Tuple[str, int]]) -> None:
+        """
+        Заменяет список адресатов
+
+        Args:
+            destinations: Новый список адресатов (ip, port)
+        """
+        with self._lock:
+            if destinations != self._destinations:
+                self._destinations = list(destinations)
+                self.logger.info("Адресаты OSC-уведомлений: " +
+                                 ", ".join(f"{ip}:{port}" for ip, port in destinations))
+
+    def send(self, address: str, *args: Any) -> bool:
+        """
+        Ставит сообщение в очередь отправки всем адресатам без блокировки вызывающего потока
+
+        Args:
+            address: OSC-адрес
+            *args: Аргументы сообщения
+
+        Returns:
+            bool: True если сообщение поставлено в очередь, False если очередь переполнена
+        """
+        return self._put((address, args, None))
+
+    def send_to(self, destination: Tuple[str, int], address: str, *args: Any) -> bool:
+        """
+        Ставит сообщение в очередь отправки одному адресату (например, ответ отправителю команды)
+
+        Args:
+            destination: Адресат (ip, port)
+            address: OSC-адрес
+            *args: Аргументы сообщения
+
+        Returns:
+            bool: True если сообщение поставлено в очередь, False если очередь переполнена
+        """
+        return self._put((address, args, destination))
+
+    def _put(self, item: Tuple[str, Tuple[Any, ...], Optional[Tuple[str, int]]]) -> bool:
+        """Ставит элемент в очередь; при переполнении сообщение отбрасывается"""
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            self.logger.warning(f"Очередь отправки OSC переполнена, сообщение {item[0]} отброшено")
+            return False
+
+    def run(self) -> None:
+        """Основной цикл: забирает все накопившиеся сообщения и отправляет их"""
+        try:
+            self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            # Широковещательная отправка разрешена всегда: адресаты могут меняться на лету
+            self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+            self._socket.bind(('', 0))
+        except OSError as e:
+            self.logger.error(f"Не удалось создать сокет отправки OSC: {e}")
+            return
+
+        try:
+            while True:
+                item = self._queue.get()
+                if item is self._STOP:
+                    break
+
+                batch = [item]
+                stop_requested = False
+                while True:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is self._STOP:
+                        stop_requested = True
+                        break
+                    batch.append(item)
+
+                self._send_batch(batch)
+                if stop_requested:
+                    break
+        finally:
+            self._socket.close()
+
+    def _send_batch(self, batch: List[Tuple[str, Tuple[Any, ...], Optional[Tuple[str, int]]]]) -> None:
+        """
+        Кодирует пачку сообщений и отправляет их адресатам
+
+        Сообщения для всех адресатов упаковываются в общие бандлы, сообщения
+        для отдельного адресата - в бандлы для этого адресата.
+
+        Args:
+            batch: Тройки (адрес, аргументы, адресат или None для всех адресатов)
+        """
+        broadcast = []
+        directed: Dict[Tuple[str, int], List[bytes]] = {}
+        for address, args, destination in batch:
+            try:
+                dgram = self.encoder.encode_message(address, args)
+            except Exception as e:
+                self.logger.error(f"Ошибка кодирования OSC-сообщения {address}: {e}")
+                continue
+            if destination is None:
+                broadcast.append(dgram)
+            else:
+                directed.setdefault(destination, []).append(dgram)
+
+        if broadcast:
+            with self._lock:
+                destinations = list(self._destinations)
+            for packet, count in self._pack(broadcast):
+                for destination in destinations:
+                    self._send_packet(packet, destination, count)
+
+        # Ответы отправителям не заводят счетчиков по адресатам: порты отправителей
+        # часто временные, и таблица росла бы без ограничения
+        for destination, dgrams in directed.items():
+            for packet, count in self._pack(dgrams):
+                try:
+                    self._socket.sendto(packet, destination)
+                    self.replies += count
+                except OSError as e:
+                    self.reply_errors += 1
+                    self.logger.debug(f"Ошибка отправки OSC-ответа на {destination[0]}:{destination[1]}: {e}")
+
+    def _pack(self, dgrams: List[bytes]) -> List[Tuple[bytes, int]]:
+        """
+        Упаковывает сообщения в датаграммы не больше OSC_SEND_BUNDLE_MAX_BYTES
+
+        Сообщения идут по порядку; единственное в датаграмме сообщение
+        отправляется как есть, без бандла (в том числе превышающее предел).
+
+        Returns:
+            List[Tuple[bytes, int]]: Датаграммы и количество сообщений в каждой
+        """
+        max_bytes = config.OSC_SEND_BUNDLE_MAX_BYTES
+        groups: List[List[bytes]] = []
+        size = 0
+        for dgram in dgrams:
+            # Каждое сообщение бандла предваряется 4 байтами длины
+            if not groups or size + 4 + len(dgram) > max_bytes:
+                groups.append([])
+                size = len(_BUNDLE_PREFIX)
+            groups[-1].append(dgram)
+            size += 4 + len(dgram)
+
+        packets = []
+        for group in groups:
+            if len(group) == 1:
+                packets.append((group[0], 1))
+            else:
+                self.bundles += 1
+                packets.append((self.encoder.encode_bundle(group), len(group)))
+        return packets
+
+    def _send_packet(self, packet: bytes, destination: Tuple[str, int], count: int) -> None:
+        """Отправляет датаграмму адресату уведомлений и обновляет его счетчики"""
+        stats = self._stats.setdefault(destination, DestinationStats())
+        try:
+            self._socket.sendto(packet, destination)
+            stats.sent += count
+        except OSError as e:
+            stats.errors += 1
+            stats.last_error = str(e)
+            self.logger.debug(f"Ошибка отправки OSC на {destination[0]}:{destination[1]}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Возвращает статистику отправки
+
+        Returns:
+            Dict[str, Any]: Глубина очереди, отброшенные сообщения и счетчики по адресатам
+        """
+        return {
+            "queue_depth": self._queue.qsize(),
+            "dropped": self.dropped,
+            "bundles": self.bundles,
+            "replies": self.replies,
+            "reply_errors": self.reply_errors,
+            "destinations": {f"{ip}:{port}": stats.as_dict()
+                             for (ip, port), stats in list(self._stats.items())},
+        }
+
+    def stop(self) -> None:
+        """Останавливает поток после отправки уже поставленных сообщений"""
+        try:
+            self._queue.put_nowait(self._STOP)
+        except queue.Full:
+            # Очередь заполнена: освобождаем место под маркер остановки
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                pass
+            self._queue.put_nowait(self._STOP)
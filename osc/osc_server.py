@@ -4,219 +4,889 @@
 
 import asyncio
 import logging
-import threading
+import select
 import socket
+import threading
+import time
 from datetime import datetime
-from typing import Callable, Any, Optional
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from PyQt5.QtCore import QThread, pyqtSignal
 
-from pythonosc import dispatcher, osc_server, udp_client
 import config
+from osc.async_engine import create_udp_endpoint
+from osc.batch_receiver import BatchUDPReceiver
+from osc.ingest import IngestQueue
+from osc.listeners import Listener, ListenerSpec, is_address_in_use, listener_stats
+from osc.osc_sender import OSCSender
+from osc.packet_parser import BytesLike, is_bundle, packet_address, packet_contains
+from osc.routing import is_pattern
+from osc.tcp_transport import OSCTCPServer
+from osc.traffic_stats import UnknownTrafficTable
+from osc.timed_dispatcher import MessageContext, TimedDispatcher
+from shogun.scheduling import check_timetag
+from metrics.latency import CommandTrace, STAGE_DISPATCHED
 
 class OSCServer(QThread):
     """Поток OSC-сервера для приема и обработки OSC-сообщений"""
     message_signal = pyqtSignal(str, str)  # Сигнал для полученного OSC-сообщения (адрес, значение)
     
-    def __init__(self, ip: str = "0.0.0.0", port: int = 5555, shogun_worker = None):
+    def __init__(self, ip: str = "0.0.0.0", port: int = 5555, shogun_worker = None,
+                 engine: str = config.OSC_ENGINE_THREADING,
+                 destinations: Optional[List[Tuple[str, int]]] = None,
+                 listeners: Optional[List[ListenerSpec]] = None,
+                 tcp_port: int = 0):
         super().__init__()
         self.logger = logging.getLogger('ShogunOSC')
         self.ip = ip
         self.port = port
         self.shogun_worker = shogun_worker
+        self.engine = engine
         self.running = True
-        self.dispatcher = dispatcher.Dispatcher()
-        self.server = None
-        self._socket = None
-        self.osc_client = None
+        self.dispatcher = TimedDispatcher()
+        # Основной приемник и дополнительные порты и группы многоадресной рассылки
+        self.listener_specs = self._make_specs(ip, port, listeners)
+        self.listeners: List[Listener] = []
+        # Перенастройка на лету: новые приемники открываются в вызывающем потоке,
+        # а подменяются и вычитываются прежние в потоке движка
+        self._listeners_lock = threading.Lock()
+        self._serving = False
+        self._pending_listeners: Optional[List[Listener]] = None
+        self._deferred_specs: List[ListenerSpec] = []  # Ждут закрытия прежнего приемника на том же порту
+        self.tcp_port = tcp_port
+        self.tcp_server: Optional[OSCTCPServer] = None  # Прием OSC по TCP, если задан порт
+        self._retired_tcp_servers: List[OSCTCPServer] = []  # Обслуживают уже открытые соединения
+        self._loop = None  # Цикл событий asyncio-движка
+        self._transports: Dict[Listener, Any] = {}  # Транспорты asyncio-движка по приемникам
+        self._receiver = None  # Приемник пакетного движка
+        # Пробуждение потокового движка при остановке и перенастройке
+        self._wake_reader, self._wake_writer = socket.socketpair()
+        if destinations is None:
+            destinations = [(config.DEFAULT_OSC_BROADCAST_IP, config.DEFAULT_OSC_BROADCAST_PORT)]
+        self.sender = OSCSender(destinations)  # Поток отправки OSC-уведомлений
+        self.unknown_traffic = UnknownTrafficTable()  # Счетчики сообщений без маршрута
+        self._command_sequence = 0  # Номера команд без идентификатора от отправителя
         
         # Настройка обработчиков OSC-сообщений
         self.setup_dispatcher()
         
-    def setup_dispatcher(self) -> None:
-        """Настройка обработчиков OSC-сообщений"""
-        self.dispatcher.map(config.OSC_START_RECORDING, self.start_recording)
-        self.dispatcher.map(config.OSC_STOP_RECORDING, self.stop_recording)
-        self.dispatcher.map("/SetCaptureName", self.set_capture_name)
+        # Очередь приема: сетевой поток только ставит пакеты в очередь, обработку
+        # выполняет один поток независимо от интенсивности входящего трафика
+        self.ingest = IngestQueue(self.dispatcher.dispatch_packet, self.is_record_packet)
+        
+    @staticmethod
+    def _make_specs(ip: str, port: int, listeners: Optional[List[ListenerSpec]]) -> List[ListenerSpec]:
+        """Составляет список приемников: основной и дополнительные без повторов"""
+        specs = [ListenerSpec(ip, port)]
+        for spec in listeners or []:
+            if spec not in specs:
+                specs.append(spec)
+        return specs
+    
+    def setup_dispatcher(self, extra_routes: Optional[Dict[str, str]] = None) -> None:
+        """
+        Настройка обработчиков OSC-сообщений по таблице маршрутов
+        
+        Args:
+            extra_routes: Дополнительные маршруты {адрес: команда}, по умолчанию - из настроек
+        """
+        # Обработчики команд получают MessageContext: команды записи учитывают временные
+        # метки бандлов для синхронного запуска, все команды подтверждаются отправителю
+        commands = {
+            config.OSC_COMMAND_START_RECORDING: self.start_recording,
+            config.OSC_COMMAND_STOP_RECORDING: self.stop_recording,
+            config.OSC_COMMAND_SET_CAPTURE_NAME: self.set_capture_name,
+            config.OSC_COMMAND_START_RECORDING_NAMED: self.start_recording_named,
+        }
+        record_commands = (config.OSC_COMMAND_START_RECORDING, config.OSC_COMMAND_STOP_RECORDING,
+                           config.OSC_COMMAND_START_RECORDING_NAMED)
+        self._record_handlers = {commands[command] for command in record_commands}
+        # Бандл из нескольких команд выполняется одной операцией (см. handle_bundle)
+        self._handler_commands = {handler: command for command, handler in commands.items()}
+        
+        routes = dict(config.OSC_DEFAULT_ROUTES)
+        routes.update(config.OSC_ROUTES if extra_routes is None else extra_routes)
+        handlers = {}
+        for address, command in routes.items():
+            if command not in commands:
+                self.logger.warning(f"Маршрут OSC {address} указывает на неизвестную команду '{command}'")
+                continue
+            handlers[address] = commands[command]
+        
+        self.dispatcher.replace_timed_routes(handlers)
         self.dispatcher.set_default_handler(self.default_handler)
+        self.dispatcher.set_bundle_handler(self.handle_bundle)
+        
+        # Закодированные адреса команд записи для быстрой проверки бандлов в очереди приема
+        self._record_addresses = [
+            (address.encode() + b"\0") for address, command in routes.items()
+            if command in record_commands and not is_pattern(address)
+        ]
+    
+    def is_record_packet(self, data: BytesLike) -> bool:
+        """
+        Проверяет, содержит ли пакет команду записи, без полного разбора
+        
+        Args:
+            data: Содержимое пакета (bytes или memoryview на буфер приема)
+            
+        Returns:
+            bool: True если пакет адресован команде запуска или остановки записи
+        """
+        if is_bundle(data):
+            return any(packet_contains(data, address) for address in self._record_addresses)
+        address = packet_address(data)
+        if address is None:
+            return False
+        return any(route.handler in self._record_handlers
+                   for route in self.dispatcher.routes.resolve(address))
     
-    def start_recording(self, address: str, *args: Any) -> None:
+    def start_recording(self, address: str, *args: Any, context: Optional[MessageContext] = None) -> None:
         """
         Обработчик команды запуска записи
         
         Args:
             address: OSC-адрес сообщения
-            *args: Аргументы OSC-сообщения
+            *args: Аргументы OSC-сообщения (необязательный первый аргумент - id команды)
+            context: Сведения о доставке (временная метка бандла, время приема)
         """
-        self.logger.info(f"Получена команда OSC: {address} -> Запуск записи")
-        self.message_signal.emit(address, "Запуск записи")
+        trace = self._start_trace("start_recording", context)
+        command_id = self._command_id(args, 0)
+        timetag = context.timetag if context else None
+        if not self._accept_timetag(address, timetag):
+            self._send_ack(context, command_id, address, False)
+            return
+        
+        description = "Запуск записи" + self._describe_timetag(timetag)
+        self.logger.info(f"Получена команда OSC: {address} -> {description}")
+        self.message_signal.emit(address, description)
         
-        if self.shogun_worker and self.shogun_worker.connected:
-            threading.Thread(target=self._run_async_task, 
-                             args=(self.shogun_worker.startcapture,)).start()
+        if self.shogun_worker and self.shogun_worker.accepts_commands():
+            future = self.shogun_worker.submit_command("start_recording", self.shogun_worker.startcapture,
+                                                       timetag, trace=trace, fire_at=timetag)
+            self._ack_when_done(future, context, command_id, address, lambda result: result is not None)
         else:
             self.logger.warning("Не удалось запустить запись: нет подключения к Shogun Live")
+            self._send_ack(context, command_id, address, False)
     
-    def stop_recording(self, address: str, *args: Any) -> None:
+    def stop_recording(self, address: str, *args: Any, context: Optional[MessageContext] = None) -> None:
         """
         Обработчик команды остановки записи
         
         Args:
             address: OSC-адрес сообщения
-            *args: Аргументы OSC-сообщения
+            *args: Аргументы OSC-сообщения (необязательный первый аргумент - id команды)
+            context: Сведения о доставке (временная метка бандла, время приема)
         """
-        self.logger.info(f"Получена команда OSC: {address} -> Остановка записи")
-        self.message_signal.emit(address, "Остановка записи")
+        trace = self._start_trace("stop_recording", context)
+        command_id = self._command_id(args, 0)
+        timetag = context.timetag if context else None
+        if not self._accept_timetag(address, timetag):
+            self._send_ack(context, command_id, address, False)
+            return
+        
+        description = "Остановка записи" + self._describe_timetag(timetag)
+        self.logger.info(f"Получена команда OSC: {address} -> {description}")
+        self.message_signal.emit(address, description)
         
-        if self.shogun_worker and self.shogun_worker.connected:
-            threading.Thread(target=self._run_async_task, 
-                             args=(self.shogun_worker.stopcapture,)).start()
+        if self.shogun_worker and self.shogun_worker.accepts_commands():
+            future = self.shogun_worker.submit_command("stop_recording", self.shogun_worker.stopcapture,
+                                                       timetag, trace=trace, fire_at=timetag)
+            self._ack_when_done(future, context, command_id, address, bool)
         else:
             self.logger.warning("Не удалось остановить запись: нет подключения к Shogun Live")
+            self._send_ack(context, command_id, address, False)
+    
+    def start_recording_named(self, address: str, *args: Any, context: Optional[MessageContext] = None) -> None:
+        """
+        Обработчик команды установки имени захвата и запуска записи
+        
+        Имя устанавливается и запись запускается одной операцией исполнителя с одной
+        проверкой соединения, поэтому запись не может начаться под прежним именем.
+        
+        Args:
+            address: OSC-адрес сообщения
+            *args: Аргументы OSC-сообщения (первый аргумент - имя захвата,
+                   необязательный второй - id команды)
+            context: Сведения о доставке (временная метка бандла, время приема)
+        """
+        command_id = self._command_id(args, 1)
+        if not args:
+            self.logger.warning(f"Получена команда OSC: {address} -> Отсутствует имя захвата")
+            self.message_signal.emit(address, "Ошибка: отсутствует имя захвата")
+            self._send_ack(context, command_id, address, False)
+            return
+        steps = ((config.OSC_COMMAND_SET_CAPTURE_NAME, (str(args[0]),)), (config.OSC_COMMAND_START_RECORDING, ()))
+        self._submit_batch(config.OSC_COMMAND_START_RECORDING_NAMED, steps, address, command_id, context)
+    
+    def handle_bundle(self, commands: List[Tuple[Callable, str, List[Any]]], context: MessageContext) -> bool:
+        """
+        Обработчик бандла из нескольких команд
+        
+        Команды бандла (например, /SetCaptureName и /RecordStartShogunLive) выполняются
+        по порядку одной операцией исполнителя с одной проверкой соединения, а отправитель
+        получает одно подтверждение на адрес OSC_BUNDLE_ACK_ADDRESS. Идентификатор
+        подтверждения - первый id команды, указанный в сообщениях бандла.
+        
+        Args:
+            commands: Обработчики команд, адреса и аргументы сообщений бандла
+            context: Сведения о доставке бандла
+            
+        Returns:
+            bool: False если бандл нужно обработать по сообщениям (в нем есть другие команды)
+        """
+        steps = []
+        command_id = None
+        for handler, address, params in commands:
+            command = self._handler_commands.get(handler)
+            if command == config.OSC_COMMAND_SET_CAPTURE_NAME:
+                if not params:
+                    return False
+                steps.append((command, (str(params[0]),)))
+                id_index = 1
+            elif command in (config.OSC_COMMAND_START_RECORDING, config.OSC_COMMAND_STOP_RECORDING):
+                steps.append((command, ()))
+                id_index = 0
+            else:
+                return False
+            if command_id is None and len(params) > id_index and isinstance(params[id_index], (int, str)) \
+                    and not isinstance(params[id_index], bool):
+                command_id = params[id_index]
+        if command_id is None:
+            command_id = self._command_id((), 0)
+        self._submit_batch("batch", tuple(steps), config.OSC_BUNDLE_ACK_ADDRESS, command_id, context)
+        return True
     
-    def set_capture_name(self, address: str, *args: Any) -> None:
+    def _submit_batch(self, name: str, steps: Tuple[Tuple[str, Tuple[Any, ...]], ...], address: str,
+                      command_id: Any, context: Optional[MessageContext]) -> None:
+        """
+        Ставит пакет команд в очередь исполнителя и подтверждает его одним ответом
+        
+        Args:
+            name: Название операции для статистики
+            steps: Команды пакета (см. ShogunWorker.run_batch)
+            address: OSC-адрес для журнала и подтверждения
+            command_id: Идентификатор команды
+            context: Сведения о доставке
+        """
+        trace = self._start_trace(name, context)
+        timetag = context.timetag if context else None
+        if not self._accept_timetag(address, timetag):
+            self._send_ack(context, command_id, address, False)
+            return
+        
+        description = " -> ".join(self._describe_step(command, args) for command, args in steps)
+        description += self._describe_timetag(timetag)
+        self.logger.info(f"Получена команда OSC: {address} -> {description}")
+        self.message_signal.emit(address, description)
+        
+        if self.shogun_worker and self.shogun_worker.accepts_commands():
+            # Имя захвата устанавливается до временной метки, поэтому пакет ставится в очередь раньше
+            future = self.shogun_worker.submit_command(name, self.shogun_worker.run_batch, steps, timetag,
+                                                       trace=trace, fire_at=timetag,
+                                                       lead=config.SCHEDULE_BATCH_LEAD)
+            self._ack_when_done(future, context, command_id, address, bool)
+        else:
+            self.logger.warning("Не удалось выполнить пакет команд: нет подключения к Shogun Live")
+            self._send_ack(context, command_id, address, False)
+    
+    @staticmethod
+    def _describe_step(command: str, args: Tuple[Any, ...]) -> str:
+        """Описание команды пакета для журнала"""
+        if command == config.OSC_COMMAND_SET_CAPTURE_NAME:
+            return f"Установка имени захвата: '{args[0]}'"
+        if command == config.OSC_COMMAND_START_RECORDING:
+            return "Запуск записи"
+        return "Остановка записи"
+    
+    def _command_id(self, args: Tuple[Any, ...], index: int) -> Any:
+        """
+        Возвращает идентификатор команды для подтверждения
+        
+        Args:
+            args: Аргументы OSC-сообщения
+            index: Позиция необязательного идентификатора от отправителя
+            
+        Returns:
+            Any: Идентификатор отправителя (целое или строка) или порядковый номер команды на сервере
+        """
+        if len(args) > index and isinstance(args[index], (int, str)) and not isinstance(args[index], bool):
+            return args[index]
+        self._command_sequence += 1
+        return self._command_sequence
+    
+    def _ack_when_done(self, future: Future, context: Optional[MessageContext], command_id: Any,
+                       address: str, succeeded: Callable[[Any], bool]) -> None:
+        """
+        Отправляет подтверждение, когда исполнитель завершит команду
+        
+        Повторы, схлопнутые в один вызов Shogun Live, получают общий Future,
+        но каждый отправитель получает собственное подтверждение.
+        
+        Args:
+            future: Результат команды от исполнителя
+            context: Сведения о доставке сообщения
+            command_id: Идентификатор команды
+            address: OSC-адрес команды
+            succeeded: Проверка результата команды на успех
+        """
+        if not config.OSC_COMMAND_ACKS or context is None:
+            return
+        
+        def on_done(done: Future) -> None:
+            try:
+                success = succeeded(done.result())
+            except Exception:
+                success = False
+            self._send_ack(context, command_id, address, success)
+        
+        future.add_done_callback(on_done)
+    
+    def _send_ack(self, context: Optional[MessageContext], command_id: Any, address: str,
+                  success: bool) -> None:
+        """
+        Отправляет подтверждение команды на адрес и порт отправителя
+        
+        Команды, принятые по TCP, подтверждаются в том же соединении, остальные - UDP-датаграммой.
+        Время обработки отсчитывается от приема пакета и для команд с временной меткой
+        включает ожидание момента выполнения.
+        
+        Args:
+            context: Сведения о доставке сообщения
+            command_id: Идентификатор команды
+            address: OSC-адрес команды
+            success: Успешно ли выполнена команда
+        """
+        if not config.OSC_COMMAND_ACKS or context is None or context.client_address is None:
+            return
+        processing_us = int((time.perf_counter() - context.received_at) * 1_000_000)
+        take_name = self.shogun_worker.current_take_name if self.shogun_worker else ""
+        args = (command_id, address, 1 if success else 0, take_name, processing_us)
+        
+        # Соединение могло быть открыто до перенастройки TCP-порта
+        for tcp_server in [self.tcp_server] + self._retired_tcp_servers:
+            if tcp_server is not None and tcp_server.send_to(context.client_address,
+                                                             config.OSC_COMMAND_ACK_ADDRESS, *args):
+                return
+        self.sender.send_to(context.client_address, config.OSC_COMMAND_ACK_ADDRESS, *args)
+    
+    @staticmethod
+    def _start_trace(command: str, context: Optional[MessageContext]) -> CommandTrace:
+        """
+        Создает трассу задержки команды от момента приема пакета
+        
+        Args:
+            command: Название команды
+            context: Сведения о доставке сообщения
+            
+        Returns:
+            CommandTrace: Трасса с отметками приема и диспетчеризации
+        """
+        trace = CommandTrace(command, context.received_at if context else None)
+        trace.mark(STAGE_DISPATCHED)
+        return trace
+    
+    def _accept_timetag(self, address: str, timetag: Optional[float]) -> bool:
+        """
+        Проверяет допустимость временной метки команды
+        
+        Args:
+            address: OSC-адрес сообщения
+            timetag: Временная метка бандла или None
+            
+        Returns:
+            bool: True если команду можно выполнять
+        """
+        error = check_timetag(timetag)
+        if error:
+            self.logger.warning(f"Команда OSC {address} отклонена: {error}")
+            self.message_signal.emit(address, f"Ошибка: {error}")
+            return False
+        return True
+    
+    @staticmethod
+    def _describe_timetag(timetag: Optional[float]) -> str:
+        """Формирует описание запланированного времени для журнала"""
+        if timetag is None:
+            return ""
+        fire_time = datetime.fromtimestamp(timetag).strftime("%H:%M:%S.%f")[:-3]
+        return f" в {fire_time}"
+    
+    def set_capture_name(self, address: str, *args: Any, context: Optional[MessageContext] = None) -> None:
         """
         Обработчик команды установки имени захвата
         
         Args:
             address: OSC-адрес сообщения
-            *args: Аргументы OSC-сообщения (первый аргумент - новое имя)
+            *args: Аргументы OSC-сообщения (первый аргумент - новое имя,
+                   необязательный второй - id команды)
+            context: Сведения о доставке (адрес отправителя, время приема)
         """
+        command_id = self._command_id(args, 1)
         if not args:
             self.logger.warning(f"Получена команда OSC: {address} -> Отсутствует имя захвата")
             self.message_signal.emit(address, "Ошибка: отсутствует имя захвата")
+            self._send_ack(context, command_id, address, False)
             return
             
         new_name = str(args[0])
         self.logger.info(f"Получена команда OSC: {address} -> Установка имени захвата: '{new_name}'")
         self.message_signal.emit(address, f"Установка имени захвата: '{new_name}'")
         
-        if self.shogun_worker and self.shogun_worker.connected:
-            async def set_name_task():
-                return await self.shogun_worker.set_capture_name(new_name)
-                
-            threading.Thread(target=self._run_async_task, 
-                             args=(set_name_task,)).start()
+        if self.shogun_worker and self.shogun_worker.accepts_commands():
+            future = self.shogun_worker.submit_command("set_capture_name",
+                                                       self.shogun_worker.set_capture_name, new_name)
+            self._ack_when_done(future, context, command_id, address, bool)
         else:
             self.logger.warning("Не удалось установить имя захвата: нет подключения к Shogun Live")
+            self._send_ack(context, command_id, address, False)
     
     def default_handler(self, address: str, *args: Any) -> None:
         """
         Обработчик для неизвестных OSC-сообщений
         
+        Сообщение только учитывается в таблице неизвестного трафика; в GUI
+        попадает периодическая сводка (см. take_unknown_summary).
+        
         Args:
             address: OSC-адрес сообщения
             *args: Аргументы OSC-сообщения
         """
-        args_str = ", ".join(str(arg) for arg in args) if args else "нет аргументов"
-        self.logger.debug(f"Получено неизвестное OSC-сообщение: {address} -> {args_str}")
-        self.message_signal.emit(address, args_str)
+        self.unknown_traffic.add(address, args)
     
-    def _run_async_task(self, coro_func: Callable) -> Any:
+    def take_unknown_summary(self) -> Optional[str]:
         """
-        Запускает асинхронную функцию в отдельном цикле событий
+        Возвращает сводку неизвестного трафика с момента предыдущего вызова
         
-        Args:
-            coro_func: Асинхронная функция для выполнения
-            
         Returns:
-            Any: Результат выполнения функции
+            Optional[str]: Текст сводки или None, если неизвестных сообщений не было
         """
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            return loop.run_until_complete(coro_func())
-        finally:
-            loop.close()
+        summary = self.unknown_traffic.take_summary()
+        if summary:
+            self.logger.debug(f"Неизвестные OSC-сообщения: {summary}")
+        return summary
     
     def send_osc_message(self, address: str, value: Any) -> bool:
         """
-        Отправляет OSC-сообщение
+        Ставит OSC-сообщение в очередь отправки всем адресатам
+        
+        Вызов не блокирует вызывающий поток: отправку выполняет поток OSCSender.
         
         Args:
             address: OSC-адрес сообщения
             value: Значение для отправки
             
         Returns:
-            bool: True если сообщение отправлено успешно, иначе False
+            bool: True если сообщение поставлено в очередь, иначе False
         """
-        try:
-            # Создаем клиент для отправки, если еще не создан
-            if not self.osc_client:
-                # Используем настройки из конфигурации
-                target_ip = config.DEFAULT_OSC_BROADCAST_IP
-                target_port = config.DEFAULT_OSC_BROADCAST_PORT
-                
-                # Создаем клиент с обычным сокетом вместо широковещательного
-                # для избежания ошибок доступа
-                if target_ip == "255.255.255.255":
-                    # Создаем собственный сокет с поддержкой широковещательных сообщений
-                    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-                    sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
-                    # Привязываем к любому доступному порту
-                    sock.bind(('', 0))
-                    # Создаем клиент с нашим сокетом
-                    self.osc_client = udp_client.SimpleUDPClient(target_ip, target_port, sock)
-                else:
-                    # Для обычного IP используем стандартный клиент
-                    self.osc_client = udp_client.SimpleUDPClient(target_ip, target_port)
-                
-                self.logger.info(f"Создан OSC-клиент для отправки сообщений на {target_ip}:{target_port}")
-                
-            # Отправляем сообщение
-            self.osc_client.send_message(address, value)
-            self.logger.debug(f"Отправлено OSC-сообщение: {address} -> {value}")
+        if self.sender.send(address, value):
+            self.logger.debug(f"OSC-сообщение поставлено в очередь отправки: {address} -> {value}")
             return True
-        except Exception as e:
-            self.logger.error(f"Ошибка отправки OSC-сообщения: {e}")
-            return False
+        return False
+    
+    def take_drop_summary(self) -> Optional[str]:
+        """
+        Возвращает сводку отброшенных входящих пакетов с момента предыдущего вызова
+        
+        Returns:
+            Optional[str]: Текст сводки или None, если пакеты не отбрасывались
+        """
+        summary = self.ingest.take_drop_summary()
+        if summary:
+            self.logger.warning(f"Входящие OSC-пакеты отброшены: {summary}")
+        return summary
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Возвращает статистику приема, маршрутизации и отправки OSC-сообщений
+        
+        Returns:
+            Dict[str, Any]: Разделы статистики для окна диагностики
+        """
+        return {
+            "Прием OSC": self.ingest.get_stats(),
+            "Приемники OSC": listener_stats(self.listeners),
+            **({"Прием OSC по TCP": self.tcp_server.get_stats()} if self.tcp_server else {}),
+            **({"Пакетный прием OSC": self._receiver.get_stats()} if self._receiver else {}),
+            "Маршрутизация OSC": self.dispatcher.get_stats(),
+            "Неизвестный OSC-трафик": self.unknown_traffic.get_stats(),
+            "Отправка OSC": self.sender.get_stats(),
+        }
+    
+    def set_destinations(self, destinations: List[Tuple[str, int]]) -> None:
+        """
+        Обновляет список адресатов OSC-уведомлений
+        
+        Args:
+            destinations: Список адресатов (ip, port)
+        """
+        self.sender.set_destinations(destinations)
+    
+    def set_routes(self, routes: Dict[str, str]) -> None:
+        """
+        Заменяет дополнительные маршруты без остановки сервера
+        
+        Args:
+            routes: Дополнительные маршруты {OSC-адрес или шаблон: команда}
+        """
+        self.setup_dispatcher(routes)
+        self.logger.info("Маршруты OSC обновлены")
+    
+    def configure_ingest(self, max_size: int, drop_policy: str, source_rate: float, source_burst: float) -> None:
+        """
+        Применяет ограничения очереди приема без остановки сервера
+        
+        Пакетный движок после этого дополняет пул буферов в своем потоке,
+        чтобы пул вмещал увеличенную очередь.
+        
+        Args:
+            max_size: Максимальная длина очереди
+            drop_policy: Политика при переполнении (config.OSC_DROP_POLICIES)
+            source_rate: Допустимая средняя частота пакетов от одного IP, пакетов/с (0 - без ограничения)
+            source_burst: Допустимый всплеск пакетов от одного IP
+        """
+        self.ingest.configure(max_size, drop_policy, source_rate, source_burst)
+        receiver = self._receiver
+        if receiver is not None:
+            receiver.wake()
+    
+    def reconfigure(self, ip: str, port: int, listeners: Optional[List[ListenerSpec]] = None,
+                    tcp_port: int = 0) -> bool:
+        """
+        Перенастраивает приемники работающего сервера без потери пакетов
+        
+        Неизмененные приемники продолжают работать на своих сокетах. Новые сокеты
+        открываются до закрытия прежних (на одном порту - с SO_REUSEPORT, где он есть),
+        после чего поток движка начинает их обслуживать, а прежние сокеты вычитывает
+        и закрывает. Если порт занят прежним приемником, а SO_REUSEPORT недоступен,
+        новый сокет открывается сразу после закрытия прежнего.
+        
+        Args:
+            ip: IP-адрес основного приемника
+            port: Порт основного приемника
+            listeners: Дополнительные приемники
+            tcp_port: TCP-порт приема OSC (0 - отключен)
+            
+        Returns:
+            bool: False если основной приемник открыть не удалось и настройки не применены
+        """
+        specs = self._make_specs(ip, port, listeners)
+        if specs == self.listener_specs and tcp_port == self.tcp_port:
+            return True
+        with self._listeners_lock:
+            if self._serving:
+                base = self._pending_listeners if self._pending_listeners is not None else self.listeners
+                current = {listener.spec: listener for listener in base}
+                retiring_ports = {listener.spec.port for listener in self.listeners
+                                  if listener.spec not in specs}
+                new_listeners, deferred, opened = [], [], []
+                for spec in specs:
+                    if spec in current:
+                        new_listeners.append(current[spec])
+                        continue
+                    try:
+                        listener = Listener(spec)
+                    except OSError as e:
+                        if is_address_in_use(e) and spec.port in retiring_ports:
+                            deferred.append(spec)
+                            continue
+                        self.logger.error(f"Не удалось открыть приемник OSC {spec.name}: {e}")
+                        self.message_signal.emit("ERROR", f"Не удалось открыть приемник OSC {spec.name}: {e}")
+                        if spec == specs[0]:
+                            # Без основного приемника прежняя конфигурация остается в силе
+                            for listener in opened:
+                                listener.close()
+                            return False
+                        continue
+                    opened.append(listener)
+                    new_listeners.append(listener)
+                
+                # Приемники предыдущей, еще не примененной перенастройки
+                if self._pending_listeners is not None:
+                    for listener in self._pending_listeners:
+                        if listener not in new_listeners and listener not in self.listeners:
+                            listener.close()
+                self._pending_listeners = new_listeners
+                self._deferred_specs = deferred
+            self.ip, self.port = ip, port
+            self.listener_specs = specs
+            serving = self._serving
+        
+        if serving:
+            self._wake_engine()
+        self._reconfigure_tcp(ip, tcp_port)
+        return True
+    
+    def _wake_engine(self) -> None:
+        """Просит поток движка применить новый набор приемников"""
+        if self.engine == config.OSC_ENGINE_ASYNCIO:
+            loop = self._loop
+            if loop is not None and not loop.is_closed():
+                try:
+                    loop.call_soon_threadsafe(self._apply_listener_changes)
+                except RuntimeError:
+                    pass
+        elif self.engine == config.OSC_ENGINE_BATCH:
+            receiver = self._receiver
+            if receiver is not None:
+                receiver.wake()
+        else:
+            self._wake_threading()
+    
+    def _wake_threading(self) -> None:
+        """Прерывает ожидание select потокового движка"""
+        try:
+            self._wake_writer.send(b"\0")
+        except OSError:
+            pass
+    
+    def _apply_listener_changes(self) -> None:
+        """Подменяет приемники в потоке движка; прежние сокеты вычитываются и закрываются"""
+        with self._listeners_lock:
+            pending, deferred = self._pending_listeners, self._deferred_specs
+            self._pending_listeners, self._deferred_specs = None, []
+            if pending is None:
+                return
+            retired = [listener for listener in self.listeners if listener not in pending]
+            added = [listener for listener in pending if listener not in self.listeners]
+            self.listeners = pending
+        
+        for listener in added:
+            self._register_listener(listener)
+        drained = 0
+        for listener in retired:
+            drained += listener.drain(self.ingest.submit, self.ingest.max_size)
+            transport = self._transports.pop(listener, None)
+            if transport is not None:
+                transport.close()
+            listener.close()
+        
+        # Порт освободился только сейчас: SO_REUSEPORT недоступен
+        reopened = self._open_listeners(deferred) if deferred else []
+        with self._listeners_lock:
+            self.listeners = self.listeners + reopened
+        for listener in reopened:
+            self._register_listener(listener)
+        if self._receiver is not None:
+            self._receiver.set_listeners(self.listeners)
+        
+        self.logger.info(f"Приемники OSC перенастроены: {self._describe_listeners()} "
+                         f"(вычитано из закрытых сокетов: {drained})")
+    
+    def _register_listener(self, listener: Listener) -> None:
+        """Начинает обслуживать приемник движком asyncio (остальные движки читают self.listeners)"""
+        if self.engine == config.OSC_ENGINE_ASYNCIO and self._loop is not None:
+            self._loop.create_task(self._add_endpoint(listener))
+    
+    async def _add_endpoint(self, listener: Listener) -> None:
+        """Создает транспорт asyncio для приемника"""
+        try:
+            transport, _ = await create_udp_endpoint(self._loop, listener, self.ingest)
+        except OSError as e:
+            self.logger.error(f"Не удалось запустить прием на {listener.name}: {e}")
+            return
+        if listener in self.listeners:
+            self._transports[listener] = transport
+        else:
+            # Приемник успели заменить
+            transport.close()
+    
+    def _reconfigure_tcp(self, ip: str, tcp_port: int) -> None:
+        """
+        Переносит прием OSC по TCP на новый адрес
+        
+        Новый сервер запускается до остановки прежнего; прежний перестает принимать
+        соединения, но обслуживает уже открытые, пока клиенты их не закроют.
+        """
+        self.tcp_port = tcp_port
+        current = self.tcp_server
+        if not self.isRunning():
+            return
+        if current is not None and current.error is None and (current.ip, current.port) == (ip, tcp_port):
+            return
+        if current is None and not tcp_port:
+            return
+        
+        new_server = None
+        if tcp_port:
+            new_server = OSCTCPServer(ip, tcp_port, self.ingest)
+            new_server.start()
+            new_server.ready.wait(config.OSC_TCP_START_TIMEOUT)
+            if new_server.error:
+                self.message_signal.emit("ERROR", f"Не удалось запустить OSC/TCP-сервер: {new_server.error}")
+                return
+        
+        self._retired_tcp_servers = [server for server in self._retired_tcp_servers if server.is_alive()]
+        if current is not None:
+            current.retire()
+            self._retired_tcp_servers.append(current)
+        self.tcp_server = new_server
     
     def run(self) -> None:
-        """Запуск OSC-сервера"""
+        """Запуск OSC-сервера выбранным движком"""
+        self.sender.start()
+        self.ingest.start()
+        self._start_tcp_server()
+        with self._listeners_lock:
+            self.listeners = self._open_listeners(self.listener_specs)
+            self._serving = bool(self.listeners)
+        
         try:
-            self.logger.info(f"Запуск OSC-сервера на {self.ip}:{self.port}")
-            
-            # Создаем сервер с обработкой ошибок
+            if not self.listeners:
+                self.message_signal.emit("ERROR", "Не удалось запустить OSC-сервер: нет доступных приемников")
+            elif self.engine == config.OSC_ENGINE_ASYNCIO:
+                self._serve_asyncio()
+            elif self.engine == config.OSC_ENGINE_BATCH:
+                self._serve_batch()
+            else:
+                self._serve_threading()
+        finally:
+            with self._listeners_lock:
+                self._serving = False
+                unused = [listener for listener in self._pending_listeners or []
+                          if listener not in self.listeners]
+                self._pending_listeners = None
+            for listener in self.listeners + unused:
+                listener.close()
+            for sock in (self._wake_reader, self._wake_writer):
+                sock.close()
+            # Сигнал finished означает, что все порты сервера освобождены (см. MainWindow.start_osc_server)
+            for tcp_server in [self.tcp_server] + self._retired_tcp_servers:
+                if tcp_server and tcp_server.is_alive():
+                    tcp_server.join(config.OSC_TCP_START_TIMEOUT)
+    
+    def _start_tcp_server(self) -> None:
+        """Запускает прием OSC по TCP на том же IP-адресе, если задан TCP-порт"""
+        if not self.tcp_port:
+            return
+        self.tcp_server = OSCTCPServer(self.ip, self.tcp_port, self.ingest)
+        self.tcp_server.start()
+        self.tcp_server.ready.wait(config.OSC_TCP_START_TIMEOUT)
+        if self.tcp_server.error:
+            self.message_signal.emit("ERROR", f"Не удалось запустить OSC/TCP-сервер: {self.tcp_server.error}")
+    
+    def _open_listeners(self, specs: List[ListenerSpec]) -> List[Listener]:
+        """
+        Открывает сокеты приемников
+        
+        Приемник, который не удалось открыть, пропускается: остальные продолжают работать.
+        
+        Args:
+            specs: Описания приемников
+        
+        Returns:
+            List[Listener]: Открытые приемники
+        """
+        listeners = []
+        for spec in specs:
             try:
-                self.server = osc_server.ThreadingOSCUDPServer((self.ip, self.port), self.dispatcher)
-                self._socket = self.server.socket
-            except socket.error as e:
-                self.logger.error(f"Не удалось создать OSC-сервер: {e}")
-                # Сигнализируем об ошибке
-                self.message_signal.emit("ERROR", f"Не удалось запустить OSC-сервер: {e}")
-                return
+                listeners.append(Listener(spec))
+            except OSError as e:
+                self.logger.error(f"Не удалось открыть приемник OSC {spec.name}: {e}")
+                self.message_signal.emit("ERROR", f"Не удалось открыть приемник OSC {spec.name}: {e}")
+        return listeners
+    
+    def _describe_listeners(self) -> str:
+        """Перечисляет открытые приемники для журнала"""
+        return ", ".join(listener.name for listener in self.listeners)
+    
+    def _serve_asyncio(self) -> None:
+        """Прием OSC-сообщений со всех приемников в одном цикле событий asyncio"""
+        try:
+            self.logger.info(f"Запуск OSC-сервера (asyncio) на {self._describe_listeners()}")
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
             
-            # Устанавливаем таймаут для сокета, чтобы можно было корректно остановить сервер
-            self._socket.settimeout(0.5)
+            try:
+                for listener in self.listeners:
+                    transport, _ = self._loop.run_until_complete(
+                        create_udp_endpoint(self._loop, listener, self.ingest))
+                    self._transports[listener] = transport
+                # Перенастройка, запрошенная до создания цикла
+                self._apply_listener_changes()
+                
+                # Сервер мог быть остановлен до запуска цикла
+                if self.running:
+                    self._loop.run_forever()
+            finally:
+                for transport in self._transports.values():
+                    transport.close()
+                self._transports.clear()
+                # Даем транспортам закрыть сокеты
+                self._loop.run_until_complete(asyncio.sleep(0))
+        except Exception as e:
+            self.logger.error(f"Критическая ошибка OSC-сервера: {e}")
+        finally:
+            if self._loop:
+                self._loop.close()
+    
+    def _serve_batch(self) -> None:
+        """Прием OSC-сообщений со всех приемников пачками в предвыделенные буферы"""
+        try:
+            self.logger.info(f"Запуск OSC-сервера (пакетный прием) на {self._describe_listeners()}")
+            self._receiver = BatchUDPReceiver(self.listeners, self.ingest)
+            try:
+                # Перенастройка, запрошенная до создания приемника
+                self._apply_listener_changes()
+                # Сервер мог быть остановлен до создания приемника
+                if self.running:
+                    self._receiver.serve_forever(on_wake=self._apply_listener_changes)
+            finally:
+                self._receiver.close()
+        except Exception as e:
+            self.logger.error(f"Критическая ошибка OSC-сервера: {e}")
+    
+    def _serve_threading(self) -> None:
+        """Прием OSC-сообщений со всех приемников циклом select в потоке сервера"""
+        try:
+            self.logger.info(f"Запуск OSC-сервера на {self._describe_listeners()}")
             
-            # Запускаем сервер с возможностью остановки
             while self.running:
-                try:
-                    self.server.handle_request()
-                except socket.timeout:
-                    # Таймаут сокета - нормальная ситуация, продолжаем работу
+                sockets = {listener.socket: listener for listener in self.listeners}
+                # Остановка и перенастройка прерывают ожидание через сокет пробуждения
+                readable, _, _ = select.select(list(sockets) + [self._wake_reader], [], [], 0.5)
+                if self._wake_reader in readable:
+                    self._wake_reader.recv(64)
+                    if self.running:
+                        self._apply_listener_changes()
                     continue
-                except Exception as e:
-                    if self.running:  # Логируем ошибку только если сервер должен работать
-                        self.logger.error(f"Ошибка при обработке OSC-запроса: {e}")
+                for sock in readable:
+                    listener = sockets[sock]
+                    try:
+                        data, client_address = sock.recvfrom(config.OSC_MAX_PACKET_SIZE)
+                    except OSError as e:
+                        if self.running:  # Логируем ошибку только если сервер должен работать
+                            self.logger.debug(f"Ошибка приема на {listener.name}: {e}")
+                        continue
+                    listener.received += 1
+                    self.ingest.submit(data, client_address, time.perf_counter())
         except Exception as e:
             self.logger.error(f"Критическая ошибка OSC-сервера: {e}")
     
     def stop(self) -> None:
         """Остановка OSC-сервера"""
         self.running = False
-        # Закрываем сервер если он создан
-        if self.server:
+        # Останавливаем цикл событий asyncio-движка без ожидания таймаута
+        if self._loop and not self._loop.is_closed():
             try:
-                self.server.server_close()
-            except Exception as e:
-                self.logger.error(f"Ошибка при закрытии OSC-сервера: {e}")
+                self._loop.call_soon_threadsafe(self._loop.stop)
+            except RuntimeError:
+                # Цикл уже закрыт в потоке сервера
+                pass
         
-        # Закрываем клиент для отправки сообщений
-        if self.osc_client and hasattr(self.osc_client, '_sock'):
-            try:
-                self.osc_client._sock.close()
-            except Exception as e:
-                self.logger.error(f"Ошибка при закрытии OSC-клиента: {e}")
+        # Прерываем ожидание пакетного приемника и потокового движка
+        if self._receiver:
+            self._receiver.stop()
+        self._wake_threading()
+        
+        # Закрываем TCP-соединения, в том числе оставшиеся от прежнего TCP-порта
+        for tcp_server in [self.tcp_server] + self._retired_tcp_servers:
+            if tcp_server:
+                tcp_server.stop()
+        
+        # Останавливаем потоки обработки входящих и отправки исходящих сообщений
+        self.ingest.stop()
+        self.sender.stop()
                 
         self.logger.info("OSC-сервер остановлен")
 
@@ -0,0 +1,192 @@
+"""
+Разбор OSC-пакетов без копирования данных.
+Поля читаются напрямую из буфера приема по смещениям (struct.unpack_from, find),
+поэтому разбор работает с memoryview на переиспользуемые буферы. Редкие типы
+аргументов, которые здесь не поддерживаются, разбираются средствами python-osc.
+"""
+
+import struct
+from typing import Any, List, Optional, Tuple, Union
+
+from pythonosc import osc_packet
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+# Разобранное сообщение: (адрес, аргументы, время выполнения бандла или 0.0 - немедленно)
+ParsedMessage = Tuple[str, List[Any], float]
+
+_BUNDLE_HEADER = b"#bundle\0"
+_NTP_DELTA = 2208988800  # Секунды между эпохами NTP (1900) и Unix (1970)
+_IMMEDIATELY = 1         # Временная метка OSC "немедленно"
+
+_INT32 = struct.Struct(">i")
+_INT64 = struct.Struct(">q")
+_FLOAT = struct.Struct(">f")
+_DOUBLE = struct.Struct(">d")
+_TIMETAG = struct.Struct(">Q")
+
+class ParseError(Exception):
+    """Некорректный OSC-пакет"""
+
+class _Unsupported(Exception):
+    """Тип аргумента, не поддерживаемый быстрым разбором"""
+
+def _buffer(data: BytesLike) -> Tuple[Union[bytes, bytearray], int]:
+    """
+    Возвращает буфер с методом find и длину данных
+
+    memoryview должен начинаться с начала буфера (срез вида buffer[:length]),
+    как это делает пакетный прием в osc.batch_receiver.
+    """
+    if isinstance(data, memoryview):
+        return data.obj, data.nbytes
+    return data, len(data)
+
+def _read_string(buf: Union[bytes, bytearray], index: int, end: int) -> Tuple[str, int]:
+    """Читает строку OSC, выровненную по 4 байтам"""
+    nul = buf.find(b"\0", index, end)
+    if nul < 0:
+        raise ParseError("Строка OSC без завершающего нуля")
+    value = buf[index:nul].decode("utf-8", "replace")
+    return value, (nul + 4) & ~3
+
+def packet_address(data: BytesLike) -> Optional[str]:
+    """
+    Читает адрес OSC-сообщения без разбора аргументов
+
+    Args:
+        data: Содержимое пакета
+
+    Returns:
+        Optional[str]: Адрес сообщения или None для бандла и некорректных пакетов
+    """
+    buf, end = _buffer(data)
+    if end < 4 or buf[0] != 0x2F:  # "/"
+        return None
+    nul = buf.find(b"\0", 0, end)
+    if nul <= 0:
+        return None
+    return buf[:nul].decode("ascii", "replace")
+
+def is_bundle(data: BytesLike) -> bool:
+    """Проверяет, является ли пакет OSC-бандлом"""
+    buf, end = _buffer(data)
+    return end >= 16 and buf.startswith(_BUNDLE_HEADER)
+
+def packet_contains(data: BytesLike, needle: bytes) -> bool:
+    """Проверяет наличие последовательности байтов в пакете без копирования"""
+    buf, end = _buffer(data)
+    return buf.find(needle, 0, end) >= 0
+
+def parse_packet(data: BytesLike) -> List[ParsedMessage]:
+    """
+    Разбирает OSC-сообщение или бандл (включая вложенные бандлы)
+
+    Args:
+        data: Содержимое пакета: bytes, bytearray или memoryview на буфер приема
+
+    Returns:
+        List[ParsedMessage]: Сообщения пакета в порядке следования
+
+    Raises:
+        ParseError: Если пакет некорректен
+    """
+    buf, end = _buffer(data)
+    messages: List[ParsedMessage] = []
+    try:
+        _parse_element(buf, 0, end, 0.0, messages)
+    except _Unsupported:
+        # Редкие типы аргументов разбирает python-osc (с копированием пакета)
+        return _parse_with_python_osc(bytes(buf[:end]))
+    except (struct.error, IndexError) as e:
+        raise ParseError(f"Некорректный OSC-пакет: {e}")
+    return messages
+
+def _parse_element(buf: Union[bytes, bytearray], start: int, end: int, timetag: float,
+                   messages: List[ParsedMessage]) -> None:
+    """Разбирает элемент пакета: сообщение или бандл"""
+    if buf.startswith(_BUNDLE_HEADER, start, end):
+        raw_time = _TIMETAG.unpack_from(buf, start + 8)[0]
+        if raw_time != _IMMEDIATELY:
+            timetag = (raw_time >> 32) - _NTP_DELTA + (raw_time & 0xFFFFFFFF) / 4294967296.0
+        index = start + 16
+        while index < end:
+            size = _INT32.unpack_from(buf, index)[0]
+            index += 4
+            if size <= 0 or size % 4 or index + size > end:
+                raise ParseError(f"Некорректный размер элемента бандла: {size}")
+            _parse_element(buf, index, index + size, timetag, messages)
+            index += size
+        return
+
+    if start >= end or buf[start] != 0x2F:  # "/"
+        raise ParseError("OSC-сообщение должно начинаться с '/'")
+    address, index = _read_string(buf, start, end)
+    if index >= end:
+        messages.append((address, [], timetag))
+        return
+    if buf[index] != 0x2C:  # ","
+        raise ParseError("Строка типов OSC должна начинаться с ','")
+    # Строка типов читается без ведущей запятой; выравнивание считается от начала буфера
+    type_tags, index = _read_string(buf, index + 1, end)
+    messages.append((address, _parse_args(buf, index, end, type_tags), timetag))
+
+def _parse_args(buf: Union[bytes, bytearray], index: int, end: int, type_tags: str) -> List[Any]:
+    """Читает аргументы сообщения по строке типов"""
+    params: List[Any] = []
+    stack = [params]
+    for tag in type_tags:
+        if tag == "i":
+            value = _INT32.unpack_from(buf, index)[0]
+            index += 4
+        elif tag == "f":
+            value = _FLOAT.unpack_from(buf, index)[0]
+            index += 4
+        elif tag == "s" or tag == "S":
+            value, index = _read_string(buf, index, end)
+        elif tag == "d":
+            value = _DOUBLE.unpack_from(buf, index)[0]
+            index += 8
+        elif tag == "h":
+            value = _INT64.unpack_from(buf, index)[0]
+            index += 8
+        elif tag == "b":
+            size = _INT32.unpack_from(buf, index)[0]
+            index += 4
+            if size < 0 or index + size > end:
+                raise ParseError("Некорректный размер blob")
+            value = bytes(buf[index:index + size])
+            index += (size + 3) & ~3
+        elif tag == "T":
+            value = True
+        elif tag == "F":
+            value = False
+        elif tag == "N":
+            value = None
+        elif tag == "[":
+            array: List[Any] = []
+            stack[-1].append(array)
+            stack.append(array)
+            continue
+        elif tag == "]":
+            if len(stack) < 2:
+                raise ParseError("Лишняя закрывающая скобка в строке типов")
+            stack.pop()
+            continue
+        else:
+            raise _Unsupported(tag)
+        if index > end:
+            raise ParseError("Аргументы выходят за границы пакета")
+        stack[-1].append(value)
+    if len(stack) != 1:
+        raise ParseError("Незакрытый массив в строке типов")
+    return params
+
+def _parse_with_python_osc(data: bytes) -> List[ParsedMessage]:
+    """Разбор пакета средствами python-osc"""
+    try:
+        packet = osc_packet.OscPacket(data)
+    except osc_packet.ParseError as e:
+        raise ParseError(str(e))
+    return [(timed.message.address, list(timed.message.params), timed.time)
+            for timed in packet.messages]
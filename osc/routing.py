@@ -0,0 +1,176 @@
+"""
+Таблица маршрутизации OSC-адресов.
+Точные адреса разрешаются одним обращением к словарю, шаблоны (`/Shogun/*/Start`)
+компилируются в регулярные выражения один раз, а результат сопоставления
+для каждого входящего адреса кешируется в LRU-кеше, включая отсутствие маршрута.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Generic, List, Pattern, Tuple, TypeVar
+
+import config
+
+T = TypeVar('T')
+
+# Символы, превращающие OSC-адрес в шаблон (OSC 1.0)
+_PATTERN_CHARS = set("*?[]{}")
+
+def is_pattern(address: str) -> bool:
+    """
+    Проверяет, содержит ли адрес символы шаблона OSC
+
+    Args:
+        address: OSC-адрес
+
+    Returns:
+        bool: True если адрес является шаблоном
+    """
+    return not _PATTERN_CHARS.isdisjoint(address)
+
+def compile_pattern(pattern: str) -> Pattern:
+    """
+    Компилирует шаблон OSC-адреса в регулярное выражение
+
+    Поддерживаются `?` (любой символ), `*` (любая последовательность),
+    `[abc]`, `[a-z]`, `[!abc]` и `{foo,bar}`. Символы шаблона не совпадают с `/`.
+
+    Args:
+        pattern: Шаблон OSC-адреса
+
+    Returns:
+        Pattern: Скомпилированное регулярное выражение
+    """
+    regex = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "*":
+            regex.append("[^/]*")
+        elif char == "?":
+            regex.append("[^/]")
+        elif char == "[":
+            end = pattern.find("]", i)
+            if end == -1:
+                regex.append(re.escape(char))
+            else:
+                body = pattern[i + 1:end]
+                negate = body.startswith("!")
+                if negate:
+                    body = body[1:]
+                body = body.replace("\\", "\\\\").replace("^", "\\^")
+                regex.append(f"[{'^' if negate else ''}{body}]")
+                i = end
+        elif char == "{":
+            end = pattern.find("}", i)
+            if end == -1:
+                regex.append(re.escape(char))
+            else:
+                options = pattern[i + 1:end].split(",")
+                regex.append("(?:" + "|".join(re.escape(option) for option in options) + ")")
+                i = end
+        else:
+            regex.append(re.escape(char))
+        i += 1
+    return re.compile("".join(regex) + r"\Z")
+
+class RoutingTable(Generic[T]):
+    """Таблица маршрутов OSC-адресов с кешем результатов сопоставления"""
+
+    def __init__(self, cache_size: int = config.OSC_ROUTE_CACHE_SIZE):
+        """
+        Args:
+            cache_size: Максимальное количество адресов в LRU-кеше
+        """
+        self.cache_size = cache_size
+        self._exact: Dict[str, Tuple[T, ...]] = {}
+        self._patterns: List[Tuple[str, Pattern, T]] = []
+        self._cache: "OrderedDict[str, Tuple[T, ...]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def add(self, address: str, target: T) -> None:
+        """
+        Добавляет маршрут
+
+        Args:
+            address: Точный адрес или шаблон OSC
+            target: Цель маршрута (обработчик)
+        """
+        with self._lock:
+            if is_pattern(address):
+                self._patterns.append((address, compile_pattern(address), target))
+            else:
+                self._exact[address] = self._exact.get(address, ()) + (target,)
+            self._cache.clear()
+
+    def clear(self) -> None:
+        """Удаляет все маршруты"""
+        with self._lock:
+            self._exact.clear()
+            self._patterns.clear()
+            self._cache.clear()
+
+    def resolve(self, address: str) -> Tuple[T, ...]:
+        """
+        Находит цели маршрутов для входящего адреса
+
+        Args:
+            address: Адрес входящего сообщения (может быть шаблоном OSC)
+
+        Returns:
+            Tuple[T, ...]: Цели маршрутов; пустой кортеж, если маршрута нет
+        """
+        # Быстрый путь: точный адрес без шаблонов в таблице
+        targets = self._exact.get(address)
+        if targets is not None and not self._patterns:
+            self.exact_hits += 1
+            return targets
+
+        with self._lock:
+            cached = self._cache.get(address)
+            if cached is not None:
+                self._cache.move_to_end(address)
+                self.cache_hits += 1
+                return cached
+
+            self.cache_misses += 1
+            resolved = tuple(self._match(address))
+            self._cache[address] = resolved
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            return resolved
+
+    def _match(self, address: str) -> List[T]:
+        """Полное сопоставление адреса со всеми маршрутами (медленный путь)"""
+        matched: List[T] = list(self._exact.get(address, ()))
+        for _, regex, target in self._patterns:
+            if regex.match(address):
+                matched.append(target)
+
+        # Входящий адрес-шаблон сопоставляется с точными адресами таблицы (OSC 1.0)
+        if not matched and is_pattern(address):
+            regex = compile_pattern(address)
+            for route_address, targets in self._exact.items():
+                if regex.match(route_address):
+                    matched.extend(targets)
+        return matched
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Возвращает статистику маршрутизации
+
+        Returns:
+            Dict[str, Any]: Количество маршрутов и попаданий в быстрый путь и кеш
+        """
+        return {
+            "exact_routes": len(self._exact),
+            "pattern_routes": len(self._patterns),
+            "cached_addresses": len(self._cache),
+            "exact_hits": self.exact_hits,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+        }
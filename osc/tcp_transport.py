@@ -0,0 +1,321 @@
+"""
+Прием OSC по TCP с SLIP-кадрированием (OSC 1.1).
+Все постоянные соединения обслуживаются одним циклом событий asyncio в
+отдельном потоке. Пакеты проходят через ту же очередь приема и таблицу
+маршрутов, что и UDP, а каждый пакет подтверждается отправителю в порядке
+поступления, в том числе при конвейерной отправке нескольких команд подряд.
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+import config
+from osc.ingest import IngestQueue, PACKET_DROPPED
+from osc.listeners import REUSE_PORT
+from osc.osc_sender import OSCEncoder
+
+# Служебные байты SLIP (RFC 1055)
+SLIP_END = b"\xc0"
+SLIP_ESC = b"\xdb"
+_ESCAPED_END = b"\xdb\xdc"
+_ESCAPED_ESC = b"\xdb\xdd"
+
+def slip_encode(packet: bytes) -> bytes:
+    """
+    Кадрирует пакет SLIP с маркерами END в начале и в конце (OSC 1.1)
+
+    Args:
+        packet: OSC-пакет
+
+    Returns:
+        bytes: SLIP-кадр
+    """
+    return SLIP_END + packet.replace(SLIP_ESC, _ESCAPED_ESC).replace(SLIP_END, _ESCAPED_END) + SLIP_END
+
+class SlipDecoder:
+    """Потоковый декодер SLIP-кадров"""
+
+    def __init__(self, max_frame: int = config.OSC_TCP_MAX_FRAME):
+        """
+        Args:
+            max_frame: Максимальный размер кадра; более длинные кадры отбрасываются
+        """
+        self.max_frame = max_frame
+        self._buffer = bytearray()
+        self._overflow = False  # Текущий кадр превысил максимальный размер и пропускается
+        self.oversized = 0
+
+    def feed(self, data: bytes) -> List[bytes]:
+        """
+        Добавляет принятые байты и возвращает завершенные кадры
+
+        Args:
+            data: Очередная порция данных из сокета
+
+        Returns:
+            List[bytes]: Декодированные пакеты (пустые кадры пропускаются)
+        """
+        frames = []
+        start = 0
+        while True:
+            end = data.find(SLIP_END, start)
+            if end < 0:
+                break
+            if not self._overflow:
+                self._buffer += data[start:end]
+                if self._buffer:
+                    frames.append(bytes(self._buffer).replace(_ESCAPED_END, SLIP_END)
+                                  .replace(_ESCAPED_ESC, SLIP_ESC))
+            self._buffer.clear()
+            self._overflow = False
+            start = end + 1
+
+        if not self._overflow:
+            self._buffer += data[start:]
+            if len(self._buffer) > self.max_frame:
+                self.oversized += 1
+                self._buffer.clear()
+                self._overflow = True
+        return frames
+
+class SlipOSCProtocol(asyncio.Protocol):
+    """Соединение OSC по TCP: прием SLIP-кадров и подтверждения в порядке поступления"""
+
+    def __init__(self, server: "OSCTCPServer"):
+        super().__init__()
+        self.server = server
+        self.decoder = SlipDecoder()
+        self.transport: Optional[asyncio.Transport] = None
+        self.peer: Tuple[str, int] = ("", 0)
+        self._sequence = 0
+        # Ожидающие подтверждения пакеты: [номер, итог или None] в порядке поступления
+        self._pending: Deque[List[Any]] = deque()
+        self._paused = False
+
+    def connection_made(self, transport: Any) -> None:
+        """Регистрирует новое соединение"""
+        self.transport = transport
+        peer = transport.get_extra_info("peername")
+        self.peer = (peer[0], peer[1]) if peer else ("", 0)
+        self.server.connection_opened(self)
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        """Удаляет соединение; неотправленные подтверждения теряются вместе с ним"""
+        self.server.connection_closed(self)
+        self.transport = None
+
+    def data_received(self, data: bytes) -> None:
+        """
+        Передает завершенные кадры в очередь приема
+
+        Args:
+            data: Принятые байты
+        """
+        received_at = time.perf_counter()
+        for packet in self.decoder.feed(data):
+            self._sequence += 1
+            entry = [self._sequence, None]
+            self._pending.append(entry)
+            self.server.packets += 1
+            accepted = self.server.ingest.submit(
+                packet, self.peer, received_at,
+                lambda _data, status, entry=entry: self._post_result(entry, status))
+            if not accepted:
+                self._complete(entry, PACKET_DROPPED)
+
+        # Клиент, не читающий подтверждения, не должен накапливать очередь без предела
+        if not self._paused and len(self._pending) >= config.OSC_TCP_MAX_PENDING:
+            self._paused = True
+            self.transport.pause_reading()
+
+    def send_message(self, address: str, args: Tuple[Any, ...]) -> None:
+        """Отправляет клиенту OSC-сообщение вне очереди подтверждений (вызывается в цикле событий)"""
+        if self.transport is not None and not self.transport.is_closing():
+            self.transport.write(slip_encode(self.server.encode_message(address, args)))
+
+    def _post_result(self, entry: List[Any], status: str) -> None:
+        """Передает итог обработки из потока очереди приема в цикл событий соединения"""
+        try:
+            self.server.loop.call_soon_threadsafe(self._complete, entry, status)
+        except RuntimeError:
+            # Цикл событий уже остановлен вместе с соединением
+            pass
+
+    def _complete(self, entry: List[Any], status: str) -> None:
+        """Сохраняет итог обработки пакета и отправляет готовые подтверждения по порядку"""
+        entry[1] = status
+        while self._pending and self._pending[0][1] is not None:
+            sequence, result = self._pending.popleft()
+            if self.transport is not None and not self.transport.is_closing():
+                self.transport.write(slip_encode(self.server.encode_ack(sequence, result)))
+                self.server.acks += 1
+
+        if self._paused and len(self._pending) < config.OSC_TCP_MAX_PENDING // 2 and self.transport:
+            self._paused = False
+            self.transport.resume_reading()
+
+class OSCTCPServer(threading.Thread):
+    """Поток с циклом событий asyncio, обслуживающий TCP-соединения OSC"""
+
+    def __init__(self, ip: str, port: int, ingest: IngestQueue):
+        """
+        Args:
+            ip: IP-адрес для прослушивания
+            port: TCP-порт
+            ingest: Очередь приема OSC-пакетов (общая с UDP)
+        """
+        super().__init__(name="OSCTCPServer", daemon=True)
+        self.logger = logging.getLogger('ShogunOSC')
+        self.ip = ip
+        self.port = port
+        self.ingest = ingest
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._retiring = False  # Новые соединения не принимаются, поток завершится после последнего
+        self.ready = threading.Event()  # Сервер запущен или завершился с ошибкой
+        self.error: Optional[str] = None
+        self._encoder = OSCEncoder()
+        self._connections: Set[SlipOSCProtocol] = set()
+        self._peers: Dict[Tuple[str, int], SlipOSCProtocol] = {}  # Соединения по адресу клиента
+        self.total_connections = 0
+        self.packets = 0
+        self.acks = 0
+
+    def encode_ack(self, sequence: int, status: str) -> bytes:
+        """Кодирует подтверждение: номер пакета в соединении и итог его обработки"""
+        return self._encoder.encode_message(config.OSC_TCP_ACK_ADDRESS, (sequence, status))
+
+    def encode_message(self, address: str, args: Tuple[Any, ...]) -> bytes:
+        """Кодирует произвольное OSC-сообщение для отправки клиенту"""
+        return self._encoder.encode_message(address, args)
+
+    def send_to(self, peer: Tuple[str, int], address: str, *args: Any) -> bool:
+        """
+        Отправляет OSC-сообщение по соединению с указанным клиентом
+
+        Может вызываться из любого потока: запись выполняется в цикле событий сервера.
+
+        Args:
+            peer: Адрес клиента (ip, port) из MessageContext
+            address: OSC-адрес
+            *args: Аргументы сообщения
+
+        Returns:
+            bool: True если соединение с клиентом открыто и сообщение передано в цикл событий
+        """
+        protocol = self._peers.get(tuple(peer))
+        loop = self.loop
+        if protocol is None or loop is None:
+            return False
+        try:
+            loop.call_soon_threadsafe(protocol.send_message, address, args)
+        except RuntimeError:
+            # Цикл событий уже остановлен
+            return False
+        return True
+
+    def connection_opened(self, protocol: SlipOSCProtocol) -> None:
+        """Учитывает новое соединение"""
+        self._connections.add(protocol)
+        self._peers[protocol.peer] = protocol
+        self.total_connections += 1
+        self.logger.info(f"OSC/TCP: подключился {protocol.peer[0]}:{protocol.peer[1]}")
+
+    def connection_closed(self, protocol: SlipOSCProtocol) -> None:
+        """Учитывает закрытое соединение"""
+        self._connections.discard(protocol)
+        if self._peers.get(protocol.peer) is protocol:
+            del self._peers[protocol.peer]
+        self.logger.info(f"OSC/TCP: отключился {protocol.peer[0]}:{protocol.peer[1]}")
+        if self._retiring and not self._connections:
+            self.loop.stop()
+
+    def run(self) -> None:
+        """Запускает TCP-сервер и цикл событий до вызова stop()"""
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            try:
+                # reuse_port позволяет запустить сервер на том же порту до остановки прежнего;
+                # SO_REUSEADDR в Windows позволил бы другому процессу перехватить порт
+                server = self.loop.run_until_complete(self.loop.create_server(
+                    lambda: SlipOSCProtocol(self), self.ip, self.port,
+                    reuse_address=sys.platform != "win32", reuse_port=REUSE_PORT or None))
+                self._server = server
+            except OSError as e:
+                self.error = str(e)
+                self.logger.error(f"Не удалось запустить OSC/TCP-сервер на {self.ip}:{self.port}: {e}")
+                return
+            finally:
+                self.ready.set()
+
+            self.logger.info(f"OSC/TCP-сервер (SLIP) запущен на {self.ip}:{self.port}")
+            try:
+                self.loop.run_forever()
+            finally:
+                server.close()
+                for protocol in list(self._connections):
+                    if protocol.transport is not None:
+                        protocol.transport.close()
+                self.loop.run_until_complete(server.wait_closed())
+        except Exception as e:
+            self.logger.error(f"Критическая ошибка OSC/TCP-сервера: {e}")
+        finally:
+            self.loop.close()
+
+    def retire(self) -> None:
+        """
+        Прекращает прием новых соединений; открытые соединения обслуживаются до закрытия клиентом
+
+        Используется при перенастройке: новый сервер уже принимает соединения,
+        а клиенты прежнего не теряют команды, отправленные до переключения.
+        """
+        loop = self.loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(self._stop_accepting)
+        except RuntimeError:
+            pass
+
+    def _stop_accepting(self) -> None:
+        """Закрывает слушающий сокет в цикле событий сервера"""
+        self._retiring = True
+        if self._server is not None:
+            self._server.close()
+        if not self._connections:
+            self.loop.stop()
+
+    def stop(self) -> None:
+        """Останавливает цикл событий и закрывает все соединения"""
+        loop = self.loop
+        if loop is not None and not loop.is_closed():
+            try:
+                loop.call_soon_threadsafe(loop.stop)
+            except RuntimeError:
+                # Цикл уже закрыт
+                pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Возвращает статистику TCP-приема
+
+        Returns:
+            Dict[str, Any]: Соединения, принятые пакеты и отправленные подтверждения
+        """
+        connections = list(self._connections)
+        return {
+            "port": self.port,
+            "connections": len(connections),
+            "total_connections": self.total_connections,
+            "packets": self.packets,
+            "acks": self.acks,
+            "pending_acks": sum(len(protocol._pending) for protocol in connections),
+            "oversized_frames": sum(protocol.decoder.oversized for protocol in connections),
+            "peers": [f"{protocol.peer[0]}:{protocol.peer[1]}" for protocol in connections],
+        }
@@ -0,0 +1,164 @@
+"""
+Диспетчер OSC-сообщений с поддержкой временных меток бандлов.
+В отличие от стандартного диспетчера python-osc не блокирует поток приема
+ожиданием временной метки, а передает ее обработчику для точного планирования.
+Адреса разрешаются через скомпилированную таблицу маршрутов с кешем, пакеты
+разбираются без копирования (osc.packet_parser). Бандл, все сообщения которого
+адресованы командам, может быть передан обработчику бандлов целиком, чтобы
+команды выполнились как одно упорядоченное целое.
+"""
+
+import logging
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from osc.packet_parser import BytesLike, ParsedMessage, ParseError, parse_packet
+from osc.routing import RoutingTable
+
+class MessageContext(NamedTuple):
+    """Сведения о доставке OSC-сообщения для обработчиков команд"""
+    client_address: Optional[Tuple[str, int]]  # Адрес отправителя
+    timetag: Optional[float]                   # Время выполнения (секунды эпохи) или None
+    received_at: float                         # Время приема пакета (time.perf_counter)
+
+class _Route(NamedTuple):
+    """Маршрут к обработчику команды: handler(address, *args, context=context)"""
+    handler: Callable
+
+class TimedDispatcher:
+    """Диспетчер, передающий временные метки OSC-бандлов обработчикам команд"""
+
+    def __init__(self):
+        self.logger = logging.getLogger('ShogunOSC')
+        self.routes: RoutingTable[_Route] = RoutingTable()
+        self._default_handler: Optional[Callable] = None
+        self._bundle_handler: Optional[Callable] = None
+        self.default_count = 0  # Сообщения, не нашедшие маршрута
+        self.bundles_handled = 0  # Бандлы, переданные обработчику бандлов целиком
+
+    def set_default_handler(self, handler: Callable) -> None:
+        """
+        Устанавливает обработчик сообщений без маршрута: handler(address, *args)
+
+        Args:
+            handler: Обработчик по умолчанию
+        """
+        self._default_handler = handler
+
+    def set_bundle_handler(self, handler: Optional[Callable]) -> None:
+        """
+        Устанавливает обработчик бандлов из нескольких команд: handler(commands, context) -> bool
+
+        Обработчик вызывается для бандла из нескольких сообщений с одной временной меткой,
+        каждое из которых адресовано ровно одному обработчику команды.
+        commands - список (обработчик команды, адрес, аргументы) в порядке сообщений.
+        Если обработчик вернул False, сообщения обрабатываются по отдельности.
+
+        Args:
+            handler: Обработчик бандлов или None
+        """
+        self._bundle_handler = handler
+
+    def replace_timed_routes(self, routes: Dict[str, Callable]) -> None:
+        """
+        Атомарно заменяет таблицу маршрутов обработчиками, учитывающими временные метки
+
+        Обработчик вызывается как handler(address, *args, context=context), где
+        context - MessageContext с адресом отправителя, временной меткой и временем приема.
+        Новая таблица строится отдельно и подменяется одним присваиванием, поэтому
+        пакеты, обрабатываемые во время замены, не остаются без маршрута.
+
+        Args:
+            routes: OSC-адрес или шаблон -> обработчик команды
+        """
+        table: RoutingTable[_Route] = RoutingTable()
+        for address, handler in routes.items():
+            table.add(address, _Route(handler))
+        self.routes = table
+
+    def call_handlers_for_packet(self, data: BytesLike, client_address: Tuple[str, int],
+                                 received_at: Optional[float] = None) -> List:
+        """
+        Вызывает обработчики для всех сообщений OSC-пакета без ожидания временных меток
+
+        Args:
+            data: Содержимое пакета (bytes или memoryview на буфер приема)
+            client_address: Адрес отправителя
+            received_at: Время приема пакета (time.perf_counter), по умолчанию - текущее
+
+        Returns:
+            List: Ответы обработчиков (для совместимости с серверами python-osc)
+        """
+        try:
+            self.dispatch_packet(data, client_address, received_at)
+        except ParseError as e:
+            self.logger.debug(f"Не удалось разобрать OSC-пакет от {client_address}: {e}")
+        return []
+
+    def dispatch_packet(self, data: BytesLike, client_address: Tuple[str, int],
+                        received_at: Optional[float] = None) -> None:
+        """
+        Разбирает пакет и вызывает обработчики его сообщений
+
+        Args:
+            data: Содержимое пакета (bytes или memoryview на буфер приема)
+            client_address: Адрес отправителя
+            received_at: Время приема пакета (time.perf_counter), по умолчанию - текущее
+
+        Raises:
+            ParseError: Если пакет некорректен
+        """
+        if received_at is None:
+            received_at = time.perf_counter()
+        messages = parse_packet(data)
+
+        # Немедленные и просроченные сообщения выполняются сразу
+        now = time.time()
+        if len(messages) > 1 and self._bundle_handler is not None:
+            if self._dispatch_bundle(messages, client_address, received_at, now):
+                return
+        for address, params, message_time in messages:
+            routes = self.routes.resolve(address)
+
+            if not routes:
+                self.default_count += 1
+                if self._default_handler:
+                    self._default_handler(address, *params)
+                continue
+
+            timetag = message_time if message_time > now else None
+            context = MessageContext(client_address, timetag, received_at)
+            for route in routes:
+                route.handler(address, *params, context=context)
+
+    def _dispatch_bundle(self, messages: List[ParsedMessage], client_address: Tuple[str, int],
+                         received_at: float, now: float) -> bool:
+        """
+        Передает бандл из одних команд обработчику бандлов
+
+        Returns:
+            bool: True если бандл обработан целиком
+        """
+        commands = []
+        for address, params, message_time in messages:
+            routes = self.routes.resolve(address)
+            if len(routes) != 1 or message_time != messages[0][2]:
+                return False
+            commands.append((routes[0].handler, address, params))
+        timetag = messages[0][2] if messages[0][2] > now else None
+        if not self._bundle_handler(commands, MessageContext(client_address, timetag, received_at)):
+            return False
+        self.bundles_handled += 1
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Возвращает статистику маршрутизации
+
+        Returns:
+            Dict[str, Any]: Статистика таблицы маршрутов и число сообщений без маршрута
+        """
+        stats = self.routes.get_stats()
+        stats["unrouted"] = self.default_count
+        stats["bundles_as_unit"] = self.bundles_handled
+        return stats
@@ -0,0 +1,139 @@
+"""
+Агрегация неизвестного OSC-трафика.
+Сообщения без маршрута не логируются и не передаются в GUI по одному, а
+учитываются в компактной таблице по адресам; GUI периодически получает сводку.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import config
+
+class AddressStats:
+    """Счетчики одного неизвестного OSC-адреса"""
+
+    __slots__ = ("count", "interval_count", "first_seen", "last_seen", "samples", "rate")
+
+    def __init__(self, now: float):
+        self.count = 0
+        self.interval_count = 0  # Сообщения с момента последней сводки
+        self.first_seen = now
+        self.last_seen = now
+        self.samples: List[Tuple[Any, ...]] = []
+        self.rate = 0.0  # Сообщений в секунду за последний интервал сводки
+
+class UnknownTrafficTable:
+    """Таблица неизвестных OSC-адресов со счетчиками, частотой и примерами аргументов"""
+
+    def __init__(self, max_addresses: int = config.OSC_UNKNOWN_MAX_ADDRESSES,
+                 max_samples: int = config.OSC_UNKNOWN_SAMPLES,
+                 sample_every: int = config.OSC_UNKNOWN_SAMPLE_EVERY):
+        """
+        Args:
+            max_addresses: Максимальное количество адресов в таблице
+            max_samples: Количество сохраняемых примеров аргументов на адрес
+            sample_every: Сохранять пример каждого N-го сообщения
+        """
+        self.max_addresses = max_addresses
+        self.max_samples = max_samples
+        self.sample_every = sample_every
+        self._lock = threading.Lock()
+        # Порядок - от давно не встречавшихся адресов к недавним
+        self._addresses: "OrderedDict[str, AddressStats]" = OrderedDict()
+        self._last_summary = time.time()
+        self.total = 0
+        self.evicted = 0  # Адреса, вытесненные при переполнении таблицы
+
+    def add(self, address: str, args: Tuple[Any, ...]) -> None:
+        """
+        Учитывает неизвестное сообщение
+
+        Args:
+            address: OSC-адрес
+            args: Аргументы сообщения (сохраняются без форматирования)
+        """
+        now = time.time()
+        with self._lock:
+            self.total += 1
+            stats = self._addresses.get(address)
+            if stats is None:
+                if len(self._addresses) >= self.max_addresses:
+                    # Вытесняем адрес, который дольше всех не встречался
+                    self._addresses.popitem(last=False)
+                    self.evicted += 1
+                stats = AddressStats(now)
+                self._addresses[address] = stats
+            else:
+                self._addresses.move_to_end(address)
+            stats.count += 1
+            stats.interval_count += 1
+            stats.last_seen = now
+            if stats.count == 1 or stats.count % self.sample_every == 0:
+                stats.samples.append(args)
+                if len(stats.samples) > self.max_samples:
+                    del stats.samples[0]
+
+    def take_summary(self, limit: int = config.OSC_UNKNOWN_SUMMARY_TOP) -> Optional[str]:
+        """
+        Формирует сводку за интервал с момента предыдущей сводки и обновляет частоты
+
+        Args:
+            limit: Количество самых частых адресов в сводке
+
+        Returns:
+            Optional[str]: Текст сводки или None, если новых сообщений не было
+        """
+        now = time.time()
+        with self._lock:
+            interval = max(now - self._last_summary, 1e-6)
+            self._last_summary = now
+            active = []
+            for address, stats in self._addresses.items():
+                stats.rate = stats.interval_count / interval
+                if stats.interval_count:
+                    active.append((stats.interval_count, address, stats.samples[-1] if stats.samples else ()))
+                stats.interval_count = 0
+
+        if not active:
+            return None
+
+        active.sort(reverse=True)
+        total = sum(count for count, _, _ in active)
+        parts = []
+        for count, address, sample in active[:limit]:
+            sample_str = ", ".join(str(arg) for arg in sample) if sample else "нет аргументов"
+            parts.append(f"{address} ×{count} [{sample_str}]")
+        more = f" и еще {len(active) - limit}" if len(active) > limit else ""
+        return (f"{total} сообщений от {len(active)} адресов за {interval:.0f} с: "
+                + "; ".join(parts) + more)
+
+    def get_stats(self, limit: int = config.OSC_UNKNOWN_SUMMARY_TOP) -> Dict[str, Any]:
+        """
+        Возвращает таблицу самых частых неизвестных адресов
+
+        Args:
+            limit: Количество адресов в таблице
+
+        Returns:
+            Dict[str, Any]: Общие счетчики и сведения по адресам
+        """
+        with self._lock:
+            top = sorted(self._addresses.items(), key=lambda item: item[1].count, reverse=True)[:limit]
+            addresses = {
+                address: {
+                    "count": stats.count,
+                    "rate_per_s": round(stats.rate, 1),
+                    "first_seen": time.strftime("%H:%M:%S", time.localtime(stats.first_seen)),
+                    "last_seen": time.strftime("%H:%M:%S", time.localtime(stats.last_seen)),
+                    "samples": [", ".join(str(arg) for arg in sample) for sample in stats.samples],
+                }
+                for address, stats in top
+            }
+            return {
+                "total": self.total,
+                "addresses": len(self._addresses),
+                "evicted": self.evicted,
+                "top": addresses,
+            }
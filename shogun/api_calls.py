@@ -0,0 +1,174 @@
+"""
+Вызовы блокирующего Shogun Live API вне цикла событий с ограничением времени.
+Каждый вызов выполняется в отдельном пуле потоков, а цикл событий ждет его
+не дольше заданного срока: зависший вызов приводит к ShogunCallTimeout за
+известное время, а не к остановке исполнителя. Превышение срока учитывается
+отдельно от ошибок API, сторожевой поток сообщает о вызовах, выполняющихся
+дольше порога.
+"""
+
+import asyncio
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import config
+
+class ShogunCallTimeout(TimeoutError):
+    """Вызов Shogun Live API не завершился за отведенное время"""
+
+class CallStats:
+    """Статистика вызовов API одного типа"""
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Возвращает статистику в виде словаря"""
+        completed = self.count - self.timeouts
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "avg_ms": round(self.total_ms / completed, 3) if completed else 0.0,
+            "max_ms": round(self.max_ms, 3),
+        }
+
+class ShogunApiCaller:
+    """Выполнение вызовов API в пуле потоков со сроком и сторожевым потоком"""
+
+    def __init__(self, timeout_ms: float = config.SHOGUN_API_TIMEOUT_MS,
+                 stall_ms: float = config.SHOGUN_API_STALL_MS,
+                 workers: int = config.SHOGUN_API_WORKERS):
+        """
+        Args:
+            timeout_ms: Срок вызова по умолчанию, мс
+            stall_ms: Длительность вызова, после которой сторожевой поток сообщает о нем, мс
+            workers: Потоков для вызовов (зависшие вызовы занимают поток до своего завершения)
+        """
+        self.logger = logging.getLogger('ShogunOSC')
+        self.timeout_ms = timeout_ms
+        self.stall_ms = stall_ms
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ShogunApiCall")
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        # Выполняющиеся вызовы: id -> (название, время начала, сообщено ли о зависании)
+        self._in_flight: Dict[int, Tuple[str, float, bool]] = {}
+        self._stats: Dict[str, CallStats] = {}
+        self.stalled = 0
+        self.calls_total = 0  # Все вызовы (для подсчета обращений к Shogun Live за команду)
+        self.last_success_at: Optional[float] = None  # Время последнего успешного вызова (time.monotonic)
+        self._stop = threading.Event()
+        self._watchdog = threading.Thread(target=self._watch, name="ShogunApiWatchdog", daemon=True)
+        self._watchdog.start()
+
+    async def call(self, name: str, func: Callable, *args: Any, timeout_ms: Optional[float] = None) -> Any:
+        """
+        Выполняет блокирующий вызов в пуле потоков и ждет его не дольше срока
+
+        Args:
+            name: Название вызова для статистики и журнала
+            func: Блокирующая функция
+            *args: Аргументы func
+            timeout_ms: Срок вызова, мс (по умолчанию - timeout_ms пула)
+
+        Returns:
+            Any: Результат func
+
+        Raises:
+            ShogunCallTimeout: Вызов не завершился за срок
+            Exception: Ошибка, возникшая в func
+        """
+        timeout_ms = self.timeout_ms if timeout_ms is None else timeout_ms
+        call_id = next(self._ids)
+        started = time.perf_counter()
+        loop = asyncio.get_event_loop()
+        future = loop.run_in_executor(self._pool, self._run, call_id, name, func, args)
+        try:
+            result = await asyncio.wait_for(future, timeout_ms / 1000)
+        except asyncio.TimeoutError:
+            self._account(name, started, timeout=True)
+            raise ShogunCallTimeout(f"Shogun Live не ответил на '{name}' за {timeout_ms:.0f} мс") from None
+        except Exception:
+            self._account(name, started, error=True)
+            raise
+        self._account(name, started)
+        return result
+
+    def _run(self, call_id: int, name: str, func: Callable, args: tuple) -> Any:
+        """Выполняет вызов в потоке пула, отмечая его как выполняющийся"""
+        with self._lock:
+            self._in_flight[call_id] = (name, time.perf_counter(), False)
+        try:
+            return func(*args)
+        finally:
+            with self._lock:
+                entry = self._in_flight.pop(call_id, None)
+            if entry is not None and entry[2]:
+                elapsed_ms = (time.perf_counter() - entry[1]) * 1000
+                self.logger.warning(f"Зависший вызов Shogun Live '{name}' завершился через {elapsed_ms:.0f} мс")
+
+    def _account(self, name: str, started: float, error: bool = False, timeout: bool = False) -> None:
+        """Учитывает результат вызова"""
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self.calls_total += 1
+            stats = self._stats.setdefault(name, CallStats())
+            stats.count += 1
+            if not error and not timeout:
+                self.last_success_at = time.monotonic()
+            if timeout:
+                stats.timeouts += 1
+                return
+            if error:
+                stats.errors += 1
+            stats.total_ms += elapsed_ms
+            stats.max_ms = max(stats.max_ms, elapsed_ms)
+
+    def success_age_ms(self) -> float:
+        """Время с последнего успешного вызова, мс (бесконечность, если его не было)"""
+        last = self.last_success_at
+        return float("inf") if last is None else (time.monotonic() - last) * 1000
+
+    def _watch(self) -> None:
+        """Сторожевой поток: сообщает о вызовах, выполняющихся дольше порога"""
+        while not self._stop.wait(max(self.stall_ms / 4000, 0.05)):
+            now = time.perf_counter()
+            stalled = []
+            with self._lock:
+                for call_id, (name, started, reported) in self._in_flight.items():
+                    if not reported and (now - started) * 1000 >= self.stall_ms:
+                        self._in_flight[call_id] = (name, started, True)
+                        self.stalled += 1
+                        stalled.append((name, (now - started) * 1000))
+            for name, elapsed_ms in stalled:
+                self.logger.warning(f"Вызов Shogun Live '{name}' выполняется уже {elapsed_ms:.0f} мс")
+
+    def close(self) -> None:
+        """Останавливает сторожевой поток и пул (зависшие вызовы не ожидаются)"""
+        self._stop.set()
+        self._pool.shutdown(wait=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Возвращает статистику вызовов API
+
+        Returns:
+            Dict[str, Any]: Срок, выполняющиеся вызовы, зависания и статистика по вызовам
+        """
+        now = time.perf_counter()
+        with self._lock:
+            return {
+                "timeout_ms": self.timeout_ms,
+                "in_flight": {f"{name}#{call_id}": round((now - started) * 1000)
+                              for call_id, (name, started, _) in self._in_flight.items()},
+                "stalled": self.stalled,
+                "calls": {name: stats.as_dict() for name, stats in self._stats.items()},
+            }
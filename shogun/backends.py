@@ -0,0 +1,225 @@
+"""
+Бэкенды Shogun Live: откуда рабочий поток получает соединения и сведения о процессе.
+ShogunApiBackend подключается к настоящему Shogun Live через vicon_core_api и
+shogun_live_api (библиотеки импортируются только при подключении), а
+SimulatedShogunBackend - к имитации Shogun Live с настраиваемой задержкой,
+сбоями и перезапусками. Имитация позволяет репетировать, нагружать и измерять
+всю цепочку от OSC-команды до записи на машинах без Shogun Live.
+"""
+
+import abc
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import config
+from shogun.fake_shogun import FakeCaptureServices
+from shogun.process_watcher import ShogunProcessWatcher, PROCESS_ABSENT, PROCESS_RESTARTED, PROCESS_RUNNING
+
+LOCAL_ADDRESS = "localhost"  # Адрес основной машины Shogun Live
+
+class ShogunBackend(abc.ABC):
+    """
+    Интерфейс бэкенда Shogun Live
+
+    Сессия, возвращаемая connect(), повторяет используемую приложением часть
+    CaptureServices: latest_capture_state() - состояние записи, start_capture()
+    и stop_capture(flags) - запуск и остановка, capture_name() и
+    set_capture_name(name) - имя захвата, latest_capture_name() - имя тейка,
+    а также, если поддерживается, add_<тема>_changed_callback(callback).
+    """
+
+    name = ""
+
+    @abc.abstractmethod
+    def connect(self, address: str = LOCAL_ADDRESS) -> Tuple[Any, Any]:
+        """
+        Подключается к Shogun Live (блокирующий вызов)
+
+        Args:
+            address: Адрес машины Shogun Live
+
+        Returns:
+            Tuple[Any, Any]: Клиент (передается в disconnect, может быть None) и сессия
+        """
+
+    def disconnect(self, client: Any) -> None:
+        """Закрывает соединение, открытое connect()"""
+
+    @abc.abstractmethod
+    def check_process(self) -> str:
+        """
+        Проверяет процесс Shogun Live
+
+        Returns:
+            str: PROCESS_RUNNING, PROCESS_RESTARTED или PROCESS_ABSENT
+        """
+
+    @property
+    def pid(self) -> Optional[int]:
+        """Идентификатор процесса Shogun Live, если он известен"""
+        return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Возвращает статистику бэкенда для окна диагностики"""
+        return {"backend": self.name}
+
+class ShogunApiBackend(ShogunBackend):
+    """Настоящий Shogun Live через vicon_core_api и shogun_live_api"""
+
+    name = "shogun_live_api"
+
+    def __init__(self):
+        self.logger = logging.getLogger('ShogunOSC')
+        self.process_watcher = ShogunProcessWatcher()  # Проверка процесса без обхода таблицы процессов
+
+    def connect(self, address: str = LOCAL_ADDRESS) -> Tuple[Any, Any]:
+        # Библиотеки Shogun Live нужны только для подключения к настоящей программе
+        from vicon_core_api import Client
+        from shogun_live_api import CaptureServices
+        client = Client(address)
+        return client, CaptureServices(client)
+
+    def disconnect(self, client: Any) -> None:
+        try:
+            # Закрытие клиентского соединения если есть такой метод
+            if hasattr(client, 'disconnect'):
+                client.disconnect()
+            elif hasattr(client, 'close'):
+                client.close()
+        except Exception as e:
+            self.logger.debug(f"Ошибка при закрытии соединения: {e}")
+
+    def check_process(self) -> str:
+        return self.process_watcher.check()
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self.process_watcher.pid
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"backend": self.name, **self.process_watcher.get_stats()}
+
+class SimulatedShogunBackend(ShogunBackend):
+    """Имитация Shogun Live с задержкой, сбоями и перезапусками"""
+
+    name = "simulated"
+
+    def __init__(self, latency_ms: float = config.SHOGUN_SIM_LATENCY_MS,
+                 failure_rate: float = config.SHOGUN_SIM_FAILURE_RATE,
+                 restart_interval: float = config.SHOGUN_SIM_RESTART_INTERVAL,
+                 restart_downtime: float = config.SHOGUN_SIM_RESTART_DOWNTIME,
+                 push: bool = True):
+        """
+        Args:
+            latency_ms: Задержка ответа на каждый запрос, мс
+            failure_rate: Доля запросов, завершающихся ошибкой соединения
+            restart_interval: Период перезапуска имитации, с (0 - без перезапусков)
+            restart_downtime: Сколько имитация недоступна при перезапуске, с
+            push: Поддерживать подписку на уведомления (False - только опрос)
+        """
+        self.logger = logging.getLogger('ShogunOSC')
+        self.latency_ms = latency_ms
+        self.failure_rate = failure_rate
+        self.restart_interval = restart_interval
+        self.restart_downtime = restart_downtime
+        self.push = push
+        self._lock = threading.Lock()
+        self._servers: Dict[str, FakeCaptureServices] = {}  # Имитации по адресам машин
+        self._pid = 1
+        self._started_at = time.monotonic()
+        self._down_until = 0.0
+        self._restart_reported = True
+        self.connects = 0
+        self.restarts = 0
+
+    def server(self, address: str = LOCAL_ADDRESS) -> FakeCaptureServices:
+        """
+        Возвращает имитацию Shogun Live на машине (для действий оператора в бенчмарках)
+
+        Args:
+            address: Адрес машины
+
+        Returns:
+            FakeCaptureServices: Текущий экземпляр имитации (новый после перезапуска)
+        """
+        with self._lock:
+            server = self._servers.get(address)
+            if server is None:
+                server = FakeCaptureServices(push=self.push, latency=self.latency_ms / 1000,
+                                             failure_rate=self.failure_rate)
+                self._servers[address] = server
+            return server
+
+    def _advance(self) -> bool:
+        """
+        Выполняет запланированный перезапуск имитации
+
+        Returns:
+            bool: True если имитация сейчас недоступна (идет перезапуск)
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self.restart_interval > 0 and now >= self._down_until \
+                    and now - self._started_at >= self.restart_interval:
+                # Соединения с прежним экземпляром перестают работать, состояние записи теряется
+                for server in self._servers.values():
+                    server.shutdown()
+                self._servers.clear()
+                self._down_until = now + self.restart_downtime
+                self._started_at = self._down_until
+                self._restart_reported = False
+                self._pid += 1
+                self.restarts += 1
+                self.logger.info(f"Имитация Shogun Live перезапускается ({self.restart_downtime:.1f} с)")
+            return now < self._down_until
+
+    def connect(self, address: str = LOCAL_ADDRESS) -> Tuple[Any, Any]:
+        if self._advance():
+            raise ConnectionError("Имитация Shogun Live перезапускается")
+        self.connects += 1
+        return None, self.server(address)
+
+    def check_process(self) -> str:
+        if self._advance():
+            return PROCESS_ABSENT
+        with self._lock:
+            if not self._restart_reported:
+                self._restart_reported = True
+                return PROCESS_RESTARTED
+        return PROCESS_RUNNING
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self._pid
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            servers = list(self._servers.items())
+        return {
+            "backend": self.name,
+            "latency_ms": self.latency_ms,
+            "failure_rate": self.failure_rate,
+            "restart_interval_s": self.restart_interval,
+            "pid": self._pid,
+            "connects": self.connects,
+            "restarts": self.restarts,
+            "requests": {address: server.calls for address, server in servers},
+            "injected_failures": sum(server.failures for _, server in servers),
+        }
+
+def create_backend(simulate: bool = False, **simulation: Any) -> ShogunBackend:
+    """
+    Создает бэкенд Shogun Live
+
+    Args:
+        simulate: Использовать имитацию вместо настоящего Shogun Live
+        **simulation: Параметры SimulatedShogunBackend
+
+    Returns:
+        ShogunBackend: Бэкенд для ShogunWorker
+    """
+    if simulate:
+        return SimulatedShogunBackend(**simulation)
+    return ShogunApiBackend()
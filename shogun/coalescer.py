@@ -0,0 +1,105 @@
+"""
+Схлопывание повторяющихся команд перед исполнителем.
+Несколько контроллеров часто присылают одну и ту же команду с разницей в
+несколько миллисекунд; одинаковые команды, пришедшие подряд в пределах окна,
+выполняются одним вызовом API, и все отправители получают общий результат.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from metrics.latency import CommandTrace
+
+class CoalescingStats:
+    """Счетчики схлопывания для одной команды"""
+
+    def __init__(self):
+        self.submitted = 0  # Поступило запросов
+        self.executed = 0   # Передано исполнителю
+        self.coalesced = 0  # Присоединено к уже поставленной команде
+
+    def as_dict(self) -> Dict[str, int]:
+        """Возвращает счетчики в виде словаря"""
+        return {
+            "submitted": self.submitted,
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+        }
+
+class CommandCoalescer:
+    """Схлопывает одинаковые последовательные команды в один вызов исполнителя"""
+
+    def __init__(self, submit: Callable[..., Future], window_ms: float, merge_pending: bool = True):
+        """
+        Args:
+            submit: Функция постановки команды исполнителю
+                    submit(name, coro_func, *args, trace=trace, **schedule) -> Future
+            window_ms: Окно схлопывания в миллисекундах от первой команды серии (0 - отключено)
+            merge_pending: Схлопывать с предыдущей командой, пока она не выполнена, и после окна
+        """
+        self.logger = logging.getLogger('ShogunOSC')
+        self._submit = submit
+        self.window_ms = window_ms
+        self.merge_pending = merge_pending
+        self._lock = threading.Lock()
+        # Последняя поставленная команда: (ключ, время постановки, future)
+        self._last: Optional[Tuple[Hashable, float, Future]] = None
+        self._stats: Dict[str, CoalescingStats] = {}
+
+    def submit(self, name: str, coro_func: Callable, *args: Any,
+               trace: Optional[CommandTrace] = None, **schedule: Any) -> Future:
+        """
+        Ставит команду в очередь или присоединяет ее к такой же предыдущей
+
+        Команда схлопывается, только если предыдущая поставленная команда
+        была такой же (имя и аргументы) и пришла не раньше окна схлопывания
+        или (при merge_pending) еще не завершена. Любая другая команда между
+        ними разрывает серию, поэтому последовательность Start, Stop, Start
+        выполнится полностью. При окне 0 схлопывание отключено полностью.
+
+        Args:
+            name: Название команды
+            coro_func: Асинхронная функция команды
+            *args: Аргументы для coro_func
+            trace: Трасса задержки команды
+            **schedule: Момент выполнения для исполнителя (fire_at, lead)
+
+        Returns:
+            Future: Общий результат для всех схлопнутых запросов
+        """
+        key = (name, args)
+        now = time.perf_counter()
+        with self._lock:
+            stats = self._stats.setdefault(name, CoalescingStats())
+            stats.submitted += 1
+
+            if self._last is not None and self.window_ms > 0:
+                last_key, last_at, last_future = self._last
+                within_window = (now - last_at) * 1000 <= self.window_ms
+                if last_key == key and (within_window or (self.merge_pending and not last_future.done())):
+                    stats.coalesced += 1
+                    self.logger.debug(f"Команда '{name}' схлопнута с предыдущей "
+                                      f"({(now - last_at) * 1000:.1f} мс назад)")
+                    return last_future
+
+            future = self._submit(name, coro_func, *args, trace=trace, **schedule)
+            stats.executed += 1
+            self._last = (key, now, future)
+            return future
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Возвращает счетчики схлопывания по командам
+
+        Returns:
+            Dict[str, Any]: Окно схлопывания и счетчики по каждой команде
+        """
+        with self._lock:
+            return {
+                "window_ms": self.window_ms,
+                "merge_pending": self.merge_pending,
+                "commands": {name: stats.as_dict() for name, stats in self._stats.items()},
+            }
@@ -0,0 +1,278 @@
+"""
+Долгоживущий исполнитель команд Shogun Live.
+Исполнитель - единственный владелец соединения с Shogun Live: все обращения
+к API (команды, опрос состояния, подключение) выполняются по очереди в одном
+потоке с одним циклом событий. Очередь упорядочена по приоритету: остановка
+записи обгоняет ожидающие смены имени и опрос, внутри приоритета сохраняется
+порядок поступления. Команды с временной меткой до постановки в очередь ждут
+в таймере, чтобы ожидание метки не занимало исполнитель.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import config
+from metrics.latency import (CommandTrace, current_trace, latency_recorder,
+                             STAGE_QUEUED, STAGE_PICKED_UP, STAGE_COMPLETED)
+from shogun.scheduling import CommandTimer
+
+class CommandStats:
+    """Статистика выполнения команд одного типа"""
+
+    def __init__(self):
+        self.count = 0
+        self.failed = 0
+        self.last_ms = 0.0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, elapsed_ms: float, success: bool) -> None:
+        """
+        Добавляет результат выполнения команды
+
+        Args:
+            elapsed_ms: Время выполнения в миллисекундах
+            success: Завершилась ли команда без исключения
+        """
+        self.count += 1
+        if not success:
+            self.failed += 1
+        self.last_ms = elapsed_ms
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Возвращает статистику в виде словаря"""
+        return {
+            "count": self.count,
+            "failed": self.failed,
+            "last_ms": round(self.last_ms, 3),
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+        }
+
+# Приоритеты очереди (меньше - раньше)
+PRIORITY_STOP = 0     # Остановка записи
+PRIORITY_COMMAND = 1  # Запуск записи, смена имени, переподключение
+PRIORITY_POLL = 2     # Опрос состояния
+
+# Приоритет команды по ее названию; остальные команды - PRIORITY_COMMAND
+COMMAND_PRIORITIES = {
+    "stop_recording": PRIORITY_STOP,
+    "monitor": PRIORITY_POLL,
+    "verify": PRIORITY_POLL,
+}
+
+# Команды, которые остановка записи не обгоняет: запуск записи и пакеты команд
+ORDERED_BEFORE_STOP = frozenset({"start_recording", "start_recording_named", "batch"})
+
+class CommandExecutor(threading.Thread):
+    """Исполнитель команд с одним циклом событий и очередью по приоритетам"""
+
+    _STOP = object()  # Маркер остановки исполнителя
+
+    def __init__(self, name: str = "ShogunCommandExecutor"):
+        super().__init__(name=name, daemon=True)
+        self.logger = logging.getLogger('ShogunOSC')
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        # Очередь: (ключ сортировки, элемент); ключ - (приоритет, порядок, номер)
+        self._queue: List[Tuple[Tuple[int, int, int], Any]] = []
+        self._condition = threading.Condition()
+        self._sequence = itertools.count()
+        self._pending_start: Optional[int] = None  # Номер последнего ожидающего запуска записи
+        self._stopped = False
+        self.timer = CommandTimer(f"{name}Timer")  # Команды, ожидающие временной метки
+        self._stats: Dict[str, CommandStats] = {}
+        self._stats_lock = threading.Lock()
+        self._busy = False
+        self.current_command: Optional[str] = None
+        self.preemptions = 0     # Команды, обогнавшие хотя бы одну ожидающую операцию
+        self.internal_jobs = 0   # Выполненные служебные операции (опрос, подключение)
+
+    def run(self) -> None:
+        """Основной цикл исполнителя: берет операции из очереди по одной"""
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.timer.start()
+        try:
+            while True:
+                item = self._take()
+                if item is self._STOP:
+                    break
+                self._execute(*item)
+        finally:
+            self._cancel_pending()
+            self.loop.close()
+
+    def _take(self) -> Any:
+        """Извлекает операцию с наивысшим приоритетом, ожидая ее появления"""
+        with self._condition:
+            while not self._queue:
+                self._condition.wait()
+            _, item = heapq.heappop(self._queue)
+            if item is not self._STOP and item[0] in ORDERED_BEFORE_STOP and not any(
+                    queued[0] in ORDERED_BEFORE_STOP for _, queued in self._queue if queued is not self._STOP):
+                self._pending_start = None
+            return item
+
+    def _cancel_pending(self) -> None:
+        """Отменяет операции, оставшиеся в очереди после остановки"""
+        with self._condition:
+            pending, self._queue = self._queue, []
+        for _, item in pending:
+            if item is not self._STOP:
+                item[3].cancel()
+
+    def _execute(self, name: str, coro_func: Callable, args: tuple,
+                 future: Future, queued_at: float, trace: Optional[CommandTrace]) -> None:
+        """
+        Выполняет одну команду в цикле событий исполнителя
+
+        Args:
+            name: Название команды для статистики
+            coro_func: Асинхронная функция команды
+            args: Аргументы для coro_func
+            future: Future для передачи результата вызывающему
+            queued_at: Время постановки в очередь (perf_counter)
+            trace: Трасса задержки команды или None для служебной операции
+        """
+        if not future.set_running_or_notify_cancel():
+            return
+
+        if trace is None:
+            self._execute_internal(coro_func, args, future)
+            return
+
+        self._busy = True
+        self.current_command = name
+        trace.mark(STAGE_PICKED_UP)
+        # Задача asyncio наследует контекст, поэтому этапы внутри команды попадут в трассу
+        trace_token = current_trace.set(trace)
+        started_at = time.perf_counter()
+        success = True
+        try:
+            future.set_result(self.loop.run_until_complete(coro_func(*args)))
+        except Exception as e:
+            success = False
+            self.logger.error(f"Ошибка выполнения команды '{name}': {e}")
+            future.set_exception(e)
+        finally:
+            finished_at = time.perf_counter()
+            current_trace.reset(trace_token)
+            self._busy = False
+            self.current_command = None
+
+        trace.mark(STAGE_COMPLETED)
+        latency_recorder.record(trace, success)
+
+        elapsed_ms = (finished_at - started_at) * 1000
+        with self._stats_lock:
+            self._stats.setdefault(name, CommandStats()).add(elapsed_ms, success)
+        self.logger.debug(f"Команда '{name}' выполнена за {elapsed_ms:.1f} мс "
+                          f"(ожидание в очереди {(started_at - queued_at) * 1000:.1f} мс)")
+
+    def _execute_internal(self, coro_func: Callable, args: tuple, future: Future) -> None:
+        """Выполняет служебную операцию без учета в статистике команд и трассах"""
+        try:
+            future.set_result(self.loop.run_until_complete(coro_func(*args)))
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            self.internal_jobs += 1
+
+    def submit(self, name: str, coro_func: Callable, *args: Any,
+               trace: Optional[CommandTrace] = None, internal: bool = False,
+               fire_at: Optional[float] = None, lead: float = config.SCHEDULE_SPIN_WINDOW) -> Future:
+        """
+        Ставит команду в очередь на выполнение
+
+        Приоритет определяется названием команды (COMMAND_PRIORITIES). Остановка
+        записи обгоняет ожидающие команды с меньшим приоритетом, но не запуск
+        записи или пакет команд, поставленные раньше нее (ORDERED_BEFORE_STOP):
+        иначе пара Start, Stop выполнилась бы в обратном порядке.
+
+        Args:
+            name: Название команды для статистики
+            coro_func: Асинхронная функция команды
+            *args: Аргументы для coro_func
+            trace: Трасса задержки, начатая при приеме пакета (если команда пришла по сети)
+            internal: Служебная операция (опрос, подключение): не учитывается
+                      в статистике команд и гистограммах задержек
+            fire_at: Момент выполнения в секундах эпохи; до момента fire_at - lead
+                     команда ждет в таймере, а не в очереди исполнителя
+            lead: За сколько секунд до fire_at команда ставится в очередь
+
+        Returns:
+            Future: Результат выполнения команды (отменяется, если исполнитель остановлен)
+        """
+        if internal:
+            trace = None
+        elif trace is None:
+            trace = CommandTrace(name)
+            trace.mark(STAGE_QUEUED)
+        future = Future()
+        if fire_at is not None and fire_at - time.time() > lead:
+            self.timer.schedule(fire_at, lead, lambda: self._enqueue(name, coro_func, args, future, trace), future)
+            return future
+        self._enqueue(name, coro_func, args, future, trace)
+        return future
+
+    def _enqueue(self, name: str, coro_func: Callable, args: tuple,
+                 future: Future, trace: Optional[CommandTrace]) -> None:
+        """Ставит команду в очередь по приоритету (см. submit)"""
+        priority = COMMAND_PRIORITIES.get(name, PRIORITY_COMMAND)
+        with self._condition:
+            if self._stopped:
+                future.cancel()
+                return
+            sequence = next(self._sequence)
+            order = sequence
+            if priority == PRIORITY_STOP and self._pending_start is not None:
+                # Остановка выполняется сразу после ожидающего запуска
+                priority, order = PRIORITY_COMMAND, self._pending_start
+            elif name in ORDERED_BEFORE_STOP:
+                self._pending_start = sequence
+            key = (priority, order, sequence)
+            if any(queued_key > key for queued_key, _ in self._queue):
+                self.preemptions += 1
+            heapq.heappush(self._queue, (key, (name, coro_func, args, future, time.perf_counter(), trace)))
+            self._condition.notify()
+
+    @property
+    def queue_depth(self) -> int:
+        """Количество команд, ожидающих выполнения, включая выполняемую"""
+        with self._condition:
+            pending = sum(1 for _, item in self._queue if item is not self._STOP and item[5] is not None)
+        return pending + (1 if self._busy else 0)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Возвращает статистику исполнителя
+
+        Returns:
+            Dict[str, Any]: Глубина очереди и время выполнения по каждой команде
+        """
+        with self._stats_lock:
+            commands = {name: stats.as_dict() for name, stats in self._stats.items()}
+        return {
+            "queue_depth": self.queue_depth,
+            "current_command": self.current_command,
+            "scheduled": self.timer.pending,
+            "preemptions": self.preemptions,
+            "internal_jobs": self.internal_jobs,
+            "commands": commands,
+        }
+
+    def stop(self) -> None:
+        """Останавливает исполнитель после выполнения текущей операции; ожидающие отменяются"""
+        self.timer.stop()
+        with self._condition:
+            self._stopped = True
+            heapq.heappush(self._queue, ((-1, 0, 0), self._STOP))
+            self._condition.notify()
@@ -0,0 +1,181 @@
+"""
+Локальная имитация Shogun Live для проверки без установленной программы.
+FakeCaptureServices повторяет используемую приложением часть CaptureServices
+(состояние и имя захвата, запуск и остановка записи) и, если включено,
+уведомляет подписчиков об изменениях из отдельного потока, как API при
+доставке событий по сети. Методы operator_* имитируют действия оператора
+в интерфейсе самого Shogun Live. Имитация может отвечать с задержкой,
+случайно отказывать в запросах и завершаться (shutdown), как перезапущенный
+Shogun Live; этим пользуется SimulatedShogunBackend (shogun/backends.py).
+"""
+
+import itertools
+import queue
+import random
+import threading
+from typing import Any, Callable, Dict, Tuple
+
+class FakeCaptureServices:
+    """Имитация CaptureServices Shogun Live"""
+
+    def __init__(self, push: bool = True, capture_name: str = "Take", latency: float = 0.0,
+                 failure_rate: float = 0.0):
+        """
+        Args:
+            push: Поддерживать подписку на изменения (False - только опрос)
+            capture_name: Начальное имя захвата
+            latency: Задержка ответа на каждый запрос, с
+            failure_rate: Доля запросов, завершающихся ошибкой соединения (0 - без сбоев)
+        """
+        self.push = push
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.alive = True  # False после shutdown(): запросы завершаются ошибкой соединения
+        self._lock = threading.Lock()
+        self._recording = False
+        self._capture_name = capture_name
+        self._take_index = 0
+        self._latest_take = ""
+        self._callbacks: Dict[int, Tuple[str, Callable]] = {}
+        self._callback_ids = itertools.count(1)
+        self._events: "queue.Queue" = queue.Queue()
+        self.calls = 0  # Количество запросов к имитации
+        self.failures = 0  # Запросы, завершенные имитацией сбоя
+        if push:
+            threading.Thread(target=self._deliver, name="FakeShogunEvents", daemon=True).start()
+
+    def __getattr__(self, name: str) -> Any:
+        # Методы подписки существуют, только если имитация поддерживает уведомления
+        if name.startswith("add_") and name.endswith("_changed_callback") and self.__dict__.get("push"):
+            topic = name[len("add_"):-len("_changed_callback")]
+            return lambda callback: self._add_callback(topic, callback)
+        raise AttributeError(name)
+
+    def _request(self) -> None:
+        """Учитывает запрос и имитирует задержку ответа"""
+        self.calls += 1
+        if self.latency:
+            threading.Event().wait(self.latency)
+        if not self.alive:
+            raise ConnectionError("Соединение с Shogun Live закрыто")
+        if self.failure_rate and random.random() < self.failure_rate:
+            self.failures += 1
+            raise ConnectionError("Имитация сбоя соединения с Shogun Live")
+
+    # Методы CaptureServices
+
+    def latest_capture_state(self) -> str:
+        """Состояние последнего захвата: "Started" во время записи"""
+        self._request()
+        with self._lock:
+            return "Started" if self._recording else "Stopped"
+
+    def latest_capture_name(self) -> str:
+        """Имя последнего тейка"""
+        self._request()
+        with self._lock:
+            return self._latest_take
+
+    def capture_name(self) -> Tuple[bool, str]:
+        """Результат запроса и имя следующего захвата"""
+        self._request()
+        with self._lock:
+            return True, self._capture_name
+
+    def set_capture_name(self, name: str) -> bool:
+        """Устанавливает имя следующего захвата"""
+        self._request()
+        self._rename(name)
+        return True
+
+    def start_capture(self) -> bool:
+        """Начинает запись"""
+        self._request()
+        return self._start()
+
+    def stop_capture(self, flags: int = 0) -> bool:
+        """Останавливает запись"""
+        self._request()
+        return self._stop()
+
+    def remove_callback(self, callback_id: int) -> None:
+        """Отменяет подписку"""
+        with self._lock:
+            self._callbacks.pop(callback_id, None)
+
+    def shutdown(self) -> None:
+        """Завершает имитацию: запросы и уведомления больше не обслуживаются"""
+        self.alive = False
+        self._events.put(None)
+
+    # Действия оператора в интерфейсе Shogun Live (без задержки запроса)
+
+    def operator_start(self) -> bool:
+        """Оператор начинает запись в Shogun Live"""
+        return self._start()
+
+    def operator_stop(self) -> bool:
+        """Оператор останавливает запись в Shogun Live"""
+        return self._stop()
+
+    def operator_rename(self, name: str) -> None:
+        """Оператор меняет имя захвата в Shogun Live"""
+        self._rename(name)
+
+    # Изменение состояния и уведомления
+
+    def _start(self) -> bool:
+        """Начинает запись, если она не идет"""
+        with self._lock:
+            if self._recording:
+                return False
+            self._recording = True
+            self._take_index += 1
+            self._latest_take = f"{self._capture_name}_{self._take_index:03d}"
+        self._notify("latest_capture_state")
+        self._notify("latest_capture_name")
+        return True
+
+    def _stop(self) -> bool:
+        """Останавливает запись, если она идет"""
+        with self._lock:
+            if not self._recording:
+                return False
+            self._recording = False
+        self._notify("latest_capture_state")
+        return True
+
+    def _rename(self, name: str) -> None:
+        """Меняет имя захвата"""
+        with self._lock:
+            if name == self._capture_name:
+                return
+            self._capture_name = name
+        self._notify("capture_name")
+
+    def _add_callback(self, topic: str, callback: Callable) -> int:
+        """Регистрирует подписчика на изменения темы"""
+        with self._lock:
+            callback_id = next(self._callback_ids)
+            self._callbacks[callback_id] = (topic, callback)
+        return callback_id
+
+    def _notify(self, topic: str) -> None:
+        """Ставит уведомление в очередь доставки"""
+        if self.push:
+            self._events.put(topic)
+
+    def _deliver(self) -> None:
+        """Поток доставки уведомлений подписчикам"""
+        while True:
+            topic = self._events.get()
+            if topic is None:
+                return
+            with self._lock:
+                callbacks = [callback for callback_topic, callback in self._callbacks.values()
+                             if callback_topic == topic]
+            for callback in callbacks:
+                try:
+                    callback(topic)
+                except Exception:
+                    pass
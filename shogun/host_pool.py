@@ -0,0 +1,276 @@
+"""
+Пул соединений с дополнительными машинами Shogun Live.
+Запуск, остановка записи и смена имени захвата выполняются на всех машинах
+одновременно: у каждой машины свой поток - единственный владелец ее соединения,
+потоки заранее проверяют соединение и ждут общего сигнала, по которому все
+вызовы API (включая вызов на основной машине) начинаются в один момент.
+Для каждого такого вызова запоминаются задержка по машинам и разброс моментов
+вызова и ответа между машинами.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+import config
+from shogun.command_executor import CommandStats
+
+LOCAL_HOST = "local"  # Имя основной машины в отчетах
+
+class ShogunHost:
+    """Соединение с одной дополнительной машиной Shogun Live"""
+
+    def __init__(self, name: str, address: str, capture_factory: Callable[[str], Any]):
+        """
+        Args:
+            name: Имя машины для журнала и отчетов
+            address: Адрес машины
+            capture_factory: Создает объект CaptureServices по адресу машины
+        """
+        self.logger = logging.getLogger('ShogunOSC')
+        self.name = name
+        self.address = address
+        self._capture_factory = capture_factory
+        self.capture: Any = None
+        self.connected = False
+        self._connect_pending = False  # Подключение уже поставлено в поток машины
+        self.stats: Dict[str, CommandStats] = {}
+        # Все обращения к соединению машины выполняются в ее потоке
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"ShogunHost-{name}")
+
+    def ensure_connected(self) -> bool:
+        """Подключается к машине, если соединения нет (вызывается в потоке машины)"""
+        if self.connected:
+            return True
+        try:
+            self.capture = self._capture_factory(self.address)
+            str(self.capture.latest_capture_state())
+            self.connected = True
+            self.logger.info(f"Подключено к Shogun Live на '{self.name}' ({self.address})")
+        except Exception as e:
+            self.capture = None
+            self.logger.warning(f"Не удалось подключиться к Shogun Live на '{self.name}' ({self.address}): {e}")
+        return self.connected
+
+    def schedule_connect(self) -> None:
+        """Ставит подключение в поток машины, если оно еще не поставлено"""
+        if self._connect_pending:
+            return
+        self._connect_pending = True
+        try:
+            self.executor.submit(self._connect)
+        except RuntimeError:
+            # Поток машины уже завершен (машина исключена из пула)
+            self._connect_pending = False
+
+    def _connect(self) -> None:
+        """Подключение в потоке машины"""
+        try:
+            self.ensure_connected()
+        finally:
+            self._connect_pending = False
+
+    def close(self) -> None:
+        """Завершает поток машины после выполнения текущих вызовов"""
+        self.executor.shutdown(wait=False)
+        self.connected = False
+
+class ShogunHostPool:
+    """Одновременное выполнение команд записи на нескольких машинах Shogun Live"""
+
+    def __init__(self, capture_factory: Callable[[str], Any],
+                 prepare_timeout: float = config.SHOGUN_HOST_PREPARE_TIMEOUT,
+                 call_timeout: float = config.SHOGUN_HOST_CALL_TIMEOUT):
+        """
+        Args:
+            capture_factory: Создает объект CaptureServices по адресу машины
+            prepare_timeout: Сколько ждать готовности машин перед общим сигналом, с
+            call_timeout: Сколько ждать ответа машины после общего сигнала, с
+        """
+        self.logger = logging.getLogger('ShogunOSC')
+        self._capture_factory = capture_factory
+        self.prepare_timeout = prepare_timeout
+        self.call_timeout = call_timeout
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, ShogunHost] = {}
+        self.reports: Deque[Dict[str, Any]] = deque(maxlen=20)  # Отчеты о последних командах
+        self.fan_outs = 0
+        self.max_call_skew_ms = 0.0
+
+    @property
+    def hosts(self) -> List[ShogunHost]:
+        """Дополнительные машины"""
+        with self._lock:
+            return list(self._hosts.values())
+
+    def configure(self, hosts: Dict[str, str]) -> None:
+        """
+        Задает состав машин; новые машины подключаются сразу в своих потоках
+
+        Args:
+            hosts: Имя машины -> адрес
+        """
+        with self._lock:
+            for name in list(self._hosts):
+                host = self._hosts[name]
+                if hosts.get(name) != host.address:
+                    host.close()
+                    del self._hosts[name]
+                    self.logger.info(f"Машина Shogun Live '{name}' исключена из пула")
+            for name, address in hosts.items():
+                if name not in self._hosts:
+                    host = ShogunHost(name, address, self._capture_factory)
+                    self._hosts[name] = host
+                    host.schedule_connect()
+                    self.logger.info(f"Машина Shogun Live '{name}' ({address}) добавлена в пул")
+
+    def fan_out(self, command: str, remote_call: Callable[[Any], Any], local_call: Callable[[], Any]) -> Any:
+        """
+        Выполняет команду на основной и всех дополнительных машинах одновременно
+
+        Args:
+            command: Название команды для отчета
+            remote_call: Вызов API дополнительной машины, получает ее CaptureServices
+            local_call: Вызов API основной машины (выполняется в текущем потоке)
+
+        Returns:
+            Any: Результат вызова на основной машине (исключение передается дальше)
+        """
+        hosts = self.hosts
+        if not hosts:
+            return local_call()
+
+        # Машины без соединения не задерживают команду: она на них не выполняется,
+        # а подключение выполняется в их потоках для следующих команд
+        connected = [host for host in hosts if host.connected]
+        for host in hosts:
+            if host not in connected:
+                host.schedule_connect()
+
+        go = threading.Event()
+        ready = threading.Semaphore(0)
+        futures: List[Tuple[ShogunHost, Future]] = [
+            (host, host.executor.submit(self._host_call, host, remote_call, ready, go)) for host in connected]
+
+        # Ждем, пока потоки подключенных машин возьмут вызов; опоздавшие выполнят вызов по готовности
+        deadline = time.perf_counter() + self.prepare_timeout
+        for _ in connected:
+            if not ready.acquire(timeout=max(deadline - time.perf_counter(), 0)):
+                break
+
+        go.set()
+        local_error: Optional[BaseException] = None
+        local_result = None
+        fired_at = time.perf_counter()
+        try:
+            local_result = local_call()
+        except Exception as e:
+            local_error = e
+        timings = {LOCAL_HOST: (fired_at, time.perf_counter(), local_error is None, str(local_error or ""))}
+        for host in hosts:
+            if host not in connected:
+                timings[host.name] = (None, None, False, "нет соединения")
+
+        deadline = time.perf_counter() + self.call_timeout
+        for host, future in futures:
+            try:
+                timings[host.name] = future.result(timeout=max(deadline - time.perf_counter(), 0))
+            except FutureTimeoutError:
+                timings[host.name] = (None, None, False, "нет ответа")
+            except Exception as e:
+                timings[host.name] = (None, None, False, str(e))
+
+        self._report(command, timings)
+        if local_error is not None:
+            raise local_error
+        return local_result
+
+    def _host_call(self, host: ShogunHost, remote_call: Callable[[Any], Any],
+                   ready: threading.Semaphore, go: threading.Event) -> Tuple[Optional[float], Optional[float], bool, str]:
+        """
+        Выполняет вызов на дополнительной машине по общему сигналу (в потоке машины)
+
+        Returns:
+            Tuple: Момент вызова, момент ответа (perf_counter), успех, описание ошибки
+        """
+        ready.release()
+        go.wait(self.call_timeout)
+        fired_at = time.perf_counter()
+        try:
+            result = remote_call(host.capture)
+        except Exception as e:
+            host.connected = False  # Следующая команда подключится заново
+            return fired_at, time.perf_counter(), False, str(e)
+        return fired_at, time.perf_counter(), result is not False, ""
+
+    def _report(self, command: str, timings: Dict[str, Tuple[Optional[float], Optional[float], bool, str]]) -> None:
+        """Сохраняет отчет о команде и обновляет статистику машин"""
+        fired = [t[0] for t in timings.values() if t[0] is not None]
+        done = [t[1] for t in timings.values() if t[1] is not None]
+        report = {
+            "command": command,
+            "time": time.strftime("%H:%M:%S"),
+            "take": None,
+            "ok": all(t[2] for t in timings.values()),
+            # Разброс моментов вызова API и получения ответа между машинами
+            "call_skew_ms": round((max(fired) - min(fired)) * 1000, 3) if len(fired) > 1 else 0.0,
+            "reply_skew_ms": round((max(done) - min(done)) * 1000, 3) if len(done) > 1 else 0.0,
+            "hosts": {},
+        }
+        latencies: Dict[str, Tuple[float, bool]] = {}
+        for name, (fired_at, done_at, ok, error) in timings.items():
+            latency_ms = (done_at - fired_at) * 1000 if fired_at is not None and done_at is not None else None
+            report["hosts"][name] = {"ok": ok, "latency_ms": round(latency_ms, 3) if latency_ms is not None else None}
+            if error:
+                report["hosts"][name]["error"] = error
+                self.logger.error(f"Команда '{command}' не выполнена на '{name}': {error}")
+            if latency_ms is not None:
+                latencies[name] = (latency_ms, ok)
+        with self._lock:
+            for name, (latency_ms, ok) in latencies.items():
+                if name in self._hosts:
+                    self._hosts[name].stats.setdefault(command, CommandStats()).add(latency_ms, ok)
+            self.fan_outs += 1
+            self.max_call_skew_ms = max(self.max_call_skew_ms, report["call_skew_ms"])
+            self.reports.append(report)
+        self.logger.info(f"Команда '{command}' на {len(timings)} машинах: разброс вызовов "
+                         f"{report['call_skew_ms']:.2f} мс, ответов {report['reply_skew_ms']:.2f} мс")
+
+    def set_take_name(self, take_name: str) -> None:
+        """Добавляет имя тейка в отчет о последней команде запуска записи"""
+        with self._lock:
+            for report in reversed(self.reports):
+                if report["command"] == "start_recording":
+                    report["take"] = take_name
+                    break
+
+    def close(self) -> None:
+        """Завершает потоки всех машин"""
+        self.configure({})
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Возвращает состояние машин, задержки по командам и отчеты о последних командах
+
+        Returns:
+            Dict[str, Any]: Статистика пула
+        """
+        with self._lock:
+            hosts = {
+                host.name: {
+                    "address": host.address,
+                    "connected": host.connected,
+                    "commands": {command: stats.as_dict() for command, stats in host.stats.items()},
+                }
+                for host in self._hosts.values()
+            }
+            return {
+                "hosts": hosts,
+                "fan_outs": self.fan_outs,
+                "max_call_skew_ms": round(self.max_call_skew_ms, 3),
+                "recent": list(self.reports)[-5:],
+            }
@@ -0,0 +1,118 @@
+"""
+Адаптивная частота опроса Shogun Live.
+Вокруг запуска и остановки записи или смены имени захвата состояние опрашивается
+часто, чтобы быстро подтвердить переход; при долгом отсутствии изменений опрос
+замедляется, а пока Shogun Live не запущен, API не опрашивается вовсе.
+Если изменения приходят подпиской на уведомления, опрос только подстраховывает
+ее и выполняется с редким интервалом.
+"""
+
+import threading
+import time
+from typing import Any, Dict
+
+import config
+
+# Режимы опроса
+POLL_FAST = "fast"      # Частый опрос вокруг перехода
+POLL_NORMAL = "normal"  # Обычный опрос
+POLL_IDLE = "idle"      # Редкий опрос при долгом отсутствии изменений
+POLL_ABSENT = "absent"  # Shogun Live не запущен: проверяется только процесс
+POLL_PUSH = "push"      # Изменения приходят уведомлениями, опрос для подстраховки
+
+class AdaptivePollScheduler:
+    """Выбор интервала до следующего такта мониторинга"""
+
+    def __init__(self, fast_ms: int = config.SHOGUN_POLL_FAST_MS,
+                 normal_ms: int = config.SHOGUN_POLL_NORMAL_MS,
+                 idle_ms: int = config.SHOGUN_POLL_IDLE_MS,
+                 fast_window: float = config.SHOGUN_POLL_FAST_WINDOW,
+                 idle_after: float = config.SHOGUN_POLL_IDLE_AFTER):
+        """
+        Args:
+            fast_ms: Интервал частого опроса, мс
+            normal_ms: Интервал обычного опроса, мс
+            idle_ms: Интервал редкого опроса, мс
+            fast_window: Длительность частого опроса после перехода, с
+            idle_after: Время без изменений, после которого опрос замедляется, с
+        """
+        self.configure(fast_ms, normal_ms, idle_ms, fast_window, idle_after)
+        self._wake = threading.Event()
+        now = time.monotonic()
+        self._fast_until = now + self.fast_window  # Сразу после запуска опрашиваем часто
+        self._last_change = now
+        self.mode = POLL_FAST
+        self.interval = self.fast_interval
+        self.ticks = {POLL_FAST: 0, POLL_NORMAL: 0, POLL_IDLE: 0, POLL_ABSENT: 0, POLL_PUSH: 0}
+        self.push_active = False  # Изменения всех полей приходят подпиской на уведомления
+        self.transitions = 0
+
+    def configure(self, fast_ms: int, normal_ms: int, idle_ms: int,
+                  fast_window: float, idle_after: float) -> None:
+        """Задает интервалы опроса (применяется со следующего такта)"""
+        self.fast_interval = max(fast_ms, 10) / 1000
+        self.normal_interval = max(normal_ms / 1000, self.fast_interval)
+        self.idle_interval = max(idle_ms / 1000, self.normal_interval)
+        self.fast_window = fast_window
+        self.idle_after = idle_after
+
+    def note_transition(self) -> None:
+        """
+        Отмечает переход состояния (команда записи, смена имени, изменение в снимке)
+
+        Частый опрос начинается немедленно: ожидание текущего такта прерывается.
+        """
+        now = time.monotonic()
+        self._fast_until = now + self.fast_window
+        self._last_change = now
+        self.transitions += 1
+        self._wake.set()
+
+    def next_interval(self, shogun_running: bool, recording: bool) -> float:
+        """
+        Выбирает интервал до следующего такта по итогам текущего
+
+        Args:
+            shogun_running: Запущен ли процесс Shogun Live
+            recording: Идет ли запись (во время записи опрос не замедляется до редкого)
+
+        Returns:
+            float: Интервал в секундах
+        """
+        now = time.monotonic()
+        if not shogun_running:
+            # Процесс проверяется дешево, его поиск имеет собственную отсрочку
+            self.mode, self.interval = POLL_ABSENT, self.normal_interval
+        elif self.push_active:
+            self.mode, self.interval = POLL_PUSH, self.idle_interval
+        elif now < self._fast_until:
+            self.mode, self.interval = POLL_FAST, self.fast_interval
+        elif not recording and now - self._last_change >= self.idle_after:
+            self.mode, self.interval = POLL_IDLE, self.idle_interval
+        else:
+            self.mode, self.interval = POLL_NORMAL, self.normal_interval
+        self.ticks[self.mode] += 1
+        return self.interval
+
+    def wait(self, timeout: float) -> None:
+        """Ожидает следующий такт; прерывается переходом или вызовом wake()"""
+        self._wake.wait(timeout)
+        self._wake.clear()
+
+    def wake(self) -> None:
+        """Прерывает текущее ожидание (например, при остановке потока)"""
+        self._wake.set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Возвращает текущий интервал, режим и число тактов в каждом режиме
+
+        Returns:
+            Dict[str, Any]: Статистика опроса
+        """
+        return {
+            "poll_interval_ms": round(self.interval * 1000),
+            "poll_mode": self.mode,
+            "poll_transitions": self.transitions,
+            **{f"ticks_{mode}": count for mode, count in self.ticks.items()},
+        }
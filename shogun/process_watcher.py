@@ -0,0 +1,134 @@
+"""
+Отслеживание процесса Shogun Live без обхода всей таблицы процессов на каждой проверке.
+Найденный процесс проверяется дешевой проверкой жизни по сохраненному PID; полный
+обход процессов выполняется только после его исчезновения и, пока Shogun Live
+не запущен, не чаще чем позволяет растущая отсрочка. Перезапуск определяется
+по времени создания процесса, а не по смене PID.
+"""
+
+import logging
+import time
+from typing import Any, Dict, Iterable, Optional
+
+import psutil
+
+import config
+
+# Итог проверки процесса
+PROCESS_RUNNING = "running"      # Процесс работает (тот же, что и раньше)
+PROCESS_RESTARTED = "restarted"  # Найден процесс с другим временем создания
+PROCESS_ABSENT = "absent"        # Процесс не найден
+
+def is_shogun_process_name(name: Optional[str], names: Iterable[str] = config.SHOGUN_PROCESS_NAMES) -> bool:
+    """Проверяет имя процесса на совпадение с одним из имен Shogun Live"""
+    return bool(name) and any(candidate in name for candidate in names)
+
+class ShogunProcessWatcher:
+    """Наблюдатель за процессом Shogun Live с кешированием найденного процесса"""
+
+    def __init__(self, names: Iterable[str] = config.SHOGUN_PROCESS_NAMES,
+                 backoff_min: float = config.SHOGUN_SCAN_BACKOFF_MIN,
+                 backoff_max: float = config.SHOGUN_SCAN_BACKOFF_MAX):
+        """
+        Args:
+            names: Подстроки имени процесса Shogun Live
+            backoff_min: Интервал полного обхода сразу после исчезновения процесса, с
+            backoff_max: Максимальный интервал полного обхода, пока процесс не запущен, с
+        """
+        self.logger = logging.getLogger('ShogunOSC')
+        self.names = tuple(names)
+        self.backoff_min = backoff_min
+        self.backoff_max = max(backoff_max, backoff_min)
+        self._process: Optional[psutil.Process] = None
+        self._create_time: Optional[float] = None  # Время создания последнего найденного процесса
+        self._backoff = 0.0
+        self._next_scan = 0.0  # Время (time.monotonic), раньше которого полный обход не выполняется
+
+        self.liveness_checks = 0
+        self.full_scans = 0
+        self.scan_time_total = 0.0
+        self.last_scan_ms = 0.0
+        self.restarts = 0
+
+    @property
+    def pid(self) -> Optional[int]:
+        """PID отслеживаемого процесса или None"""
+        return self._process.pid if self._process is not None else None
+
+    def check(self) -> str:
+        """
+        Проверяет процесс Shogun Live
+
+        Returns:
+            str: PROCESS_RUNNING, PROCESS_RESTARTED или PROCESS_ABSENT
+        """
+        if self._process is not None:
+            self.liveness_checks += 1
+            # is_running() сверяет время создания, поэтому повторно выданный PID не считается живым
+            try:
+                alive = self._process.is_running() and self._process.status() != psutil.STATUS_ZOMBIE
+            except psutil.Error:
+                alive = False
+            if alive:
+                return PROCESS_RUNNING
+            self.logger.info(f"Процесс Shogun Live (PID: {self._process.pid}) завершился")
+            self._process = None
+            self._backoff = 0.0
+            self._next_scan = 0.0  # Процесс мог быть сразу перезапущен: ищем без отсрочки
+
+        now = time.monotonic()
+        if now < self._next_scan:
+            return PROCESS_ABSENT
+
+        process = self._scan()
+        if process is None:
+            self._backoff = min(max(self._backoff * 2, self.backoff_min), self.backoff_max)
+            self._next_scan = now + self._backoff
+            return PROCESS_ABSENT
+
+        try:
+            create_time = process.create_time()
+        except psutil.Error:
+            return PROCESS_ABSENT
+        self._process = process
+        self._backoff = 0.0
+        if self._create_time is not None and create_time != self._create_time:
+            self._create_time = create_time
+            self.restarts += 1
+            self.logger.info(f"Обнаружен перезапуск Shogun Live (PID: {process.pid})")
+            return PROCESS_RESTARTED
+        self._create_time = create_time
+        return PROCESS_RUNNING
+
+    def _scan(self) -> Optional[psutil.Process]:
+        """Полный обход таблицы процессов"""
+        self.full_scans += 1
+        started = time.perf_counter()
+        try:
+            for proc in psutil.process_iter(['name']):
+                if is_shogun_process_name(proc.info['name'], self.names):
+                    return proc
+            return None
+        except Exception as e:
+            self.logger.debug(f"Ошибка проверки процесса Shogun: {e}")
+            return None
+        finally:
+            self.last_scan_ms = (time.perf_counter() - started) * 1000
+            self.scan_time_total += self.last_scan_ms
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Возвращает статистику наблюдения за процессом
+
+        Returns:
+            Dict[str, Any]: PID, счетчики проверок и обходов, текущая отсрочка
+        """
+        return {
+            "pid": self.pid,
+            "liveness_checks": self.liveness_checks,
+            "full_scans": self.full_scans,
+            "avg_scan_ms": round(self.scan_time_total / self.full_scans, 2) if self.full_scans else 0,
+            "last_scan_ms": round(self.last_scan_ms, 2),
+            "scan_backoff_s": round(self._backoff, 2),
+            "restarts": self.restarts,
+        }
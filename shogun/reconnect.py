@@ -0,0 +1,174 @@
+"""
+Конечный автомат переподключения к Shogun Live с размыканием цепи.
+Автомат не выполняет попыток и не ждет сам: он решает, когда следующая
+попытка (проба) должна состояться, а пробы выполняет исполнитель команд по
+сигналу цикла мониторинга. Паузы между пробами растут экспоненциально со
+случайным разбросом, после серии неудач цепь размыкается и команды
+отклоняются сразу, не дожидаясь очередной пробы.
+"""
+
+import logging
+import random
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import config
+
+# Состояния соединения
+CONN_CONNECTED = "connected"  # Соединение работает
+CONN_PROBING = "probing"      # Проба подключения назначена немедленно
+CONN_BACKOFF = "backoff"      # Пауза перед следующей пробой
+CONN_OPEN = "open"            # Цепь разомкнута: команды отклоняются, пробы редкие
+
+class ReconnectStateMachine:
+    """Расписание проб подключения и учет времени восстановления соединения"""
+
+    def __init__(self, base_delay: float = config.BASE_RECONNECT_DELAY,
+                 max_delay: float = config.MAX_RECONNECT_DELAY,
+                 open_after: int = config.MAX_RECONNECT_ATTEMPTS,
+                 jitter: float = config.RECONNECT_JITTER):
+        """
+        Args:
+            base_delay: Пауза после первой неудачной пробы, с
+            max_delay: Максимальная пауза и интервал проб при разомкнутой цепи, с
+            open_after: Число неудачных проб подряд, после которого цепь размыкается
+            jitter: Доля паузы, на которую она случайно сокращается (0 - без разброса)
+        """
+        self.logger = logging.getLogger('ShogunOSC')
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.open_after = max(open_after, 1)
+        self.jitter = min(max(jitter, 0.0), 1.0)
+        self._lock = threading.Lock()
+        self.state = CONN_PROBING
+        self.failures = 0  # Неудачные пробы подряд
+        self._next_probe_at = 0.0
+        self._lost_at: Optional[float] = None  # Момент потери соединения (time.monotonic)
+
+        self.probes = 0
+        self.probe_failures = 0
+        self.circuit_opens = 0
+        self.fast_fails = 0
+        self.reconnects = 0
+        self._reconnect_times: List[float] = []  # Время восстановления соединения, с
+
+    @property
+    def is_open(self) -> bool:
+        """Цепь разомкнута"""
+        return self.state == CONN_OPEN
+
+    def probe_due(self) -> bool:
+        """Пора ли выполнить пробу подключения"""
+        with self._lock:
+            return self.state != CONN_CONNECTED and time.monotonic() >= self._next_probe_at
+
+    def time_until_probe(self) -> float:
+        """Время до следующей пробы, с (бесконечность, если соединение работает)"""
+        with self._lock:
+            if self.state == CONN_CONNECTED:
+                return float("inf")
+            return max(self._next_probe_at - time.monotonic(), 0.0)
+
+    def begin_probe(self) -> None:
+        """Отмечает начало пробы подключения"""
+        with self._lock:
+            self.probes += 1
+
+    def on_success(self) -> None:
+        """Проба успешна или соединение подтверждено"""
+        with self._lock:
+            if self.state == CONN_CONNECTED:
+                return
+            if self._lost_at is not None:
+                elapsed = time.monotonic() - self._lost_at
+                self._reconnect_times.append(elapsed)
+                del self._reconnect_times[:-100]
+                self.reconnects += 1
+                self.logger.info(f"Соединение с Shogun Live восстановлено за {elapsed:.2f} с")
+            self.state = CONN_CONNECTED
+            self.failures = 0
+            self._lost_at = None
+
+    def on_failure(self) -> None:
+        """Проба не удалась: назначает следующую с растущей паузой или размыкает цепь"""
+        with self._lock:
+            self.failures += 1
+            self.probe_failures += 1
+            if self.failures >= self.open_after:
+                if self.state != CONN_OPEN:
+                    self.circuit_opens += 1
+                    self.logger.warning(f"Shogun Live недоступен после {self.failures} попыток: "
+                                        f"команды отклоняются до восстановления соединения")
+                self.state = CONN_OPEN
+                delay = self.max_delay
+            else:
+                self.state = CONN_BACKOFF
+                delay = min(self.base_delay * (1.5 ** (self.failures - 1)), self.max_delay)
+            delay *= 1.0 - random.uniform(0.0, self.jitter)
+            self._next_probe_at = time.monotonic() + delay
+            self.logger.debug(f"Попытка {self.failures} не удалась. Следующая через {delay:.1f} секунд...")
+
+    def on_lost(self) -> None:
+        """Работавшее соединение потеряно: первая проба выполняется сразу"""
+        with self._lock:
+            if self.state != CONN_CONNECTED:
+                return
+            self._lost_at = time.monotonic()
+            self.state = CONN_PROBING
+            self.failures = 0
+            self._next_probe_at = 0.0
+
+    def on_absent(self) -> None:
+        """Процесс Shogun Live не запущен: пробы бессмысленны, команды отклоняются сразу"""
+        with self._lock:
+            if self.state == CONN_CONNECTED:
+                self._lost_at = time.monotonic()
+            if self.state != CONN_OPEN:
+                self.circuit_opens += 1
+            self.state = CONN_OPEN
+            self._next_probe_at = float("inf")
+
+    def prewarm(self) -> None:
+        """Процесс Shogun Live появился или перезапущен: проба назначается немедленно"""
+        with self._lock:
+            if self.state == CONN_CONNECTED:
+                self._lost_at = time.monotonic()
+            self.state = CONN_PROBING
+            self.failures = 0
+            self._next_probe_at = 0.0
+
+    def fast_fail(self) -> bool:
+        """
+        Проверяет, нужно ли отклонить команду без обращения к Shogun Live
+
+        Returns:
+            bool: True если цепь разомкнута (отказ учитывается в статистике)
+        """
+        with self._lock:
+            if self.state != CONN_OPEN:
+                return False
+            self.fast_fails += 1
+            return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Возвращает состояние автомата и статистику переподключений
+
+        Returns:
+            Dict[str, Any]: Состояние, счетчики проб и отказов, время восстановления соединения
+        """
+        with self._lock:
+            times = self._reconnect_times
+            return {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "probes": self.probes,
+                "probe_failures": self.probe_failures,
+                "circuit_opens": self.circuit_opens,
+                "fast_failed_commands": self.fast_fails,
+                "reconnects": self.reconnects,
+                "last_reconnect_s": round(times[-1], 3) if times else None,
+                "avg_reconnect_s": round(sum(times) / len(times), 3) if times else None,
+                "max_reconnect_s": round(max(times), 3) if times else None,
+            }
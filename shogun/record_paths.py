@@ -0,0 +1,76 @@
+"""
+Быстрый и медленный путь команд записи.
+Если соединение с Shogun Live подтверждено недавним успешным вызовом API,
+запуск и остановка записи выполняются сразу, без предварительных проверок,
+а итоговое состояние проверяется отдельной задачей после ответа команде.
+Медленный путь (проверка соединения и состояния одним запросом) используется,
+только когда подтверждение устарело. Для каждого пути учитываются задержка
+команды и число обращений к Shogun Live.
+"""
+
+import threading
+from typing import Any, Dict
+
+from shogun.command_executor import CommandStats
+
+# Пути выполнения команд записи
+PATH_FAST = "fast"  # Команда сразу, состояние проверяется после нее
+PATH_SLOW = "slow"  # Сначала соединение и состояние, затем команда
+
+class RecordPathStats:
+    """Статистика команд записи по путям выполнения"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency: Dict[str, CommandStats] = {PATH_FAST: CommandStats(), PATH_SLOW: CommandStats()}
+        self.round_trips: Dict[str, int] = {PATH_FAST: 0, PATH_SLOW: 0}
+        self.fallbacks = 0          # Быстрый путь не удался, команда повторена медленным
+        self.verified = 0           # Проверки после быстрого пути, подтвердившие состояние
+        self.verify_mismatches = 0  # Проверки, обнаружившие другое состояние
+
+    def add(self, path: str, elapsed_ms: float, round_trips: int, success: bool) -> None:
+        """
+        Добавляет результат команды записи
+
+        Args:
+            path: Путь, которым команда завершилась (PATH_FAST или PATH_SLOW)
+            elapsed_ms: Время выполнения команды, мс
+            round_trips: Обращений к Shogun Live за время команды
+            success: Успешна ли команда
+        """
+        with self._lock:
+            self.latency[path].add(elapsed_ms, success)
+            self.round_trips[path] += round_trips
+
+    def add_fallback(self) -> None:
+        """Учитывает переход с быстрого пути на медленный"""
+        with self._lock:
+            self.fallbacks += 1
+
+    def add_verification(self, matched: bool) -> None:
+        """Учитывает результат проверки состояния после быстрого пути"""
+        with self._lock:
+            if matched:
+                self.verified += 1
+            else:
+                self.verify_mismatches += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Возвращает задержку и число обращений к Shogun Live по путям
+
+        Returns:
+            Dict[str, Any]: Статистика путей, переходы на медленный путь и итоги проверок
+        """
+        with self._lock:
+            stats: Dict[str, Any] = {}
+            for path, latency in self.latency.items():
+                stats[path] = {
+                    **latency.as_dict(),
+                    "round_trips_per_command": (round(self.round_trips[path] / latency.count, 2)
+                                                if latency.count else 0),
+                }
+            stats["fallbacks"] = self.fallbacks
+            stats["verified"] = self.verified
+            stats["verify_mismatches"] = self.verify_mismatches
+            return stats
@@ -0,0 +1,158 @@
+"""
+Высокоточное планирование выполнения команд по временным меткам.
+Команды с временной меткой ждут в таймере (CommandTimer) и попадают в очередь
+исполнителя незадолго до момента выполнения, поэтому ожидание метки не
+задерживает другие команды и опрос. Последние миллисекунды исполнитель ждет
+активно по time.perf_counter, что не зависит от разрешения системного таймера
+(около 15 мс в Windows).
+"""
+
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import config
+
+async def wait_until(wall_time: float, spin_window: float = config.SCHEDULE_SPIN_WINDOW) -> float:
+    """
+    Ожидает наступления момента времени с точностью до долей миллисекунды
+
+    Args:
+        wall_time: Момент выполнения в секундах эпохи (time.time())
+        spin_window: Длительность активного ожидания перед моментом выполнения, с
+
+    Returns:
+        float: Отклонение фактического момента от запрошенного в секундах
+               (положительное - опоздание)
+    """
+    # Переводим целевое время в шкалу монотонного счетчика высокого разрешения
+    deadline = time.perf_counter() + (wall_time - time.time())
+
+    remaining = deadline - time.perf_counter()
+    while remaining > spin_window:
+        await asyncio.sleep(min(remaining - spin_window, 0.5))
+        remaining = deadline - time.perf_counter()
+
+    while time.perf_counter() < deadline:
+        pass
+
+    return time.time() - wall_time
+
+class CommandTimer(threading.Thread):
+    """Таймер команд с временными метками: передает их исполнителю незадолго до момента выполнения"""
+
+    def __init__(self, name: str = "ShogunCommandTimer"):
+        super().__init__(name=name, daemon=True)
+        # Очередь: (момент передачи по perf_counter, номер, действие, future команды)
+        self._queue: List[Tuple[float, int, Callable[[], None], Future]] = []
+        self._condition = threading.Condition()
+        self._sequence = itertools.count()
+        self._stopped = False
+
+    def schedule(self, wall_time: float, lead: float, action: Callable[[], None], future: Future) -> None:
+        """
+        Планирует передачу команды исполнителю
+
+        Args:
+            wall_time: Момент выполнения команды в секундах эпохи (time.time())
+            lead: За сколько секунд до момента выполнения вызвать action
+            action: Постановка команды в очередь исполнителя
+            future: Future команды; отменяется, если таймер остановлен раньше
+        """
+        due = time.perf_counter() + (wall_time - time.time()) - lead
+        with self._condition:
+            if self._stopped:
+                future.cancel()
+                return
+            heapq.heappush(self._queue, (due, next(self._sequence), action, future))
+            self._condition.notify()
+
+    def run(self) -> None:
+        """Ожидает ближайший момент передачи и передает команды по очереди"""
+        while True:
+            with self._condition:
+                while not self._stopped:
+                    timeout = self._queue[0][0] - time.perf_counter() if self._queue else None
+                    if timeout is not None and timeout <= 0:
+                        break
+                    self._condition.wait(timeout)
+                if self._stopped:
+                    return
+                _, _, action, future = heapq.heappop(self._queue)
+            if not future.cancelled():
+                action()
+
+    @property
+    def pending(self) -> int:
+        """Количество команд, ожидающих передачи исполнителю"""
+        with self._condition:
+            return len(self._queue)
+
+    def stop(self) -> None:
+        """Останавливает таймер и отменяет команды, ожидающие передачи"""
+        with self._condition:
+            self._stopped = True
+            pending, self._queue = self._queue, []
+            self._condition.notify()
+        for _, _, _, future in pending:
+            future.cancel()
+
+class DriftStats:
+    """Статистика отклонения фактического момента выполнения от запрошенного"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+        self.late_count = 0  # Команды, пришедшие или взятые в работу после временной метки
+        self.last_ms = 0.0
+        self.max_abs_ms = 0.0
+        self._sum_abs_ms = 0.0
+
+    def add(self, drift: float) -> None:
+        """
+        Добавляет измерение отклонения
+
+        Args:
+            drift: Отклонение в секундах
+        """
+        drift_ms = drift * 1000
+        with self._lock:
+            self.count += 1
+            if drift_ms > config.SCHEDULE_LATE_THRESHOLD_MS:
+                self.late_count += 1
+            self.last_ms = drift_ms
+            self.max_abs_ms = max(self.max_abs_ms, abs(drift_ms))
+            self._sum_abs_ms += abs(drift_ms)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Возвращает статистику в виде словаря"""
+        with self._lock:
+            return {
+                "count": self.count,
+                "late_count": self.late_count,
+                "last_ms": round(self.last_ms, 3),
+                "mean_abs_ms": round(self._sum_abs_ms / self.count, 3) if self.count else 0.0,
+                "max_abs_ms": round(self.max_abs_ms, 3),
+            }
+
+def check_timetag(timetag: Optional[float]) -> Optional[str]:
+    """
+    Проверяет, что временная метка команды находится в допустимом горизонте
+
+    Args:
+        timetag: Момент выполнения в секундах эпохи или None
+
+    Returns:
+        Optional[str]: Описание ошибки или None, если метка допустима
+    """
+    if timetag is None:
+        return None
+    ahead = timetag - time.time()
+    if ahead > config.OSC_MAX_SCHEDULE_AHEAD:
+        return (f"временная метка на {ahead:.1f} с в будущем превышает "
+                f"допустимые {config.OSC_MAX_SCHEDULE_AHEAD} с")
+    return None
@@ -3,16 +3,27 @@
 Предоставляет функциональность подключения, мониторинга и управления записью.
 """
 
-import asyncio
 import logging
 import time
-import psutil
-from typing import Optional, Tuple, Union, Any
+from concurrent.futures import CancelledError, Future, TimeoutError as FutureTimeoutError
+from typing import Optional, Tuple, Union, Any, Callable, Dict
 from PyQt5.QtCore import QThread, pyqtSignal
 
-from vicon_core_api import Client
-from shogun_live_api import CaptureServices
 import config
+from shogun.command_executor import CommandExecutor
+from shogun.coalescer import CommandCoalescer
+from shogun.backends import ShogunBackend, ShogunApiBackend, LOCAL_ADDRESS
+from shogun.process_watcher import PROCESS_ABSENT, PROCESS_RESTARTED
+from shogun.api_calls import ShogunApiCaller, ShogunCallTimeout
+from shogun.host_pool import ShogunHostPool
+from shogun.poll_scheduler import AdaptivePollScheduler
+from shogun.reconnect import ReconnectStateMachine
+from shogun.record_paths import RecordPathStats, PATH_FAST, PATH_SLOW
+from shogun.subscription import ShogunSubscription
+from shogun.state_snapshot import ShogunStateSnapshot, diff_snapshots
+from shogun.scheduling import DriftStats, wait_until
+from metrics.latency import (CommandTrace, mark_stage, STAGE_CONNECTION_CHECKED,
+                             STAGE_FIRE_WAIT, STAGE_API_CALL)
 
 class ShogunWorker(QThread):
     """Рабочий поток для взаимодействия с Shogun Live"""
@@ -22,144 +33,374 @@ class ShogunWorker(QThread):
     take_name_signal = pyqtSignal(str)    # Сигнал названия текущего тейка
     capture_name_changed_signal = pyqtSignal(str)  # Сигнал изменения имени захвата
     
-    def __init__(self):
+    def __init__(self, backend: Optional[ShogunBackend] = None):
+        """
+        Args:
+            backend: Бэкенд Shogun Live (по умолчанию - настоящий Shogun Live,
+                     SimulatedShogunBackend - имитация)
+        """
         super().__init__()
         self.logger = logging.getLogger('ShogunOSC')
         self.running = True
         self.connected = False
         self.shogun_client = None
         self.capture = None
+        self.backend = backend or ShogunApiBackend()
         self.shogun_pid = None
-        self.loop = None
-        self._last_check_time = 0  # Для оптимизации частоты проверок
-        self._check_interval = 1.0  # Интервал проверки в секундах
+        self.poll_scheduler = AdaptivePollScheduler()  # Интервал опроса зависит от переходов состояния
         self._current_capture_name = ""  # Текущее имя захвата для отслеживания изменений
+        self.current_take_name = ""  # Последнее известное имя тейка (для подтверждений команд)
+        self.command_executor = CommandExecutor()  # Единый исполнитель команд записи
+        # Одинаковые команды от нескольких контроллеров выполняются одним вызовом
+        self.command_coalescer = CommandCoalescer(self.command_executor.submit,
+                                                  config.COMMAND_COALESCE_WINDOW_MS,
+                                                  config.COMMAND_COALESCE_PENDING)
+        self.fire_drift_stats = DriftStats()  # Отклонение запуска/остановки от временных меток
+        self._shogun_present: Optional[bool] = None  # Был ли процесс найден на предыдущем такте
+        # Расписание проб подключения; пробы выполняет исполнитель по тактам мониторинга
+        self.reconnect = ReconnectStateMachine()
+        # Блокирующие вызовы API выполняются вне цикла событий исполнителя со сроком
+        self.api = ShogunApiCaller()
+        # Дополнительные машины Shogun Live, выполняющие команды одновременно с основной
+        self.host_pool = ShogunHostPool(self._create_host_capture)
+        self.host_pool.configure(config.SHOGUN_HOSTS)
+        # Снимок состояния за последний такт мониторинга; сигналы отправляются только при изменениях
+        self.state_snapshot: Optional[ShogunStateSnapshot] = None
+        # Снимок, доступный командам; сбрасывается командами, меняющими состояние
+        self._command_snapshot: Optional[ShogunStateSnapshot] = None
+        self._state_generation = 0  # Увеличивается при каждом сбросе снимка командой
+        self.snapshot_count = 0
+        self.snapshot_api_calls = 0
+        self.signals_emitted = 0
+        self.snapshot_cache_hits = 0  # Команды, выполненные без собственных проверок состояния
+        # Задержка и число обращений к Shogun Live для быстрого и медленного пути команд записи
+        self.record_paths = RecordPathStats()
+        # Уведомления Shogun Live запускают внеочередной такт; без них изменения находит опрос
+        self.subscription = ShogunSubscription(self._on_state_notification)
+        self._notified_at: Optional[float] = None  # Время первого необработанного уведомления
+        self.push_to_signal_ms = 0.0  # Задержка от уведомления до отправки сигнала
+        
+    def submit_command(self, name: str, coro_func: Callable, *args: Any,
+                       trace: Optional[CommandTrace] = None, fire_at: Optional[float] = None,
+                       lead: float = config.SCHEDULE_SPIN_WINDOW) -> Future:
+        """
+        Ставит команду в очередь единого исполнителя команд
+        
+        Одинаковые команды, пришедшие подряд в пределах окна схлопывания,
+        выполняются один раз и возвращают общий Future.
+        
+        Args:
+            name: Название команды для статистики
+            coro_func: Асинхронная функция команды
+            *args: Аргументы для coro_func
+            trace: Трасса задержки команды, начатая при приеме OSC-пакета
+            fire_at: Временная метка команды: до момента fire_at - lead команда
+                     ждет в таймере исполнителя и не задерживает другие команды
+            lead: За сколько секунд до fire_at команда ставится в очередь
+            
+        Returns:
+            Future: Результат выполнения команды
+        """
+        return self.command_coalescer.submit(name, coro_func, *args, trace=trace, fire_at=fire_at, lead=lead)
         
     def run(self):
         """Основной метод потока"""
-        self.loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(self.loop)
+        # Запускаем исполнитель команд; команды, поставленные до запуска, уже ждут в очереди
+        if not self.command_executor.is_alive():
+            self.command_executor.start()
         
-        # Первая попытка подключения
-        self.connected = self.loop.run_until_complete(self.connect_shogun())
-        self.connection_signal.emit(self.connected)
+        # Первая попытка подключения; если она не успела, подключится первый такт мониторинга
+        try:
+            self._call_owner("connect", self._probe_connection)
+        except FutureTimeoutError:
+            self.logger.warning("Первая попытка подключения к Shogun Live не завершилась вовремя")
         
         # Основной цикл мониторинга
         while self.running:
             try:
-                current_time = time.time()
-                # Оптимизация: проверяем только через определенные интервалы
-                if current_time - self._last_check_time >= self._check_interval:
-                    self._last_check_time = current_time
-                    
-                    # Проверяем наличие процесса Shogun Live
-                    shogun_running = self.check_shogun_process()
-                    
-                    # Проверяем соединение, если процесс запущен
-                    if shogun_running:
-                        if not self.connected:
-                            self.logger.info("Shogun Live обнаружен. Выполняем подключение...")
-                            self.connected = self.loop.run_until_complete(self.connect_shogun())
-                            self.connection_signal.emit(self.connected)
-                        else:
-                            # Проверяем существующее соединение
-                            connection_ok = self.loop.run_until_complete(self.ensure_connection())
-                            if not connection_ok:
-                                self.logger.warning("Соединение с Shogun Live потеряно")
-                                self.connected = False
-                                self.connection_signal.emit(False)
-                            
-                            # Если подключены, обновляем статус записи
-                            if self.connected:
-                                is_recording = self.loop.run_until_complete(self.check_shogun())
-                                self.recording_signal.emit(is_recording)
-                                
-                                # Обновляем имя тейка, если есть доступ к capture
-                                self._update_take_name()
-                                
-                                # Проверяем изменение имени захвата
-                                self.loop.run_until_complete(self._check_capture_name_change())
-                    else:
-                        if self.connected:
-                            self.logger.warning("Shogun Live не обнаружен. Соединение потеряно.")
-                            self.connected = False
-                            self.connection_signal.emit(False)
-                            self.recording_signal.emit(False)
-                            self.take_name_signal.emit("Нет соединения")
-                    
-                    # Обновляем статус в интерфейсе
-                    status = config.STATUS_CONNECTED if self.connected else config.STATUS_DISCONNECTED
-                    self.status_signal.emit(status)
-                
-                # Короткая пауза для снижения нагрузки на CPU
-                time.sleep(0.1)
+                shogun_running = self._monitor_tick()
+                recording = self.state_snapshot is not None and self.state_snapshot.recording
+                interval = self.poll_scheduler.next_interval(shogun_running, recording)
+                if not self.connected:
+                    # Следующий такт - не позже назначенной пробы подключения
+                    interval = min(interval, max(self.reconnect.time_until_probe(),
+                                                 self.poll_scheduler.fast_interval))
+                # Ожидание прерывается командами записи, чтобы сразу перейти к частому опросу
+                self.poll_scheduler.wait(interval)
+            except CancelledError:
+                # Исполнитель остановлен вместе с потоком
+                break
             except Exception as e:
                 self.logger.error(f"Ошибка в основном цикле мониторинга: {e}")
                 # Продолжаем работу после ошибки
                 time.sleep(1)
     
-    async def _check_capture_name_change(self) -> None:
-        """Проверяет изменение имени захвата в Shogun Live"""
+    def _create_host_capture(self, address: str) -> Any:
+        """
+        Создает CaptureServices для дополнительной машины Shogun Live
+        
+        Args:
+            address: Адрес машины
+            
+        Returns:
+            Any: Объект CaptureServices
+        """
+        return self.backend.connect(address)[1]
+    
+    def _call_owner(self, name: str, coro_func: Callable, *args: Any) -> Any:
+        """
+        Выполняет служебную операцию в исполнителе - единственном владельце соединения
+        
+        Args:
+            name: Название операции (определяет приоритет)
+            coro_func: Асинхронная функция
+            *args: Аргументы для coro_func
+            
+        Returns:
+            Any: Результат операции
+            
+        Raises:
+            FutureTimeoutError: Операция не выполнена за SHOGUN_OWNER_CALL_TIMEOUT;
+                                если она еще ждет в очереди, она отменяется
+        """
+        future = self.command_executor.submit(name, coro_func, *args, internal=True)
         try:
-            if not self.capture:
-                return
-                
-            # Получаем текущее имя захвата
-            result, capture_name = self.capture.capture_name()
+            return future.result(config.SHOGUN_OWNER_CALL_TIMEOUT)
+        except FutureTimeoutError:
+            future.cancel()
+            raise
+    
+    def _monitor_tick(self) -> bool:
+        """
+        Один такт мониторинга: снимок состояния и сигналы об изменившихся полях
+        
+        Returns:
+            bool: True если процесс Shogun Live запущен
+        """
+        previous = self.state_snapshot
+        generation = self._state_generation
+        
+        # Проверяем наличие процесса Shogun Live
+        shogun_running = self.check_shogun_process()
+        snapshot = None
+        if shogun_running:
+            # Опрос ждет в общей очереди: команды записи выполняются раньше него
+            try:
+                snapshot = self._call_owner("monitor", self._poll_shogun, previous)
+            except FutureTimeoutError:
+                # Исполнитель занят командой: состояние не изменилось, опрос повторится
+                self.logger.warning(f"Опрос состояния Shogun Live не выполнен за "
+                                    f"{config.SHOGUN_OWNER_CALL_TIMEOUT:.0f} с: исполнитель занят")
+                return shogun_running
+        elif self.connected:
+            self.logger.warning("Shogun Live не обнаружен. Соединение потеряно.")
+        
+        if snapshot is None:
+            self.connected = False
+            snapshot = ShogunStateSnapshot(time.monotonic(), False, False, "Нет соединения",
+                                           previous.capture_name if previous else "")
+        self._publish_snapshot(previous, snapshot, generation)
+        return shogun_running
+    
+    async def _poll_shogun(self, previous: Optional[ShogunStateSnapshot]) -> Optional[ShogunStateSnapshot]:
+        """
+        Подключается при необходимости и снимает состояние (выполняется исполнителем)
+        
+        Args:
+            previous: Предыдущий снимок или None
             
-            # Проверяем успешность запроса
-            if not result:
-                self.logger.debug(f"Не удалось получить имя захвата: {result}")
-                return
-                
-            # Если имя изменилось, отправляем сигнал
-            if capture_name != self._current_capture_name:
-                self.logger.info(f"Имя захвата изменилось: '{self._current_capture_name}' -> '{capture_name}'")
-                self._current_capture_name = capture_name
-                self.capture_name_changed_signal.emit(capture_name)
-                
+        Returns:
+            Optional[ShogunStateSnapshot]: Снимок или None, если соединения нет
+        """
+        if not self.connected:
+            # Пробы подключения выполняются по расписанию автомата переподключения
+            if not self.reconnect.probe_due() or not await self._probe_connection():
+                return None
+        snapshot = await self.take_snapshot(previous)
+        if snapshot is None:
+            # Запрос состояния не прошел: первая проба переподключения - сразу
+            self._connection_lost()
+            self._close_client()
+            if await self._probe_connection():
+                snapshot = await self.take_snapshot(previous)
+            else:
+                self.logger.warning("Соединение с Shogun Live потеряно")
+        return snapshot
+    
+    async def take_snapshot(self, previous: Optional[ShogunStateSnapshot]) -> Optional[ShogunStateSnapshot]:
+        """
+        Опрашивает Shogun Live один раз за такт
+        
+        Запрос состояния записи одновременно служит проверкой соединения. Имя тейка
+        меняется только с началом новой записи, поэтому запрашивается лишь при
+        изменении состояния записи.
+        
+        Args:
+            previous: Предыдущий снимок или None
+            
+        Returns:
+            Optional[ShogunStateSnapshot]: Снимок или None, если Shogun Live не ответил
+        """
+        if not self.capture:
+            return None
+        try:
+            self.snapshot_api_calls += 1
+            recording = 'Started' in str(await self.api.call("latest_capture_state",
+                                                             self.capture.latest_capture_state))
+        except Exception as e:
+            self.logger.debug(f"Ошибка проверки соединения: {e}")
+            return None
+        
+        if previous is not None and previous.connected and previous.recording == recording:
+            take_name = previous.take_name
+        else:
+            take_name = await self._read_take_name()
+        capture_name = await self._read_capture_name()
+        return ShogunStateSnapshot(time.monotonic(), True, recording, take_name, capture_name)
+    
+    async def _read_capture_name(self) -> str:
+        """Запрашивает имя следующего захвата; при ошибке возвращает последнее известное"""
+        try:
+            self.snapshot_api_calls += 1
+            result, capture_name = await self.api.call("capture_name", self.capture.capture_name)
+            if result:
+                return capture_name
+            self.logger.debug(f"Не удалось получить имя захвата: {result}")
         except Exception as e:
             self.logger.debug(f"Ошибка при проверке имени захвата: {e}")
+        return self._current_capture_name
     
-    def _update_take_name(self) -> None:
-        """Обновляет имя текущего тейка"""
+    async def _read_take_name(self) -> str:
+        """Запрашивает имя последнего тейка"""
         try:
-            if self.capture:
-                name = self.capture.latest_capture_name()
-                # Проверяем тип данных и преобразуем в строку, если это кортеж
-                if isinstance(name, tuple):
-                    name_str = str(name[0]) if name and len(name) > 0 else "Нет активного тейка"
-                else:
-                    name_str = str(name) if name else "Нет активного тейка"
-                
-                self.take_name_signal.emit(name_str)
+            self.snapshot_api_calls += 1
+            name = await self.api.call("latest_capture_name", self.capture.latest_capture_name)
+            # Проверяем тип данных и преобразуем в строку, если это кортеж
+            if isinstance(name, tuple):
+                name_str = str(name[0]) if name and len(name) > 0 else "Нет активного тейка"
+            else:
+                name_str = str(name) if name else "Нет активного тейка"
+            if name:
+                self.current_take_name = name_str
+            return name_str
         except Exception as e:
             self.logger.debug(f"Ошибка получения имени тейка: {e}")
+            return self.current_take_name or "Нет активного тейка"
+    
+    def _publish_snapshot(self, previous: Optional[ShogunStateSnapshot],
+                          snapshot: ShogunStateSnapshot, generation: int) -> None:
+        """
+        Сохраняет снимок и отправляет сигналы только об изменившихся полях
+        
+        Args:
+            previous: Предыдущий снимок
+            snapshot: Новый снимок
+            generation: Номер поколения на начало такта; если команда за это время
+                        изменила состояние, снимок командам не предоставляется
+        """
+        self.state_snapshot = snapshot
+        self.snapshot_count += 1
+        notified_at, self._notified_at = self._notified_at, None
+        if generation == self._state_generation and snapshot.connected:
+            self._command_snapshot = snapshot
+        else:
+            self._command_snapshot = None
+        
+        changed = diff_snapshots(previous, snapshot)
+        if changed:
+            self.poll_scheduler.note_transition()
+            if notified_at is not None:
+                self.push_to_signal_ms = (time.monotonic() - notified_at) * 1000
+        if "connected" in changed:
+            self.connection_signal.emit(snapshot.connected)
+            self.status_signal.emit(config.STATUS_CONNECTED if snapshot.connected else config.STATUS_DISCONNECTED)
+            self.signals_emitted += 2
+        if "recording" in changed:
+            self.recording_signal.emit(snapshot.recording)
+            self.signals_emitted += 1
+        if "take_name" in changed:
+            self.take_name_signal.emit(snapshot.take_name)
+            self.signals_emitted += 1
+        # Имя захвата сравнивается с известным приложению: изменения по команде уже учтены
+        if snapshot.connected and snapshot.capture_name != self._current_capture_name:
+            self.logger.info(f"Имя захвата изменилось: '{self._current_capture_name}' -> '{snapshot.capture_name}'")
+            self._current_capture_name = snapshot.capture_name
+            self.capture_name_changed_signal.emit(snapshot.capture_name)
+            self.signals_emitted += 1
+    
+    def _on_state_notification(self, topic: str) -> None:
+        """
+        Обрабатывает уведомление Shogun Live об изменении (из потока доставки уведомлений)
+        
+        Args:
+            topic: Тема уведомления
+        """
+        if self._notified_at is None:
+            self._notified_at = time.monotonic()
+        # Снимок, сделанный до изменения, командам больше не годится
+        self._state_generation += 1
+        self._command_snapshot = None
+        self.poll_scheduler.wake()
+    
+    def cached_snapshot(self) -> Optional[ShogunStateSnapshot]:
+        """
+        Возвращает снимок состояния, если он моложе допустимого для команд возраста
+        
+        Returns:
+            Optional[ShogunStateSnapshot]: Свежий снимок подключенного Shogun Live или None
+        """
+        snapshot = self._command_snapshot
+        if snapshot is None or snapshot.age * 1000 > config.SHOGUN_SNAPSHOT_MAX_AGE_MS:
+            return None
+        return snapshot
+    
+    def _invalidate_snapshot(self) -> None:
+        """Сбрасывает снимок для команд перед изменением состояния Shogun Live"""
+        self._state_generation += 1
+        self._command_snapshot = None
+        # Команда меняет состояние: подтверждаем переход частым опросом
+        self.poll_scheduler.note_transition()
+    
+    def get_monitor_stats(self) -> Dict[str, Any]:
+        """
+        Возвращает статистику опроса Shogun Live
+        
+        Returns:
+            Dict[str, Any]: Количество снимков, запросов к API и отправленных сигналов
+        """
+        snapshot = self.state_snapshot
+        return {
+            "snapshots": self.snapshot_count,
+            "api_calls": self.snapshot_api_calls,
+            "api_calls_per_snapshot": (round(self.snapshot_api_calls / self.snapshot_count, 2)
+                                       if self.snapshot_count else 0),
+            "signals_emitted": self.signals_emitted,
+            "command_cache_hits": self.snapshot_cache_hits,
+            "snapshot_age_ms": round(snapshot.age * 1000) if snapshot else None,
+            **self.poll_scheduler.get_stats(),
+            **self.subscription.get_stats(),
+            "push_to_signal_ms": round(self.push_to_signal_ms, 2),
+        }
     
     def check_shogun_process(self) -> bool:
         """
-        Проверяет, запущен ли процесс Shogun Live и изменился ли его PID
+        Проверяет, запущен ли процесс Shogun Live и не был ли он перезапущен
         
         Returns:
             bool: True если процесс Shogun Live запущен, иначе False
         """
-        try:
-            for proc in psutil.process_iter(['pid', 'name']):
-                proc_name = proc.info['name']
-                if proc_name and ('ShogunLive' in proc_name or 'Shogun Live' in proc_name):
-                    pid = proc.info['pid']
-                    # Если PID изменился, считаем что Shogun перезапущен
-                    if self.shogun_pid and self.shogun_pid != pid:
-                        self.logger.info(f"Обнаружен перезапуск Shogun Live (PID: {self.shogun_pid} -> {pid})")
-                        self.shogun_pid = pid
-                        self.connected = False  # Сбрасываем подключение
-                        return True
-                    self.shogun_pid = pid
-                    return True
-            return False
-        except Exception as e:
-            self.logger.debug(f"Ошибка проверки процесса Shogun: {e}")
-            return False
+        status = self.backend.check_process()
+        present = status != PROCESS_ABSENT
+        if status == PROCESS_RESTARTED or (present and self._shogun_present is False):
+            # Соединение с прежним процессом недействительно; новое подключаем без ожидания
+            self.logger.info("Shogun Live обнаружен. Выполняем подключение...")
+            self.connected = False
+            self.reconnect.prewarm()
+        elif not present and self._shogun_present is not False:
+            self.reconnect.on_absent()
+        self._shogun_present = present
+        self.shogun_pid = self.backend.pid
+        return present
     
     async def connect_shogun(self) -> bool:
         """
@@ -170,9 +411,7 @@ class ShogunWorker(QThread):
         """
         try:
             self.logger.info("Подключение к Shogun Live...")
-            # Добавляем таймаут для операции подключения
-            self.shogun_client = Client('localhost')
-            self.capture = CaptureServices(self.shogun_client)
+            self.shogun_client, self.capture = await self.api.call("connect", self._open_connection)
             
             # Проверяем, что соединение действительно работает
             if not await self._test_connection():
@@ -181,19 +420,30 @@ class ShogunWorker(QThread):
             
             # Получаем текущее имя захвата при подключении
             try:
-                result, capture_name = self.capture.capture_name()
+                result, capture_name = await self.api.call("capture_name", self.capture.capture_name)
                 if result:
                     self._current_capture_name = capture_name
                     self.logger.info(f"Текущее имя захвата: '{capture_name}'")
             except Exception as e:
                 self.logger.debug(f"Не удалось получить имя захвата при подключении: {e}")
                 
+            await self.api.call("subscribe", self.subscription.attach, self.capture)
+            self.poll_scheduler.push_active = self.subscription.active
             self.logger.info("Подключено к Shogun Live")
             return True
         except Exception as e:
             self.logger.error(f"Ошибка подключения к Shogun Live: {e}")
             return False
     
+    def _open_connection(self) -> Tuple[Any, Any]:
+        """
+        Создает клиент и CaptureServices (блокирующий вызов)
+        
+        Returns:
+            Tuple[Any, Any]: Клиент Shogun Live (None для имитации) и CaptureServices
+        """
+        return self.backend.connect(LOCAL_ADDRESS)
+    
     async def _test_connection(self) -> bool:
         """
         Проверяет, что соединение с Shogun Live работает
@@ -203,7 +453,7 @@ class ShogunWorker(QThread):
         """
         try:
             # Выполняем простой запрос для проверки соединения
-            _ = str(self.capture.latest_capture_state())
+            _ = str(await self.api.call("latest_capture_state", self.capture.latest_capture_state))
             return True
         except Exception as e:
             self.logger.debug(f"Тест соединения не пройден: {e}")
@@ -216,61 +466,74 @@ class ShogunWorker(QThread):
         Returns:
             bool: True если соединение активно, иначе False
         """
-        if not self.shogun_client or not self.capture:
-            return await self.connect_shogun()
-        
-        try:
-            # Простая проверка - пытаемся выполнить запрос к API
-            status = str(self.capture.latest_capture_state())
-            return True
-        except Exception as e:
-            self.logger.debug(f"Ошибка проверки соединения: {e}")
-            return await self.reconnect_shogun()
+        if self.connected and self.capture:
+            try:
+                # Простая проверка - пытаемся выполнить запрос к API
+                status = str(await self.api.call("latest_capture_state", self.capture.latest_capture_state))
+                return True
+            except ShogunCallTimeout:
+                # Shogun Live завис: переподключение только добавило бы ожидания
+                raise
+            except Exception as e:
+                self.logger.debug(f"Ошибка проверки соединения: {e}")
+                self._connection_lost()
+        return await self.reconnect_shogun()
     
-    async def reconnect_shogun(self) -> bool:
+    async def reconnect_shogun(self, force: bool = False) -> bool:
         """
-        Переподключение к Shogun Live с экспоненциальной отсрочкой
+        Одна попытка переподключения к Shogun Live
+        
+        Паузы между попытками назначает автомат переподключения, поэтому команда
+        не ждет сама: пока цепь разомкнута, она отклоняется сразу.
+        
+        Args:
+            force: Выполнить попытку и при разомкнутой цепи (ручное переподключение)
         
         Returns:
             bool: True если переподключение успешно, иначе False
         """
+        if not force and self.reconnect.fast_fail():
+            self.logger.warning("Shogun Live недоступен: команда отклонена без попытки подключения")
+            return False
+        
         self.logger.info("Попытка переподключения к Shogun Live...")
+        self._close_client()
+        return await self._probe_connection()
+    
+    async def _probe_connection(self) -> bool:
+        """
+        Проба подключения с учетом результата в автомате переподключения
         
-        # Закрываем существующее соединение если оно есть
+        Returns:
+            bool: True если подключение успешно, иначе False
+        """
+        self.reconnect.begin_probe()
+        if await self.connect_shogun():
+            self.connected = True
+            self.reconnect.on_success()
+            return True
+        self.connected = False
+        self.reconnect.on_failure()
+        return False
+    
+    def _connection_lost(self) -> None:
+        """Отмечает потерю работавшего соединения"""
+        self.connected = False
+        self.reconnect.on_lost()
+    
+    def _close_client(self) -> None:
+        """Закрывает соединение с Shogun Live, если оно есть"""
         if self.shogun_client:
-            try:
-                # Закрытие клиентского соединения если есть такой метод
-                if hasattr(self.shogun_client, 'disconnect'):
-                    self.shogun_client.disconnect()
-                elif hasattr(self.shogun_client, 'close'):
-                    self.shogun_client.close()
-            except Exception as e:
-                self.logger.debug(f"Ошибка при закрытии соединения: {e}")
-        
-        # Пытаемся переподключиться с экспоненциальной отсрочкой
-        attempt = 0
-        max_attempts = config.MAX_RECONNECT_ATTEMPTS
-        base_delay = config.BASE_RECONNECT_DELAY
-        
-        while attempt < max_attempts and self.running:  # Проверяем self.running для возможности прервать
-            result = await self.connect_shogun()
-            if result:
-                self.recording_signal.emit(await self.check_shogun())
-                return True
-            
-            attempt += 1
-            # Экспоненциальная отсрочка с максимальным значением
-            delay = min(base_delay * (1.5 ** (attempt - 1)), config.MAX_RECONNECT_DELAY)
-            self.logger.debug(f"Попытка {attempt} не удалась. Следующая через {delay:.1f} секунд...")
-            
-            # Разбиваем ожидание на короткие интервалы для возможности прерывания
-            for _ in range(int(delay * 10)):
-                if not self.running:
-                    return False
-                await asyncio.sleep(0.1)
+            self.backend.disconnect(self.shogun_client)
+    
+    def accepts_commands(self) -> bool:
+        """
+        Проверяет, стоит ли ставить команду в очередь
         
-        self.logger.error(f"Не удалось переподключиться к Shogun Live после {max_attempts} попыток")
-        return False
+        Returns:
+            bool: False если цепь разомкнута (отказ учитывается в статистике)
+        """
+        return self.connected or not self.reconnect.fast_fail()
     
     async def check_shogun(self) -> bool:
         """
@@ -283,54 +546,206 @@ class ShogunWorker(QThread):
             if not self.capture:
                 return False
                 
-            status = str(self.capture.latest_capture_state())
+            status = str(await self.api.call("latest_capture_state", self.capture.latest_capture_state))
             is_recording = 'Started' in status
             return is_recording
+        except ShogunCallTimeout:
+            raise
         except Exception as e:
             self.logger.debug(f"Ошибка проверки состояния Shogun Live: {e}")
             return False
     
-    async def startcapture(self) -> Optional[Union[str, Tuple]]:
+    async def _wait_for_fire_time(self, fire_at: Optional[float], action: str) -> None:
+        """
+        Ожидает запланированный момент выполнения команды и учитывает отклонение
+        
+        Args:
+            fire_at: Момент выполнения в секундах эпохи или None для немедленного выполнения
+            action: Описание действия для журнала
+        """
+        if fire_at is None:
+            return
+        drift = await wait_until(fire_at)
+        mark_stage(STAGE_FIRE_WAIT)
+        self.fire_drift_stats.add(drift)
+        self.logger.info(f"{action} по временной метке: отклонение {drift * 1000:+.3f} мс")
+    
+    def _fast_path_allowed(self) -> bool:
+        """Подтверждено ли соединение успешным вызовом API не раньше допустимой давности"""
+        max_age_ms = config.SHOGUN_FAST_PATH_MAX_AGE_MS
+        return (max_age_ms > 0 and self.connected and self.capture is not None
+                and self.api.success_age_ms() <= max_age_ms)
+    
+    async def _record_precheck(self, target: bool, known_state: Optional[bool] = None) -> Tuple[str, Optional[bool]]:
+        """
+        Выбирает путь команды записи и определяет состояние записи перед ней
+        
+        Args:
+            target: Состояние записи после команды (True - запуск, False - остановка)
+            known_state: Состояние записи, уже проверенное пакетом команд (None - не проверено)
+        
+        Returns:
+            Tuple[str, Optional[bool]]: Путь и идет ли запись (None - нет соединения)
+        """
+        snapshot = self.cached_snapshot()
+        self._invalidate_snapshot()
+        if known_state is not None:
+            # Соединение и состояние проверены пакетом команд (см. run_batch)
+            return PATH_FAST, known_state
+        if snapshot is not None and snapshot.recording != target:
+            # Свежий снимок подтверждает соединение и исходное состояние
+            self.snapshot_cache_hits += 1
+            return PATH_FAST, snapshot.recording
+        if snapshot is None and self._fast_path_allowed():
+            # Соединение подтверждено недавно: состояние проверяется после команды
+            return PATH_FAST, not target
+        return PATH_SLOW, await self._query_recording_state()
+    
+    async def _query_recording_state(self) -> Optional[bool]:
+        """
+        Проверяет соединение и состояние записи одним запросом, переподключаясь при необходимости
+        
+        Returns:
+            Optional[bool]: Идет ли запись или None, если соединения нет
+        """
+        if self.connected and self.capture:
+            try:
+                status = str(await self.api.call("latest_capture_state", self.capture.latest_capture_state))
+                return 'Started' in status
+            except ShogunCallTimeout:
+                # Shogun Live завис: переподключение только добавило бы ожидания
+                raise
+            except Exception as e:
+                self.logger.debug(f"Ошибка проверки соединения: {e}")
+                self._connection_lost()
+        if not await self.reconnect_shogun():
+            return None
+        return await self.check_shogun()
+    
+    def _schedule_verification(self, expected: bool, command: str) -> None:
+        """Ставит проверку состояния записи после команды, выполненной быстрым путем"""
+        self.command_executor.submit("verify", self._verify_record_state, expected, command, internal=True)
+    
+    async def _verify_record_state(self, expected: bool, command: str) -> None:
+        """
+        Проверяет, что запись перешла в ожидаемое состояние
+        
+        Args:
+            expected: Ожидаемое состояние записи
+            command: Название команды для журнала
+        """
+        if not self.capture:
+            return
+        try:
+            status = str(await self.api.call("latest_capture_state", self.capture.latest_capture_state))
+        except Exception as e:
+            self.logger.warning(f"Не удалось проверить состояние записи после '{command}': {e}")
+            return
+        recording = 'Started' in status
+        self.record_paths.add_verification(recording == expected)
+        if recording != expected:
+            state = "идет" if recording else "не идет"
+            self.logger.warning(f"После '{command}' запись в Shogun Live {state}: состояние уточняется опросом")
+            # Сигналы о фактическом состоянии отправит ближайший такт мониторинга
+            self.poll_scheduler.note_transition()
+    
+    async def startcapture(self, fire_at: Optional[float] = None,
+                           known_state: Optional[bool] = None) -> Optional[Union[str, Tuple]]:
         """
         Запуск записи
         
+        Если соединение подтверждено недавно, запуск выполняется сразу, а состояние
+        проверяется после него; иначе соединение и состояние проверяются заранее.
+        Сам запуск выполняется точно в момент fire_at, если он задан.
+        
+        Args:
+            fire_at: Момент запуска в секундах эпохи (временная метка OSC-бандла)
+            known_state: Состояние записи, проверенное пакетом команд (см. run_batch)
+        
         Returns:
             Optional[Union[str, Tuple]]: Имя записи если успешно, иначе None
         """
+        started = time.perf_counter()
+        calls_before = self.api.calls_total
+        path, capture_name = await self._startcapture(fire_at, known_state)
+        self.record_paths.add(path, (time.perf_counter() - started) * 1000,
+                              self.api.calls_total - calls_before, capture_name is not None)
+        return capture_name
+    
+    async def _start_capture_call(self) -> None:
+        """Запускает запись на основной и дополнительных машинах"""
+        await self.api.call("start_capture", self.host_pool.fan_out, "start_recording",
+                            lambda capture: capture.start_capture(), self.capture.start_capture)
+    
+    async def _startcapture(self, fire_at: Optional[float],
+                            known_state: Optional[bool]) -> Tuple[str, Optional[Union[str, Tuple]]]:
+        """
+        Запуск записи (см. startcapture)
+        
+        Returns:
+            Tuple: Путь, которым выполнена команда, и имя записи или None
+        """
+        path = PATH_SLOW
         try:
-            # Проверяем соединение перед операцией
-            if not await self.ensure_connection():
+            path, recording = await self._record_precheck(True, known_state)
+            if recording is None:
                 self.logger.error("Не удалось установить соединение с Shogun Live")
-                return None
-            
-            # Проверяем, не идет ли уже запись
-            if await self.check_shogun():
+                return path, None
+            mark_stage(STAGE_CONNECTION_CHECKED)
+            if recording:
                 self.logger.info("Запись уже активна в Shogun Live")
-                capture_name = self.capture.latest_capture_name()
+                capture_name = await self.api.call("latest_capture_name", self.capture.latest_capture_name)
                 self._update_take_name_from_capture(capture_name)
-                return capture_name
-                
-            self.capture.start_capture()
+                return path, capture_name
+            
+            await self._wait_for_fire_time(fire_at, "Запуск записи")
+            try:
+                await self._start_capture_call()
+            except ShogunCallTimeout:
+                raise
+            except Exception as e:
+                if path != PATH_FAST:
+                    raise
+                # Соединение оказалось неработающим: проверяем его и состояние, как на медленном пути
+                self.logger.warning(f"Быстрый запуск записи не удался ({e}), проверяется соединение")
+                self.record_paths.add_fallback()
+                path = PATH_SLOW
+                recording = await self._query_recording_state()
+                if recording is None:
+                    self.logger.error("Не удалось установить соединение с Shogun Live")
+                    return path, None
+                if not recording:
+                    await self._start_capture_call()
+            mark_stage(STAGE_API_CALL)
             self.logger.info("Запись начата в Shogun Live")
             
             # Получаем и возвращаем имя записи
-            capture_name = self.capture.latest_capture_name()
+            capture_name = await self.api.call("latest_capture_name", self.capture.latest_capture_name)
             self._update_take_name_from_capture(capture_name)
-            return capture_name
+            self.host_pool.set_take_name(self.current_take_name)
+            if path == PATH_FAST:
+                self._schedule_verification(True, "start_recording")
+            return path, capture_name
+        except ShogunCallTimeout as e:
+            # Зависший Shogun Live: повтор после переподключения мог бы запустить запись дважды
+            self.logger.error(f"Запуск записи не выполнен: {e}")
+            return path, None
         except Exception as e:
             self.logger.error(f"Ошибка запуска записи: {e}")
             # Пробуем переподключиться и повторить операцию
+            self._connection_lost()
             if await self.reconnect_shogun():
                 try:
-                    self.capture.start_capture()
+                    await self._start_capture_call()
                     self.logger.info("Запись начата в Shogun Live после переподключения")
                     
-                    capture_name = self.capture.latest_capture_name()
+                    capture_name = await self.api.call("latest_capture_name", self.capture.latest_capture_name)
                     self._update_take_name_from_capture(capture_name)
-                    return capture_name
+                    self.host_pool.set_take_name(self.current_take_name)
+                    return path, capture_name
                 except Exception as e2:
                     self.logger.error(f"Не удалось запустить запись после переподключения: {e2}")
-            return None
+            return path, None
     
     def _update_take_name_from_capture(self, capture_name: Any) -> None:
         """
@@ -345,43 +760,92 @@ class ShogunWorker(QThread):
         else:
             name_str = str(capture_name) if capture_name else "Активная запись"
             
+        self.current_take_name = name_str
         self.take_name_signal.emit(name_str)
     
-    async def stopcapture(self) -> bool:
+    async def stopcapture(self, fire_at: Optional[float] = None, known_state: Optional[bool] = None) -> bool:
         """
         Остановка записи
         
+        Как и запуск, выполняется сразу при недавно подтвержденном соединении.
+        
+        Args:
+            fire_at: Момент остановки в секундах эпохи (временная метка OSC-бандла)
+            known_state: Состояние записи, проверенное пакетом команд (см. run_batch)
+        
         Returns:
             bool: True если запись успешно остановлена, иначе False
         """
+        started = time.perf_counter()
+        calls_before = self.api.calls_total
+        path, stopped = await self._stopcapture(fire_at, known_state)
+        self.record_paths.add(path, (time.perf_counter() - started) * 1000,
+                              self.api.calls_total - calls_before, stopped)
+        return stopped
+    
+    async def _stop_capture_call(self) -> None:
+        """Останавливает запись на основной и дополнительных машинах"""
+        await self.api.call("stop_capture", self.host_pool.fan_out, "stop_recording",
+                            lambda capture: capture.stop_capture(0), lambda: self.capture.stop_capture(0))
+    
+    async def _stopcapture(self, fire_at: Optional[float], known_state: Optional[bool]) -> Tuple[str, bool]:
+        """
+        Остановка записи (см. stopcapture)
+        
+        Returns:
+            Tuple[str, bool]: Путь, которым выполнена команда, и успех остановки
+        """
+        path = PATH_SLOW
         try:
-            # Проверяем соединение перед операцией
-            if not await self.ensure_connection():
+            path, recording = await self._record_precheck(False, known_state)
+            if recording is None:
                 self.logger.error("Не удалось установить соединение с Shogun Live")
-                return False
-            
-            # Проверяем, идет ли запись
-            if not await self.check_shogun():
+                return path, False
+            mark_stage(STAGE_CONNECTION_CHECKED)
+            if not recording:
                 self.logger.info("Запись не активна в Shogun Live")
                 self.take_name_signal.emit("Нет активной записи")
-                return True
-                
-            self.capture.stop_capture(0)
+                return path, True
+            
+            await self._wait_for_fire_time(fire_at, "Остановка записи")
+            try:
+                await self._stop_capture_call()
+            except ShogunCallTimeout:
+                raise
+            except Exception as e:
+                if path != PATH_FAST:
+                    raise
+                self.logger.warning(f"Быстрая остановка записи не удалась ({e}), проверяется соединение")
+                self.record_paths.add_fallback()
+                path = PATH_SLOW
+                recording = await self._query_recording_state()
+                if recording is None:
+                    self.logger.error("Не удалось установить соединение с Shogun Live")
+                    return path, False
+                if recording:
+                    await self._stop_capture_call()
+            mark_stage(STAGE_API_CALL)
             self.logger.info("Запись остановлена в Shogun Live")
             self.take_name_signal.emit("Нет активной записи")
-            return True
+            if path == PATH_FAST:
+                self._schedule_verification(False, "stop_recording")
+            return path, True
+        except ShogunCallTimeout as e:
+            self.logger.error(f"Остановка записи не выполнена: {e}")
+            return path, False
         except Exception as e:
             self.logger.error(f"Ошибка остановки записи: {e}")
             # Пробуем переподключиться и повторить операцию
+            self._connection_lost()
             if await self.reconnect_shogun():
                 try:
-                    self.capture.stop_capture(0)
+                    await self._stop_capture_call()
                     self.logger.info("Запись остановлена в Shogun Live после переподключения")
                     self.take_name_signal.emit("Нет активной записи")
-                    return True
+                    return path, True
                 except Exception as e2:
                     self.logger.error(f"Не удалось остановить запись после переподключения: {e2}")
-            return False
+            return path, False
     
     async def set_capture_name(self, name: str) -> bool:
         """
@@ -398,7 +862,11 @@ class ShogunWorker(QThread):
                 self.logger.error("Нет соединения с Shogun Live")
                 return False
                 
-            result = self.capture.set_capture_name(name)
+            self._invalidate_snapshot()
+            result = await self.api.call("set_capture_name", self.host_pool.fan_out, "set_capture_name",
+                                         lambda capture: capture.set_capture_name(name),
+                                         lambda: self.capture.set_capture_name(name))
+            mark_stage(STAGE_API_CALL)
             if result:
                 self.logger.info(f"Имя захвата установлено: '{name}'")
                 self._current_capture_name = name
@@ -410,15 +878,67 @@ class ShogunWorker(QThread):
             self.logger.error(f"Ошибка при установке имени захвата: {e}")
             return False
     
+    async def run_batch(self, steps: Tuple[Tuple[str, Tuple[Any, ...]], ...],
+                        fire_at: Optional[float] = None) -> bool:
+        """
+        Выполняет несколько команд одной операцией исполнителя
+        
+        Соединение и состояние записи проверяются один раз на весь пакет, команды
+        выполняются строго по порядку, и другие команды не могут выполниться между
+        ними. Имя захвата устанавливается сразу, запуск и остановка записи - в момент
+        fire_at. Если запись уже идет, имя захвата перед запуском не устанавливается
+        (иначе был бы переименован текущий тейк), а запуск возвращает текущий тейк.
+        Первая неудачная команда прерывает пакет.
+        
+        Args:
+            steps: Команды пакета: (название команды из OSC_COMMAND_*, аргументы)
+            fire_at: Момент запуска/остановки в секундах эпохи (временная метка OSC-бандла)
+        
+        Returns:
+            bool: True если все команды пакета выполнены успешно
+        """
+        snapshot = self.cached_snapshot()
+        if snapshot is not None:
+            self.snapshot_cache_hits += 1
+            recording = snapshot.recording
+        else:
+            try:
+                recording = await self._query_recording_state()
+            except ShogunCallTimeout as e:
+                self.logger.error(f"Пакет команд не выполнен: {e}")
+                return False
+            if recording is None:
+                self.logger.error("Не удалось установить соединение с Shogun Live")
+                return False
+        
+        for index, (command, args) in enumerate(steps):
+            if command == config.OSC_COMMAND_SET_CAPTURE_NAME:
+                if recording and any(step[0] == config.OSC_COMMAND_START_RECORDING for step in steps[index + 1:]):
+                    self.logger.warning(f"Запись уже активна: имя захвата '{args[0]}' не установлено, "
+                                        f"чтобы не переименовать текущий тейк")
+                    continue
+                success = await self.set_capture_name(*args)
+            elif command == config.OSC_COMMAND_START_RECORDING:
+                success = await self.startcapture(fire_at, known_state=recording) is not None
+                recording = recording or success
+            elif command == config.OSC_COMMAND_STOP_RECORDING:
+                success = await self.stopcapture(fire_at, known_state=recording)
+                recording = recording and not success
+            else:
+                self.logger.error(f"Команда '{command}' не поддерживается в пакете команд")
+                success = False
+            if not success:
+                self.logger.error(f"Пакет команд прерван на команде '{command}'")
+                return False
+        return True
+    
     def stop(self):
         """Остановка рабочего потока"""
         self.running = False
+        self.poll_scheduler.wake()
+        self.subscription.detach()
+        self.command_executor.stop()
+        self.host_pool.close()
+        self.api.close()
         # Закрываем соединение при остановке
-        if self.shogun_client:
-            try:
-                if hasattr(self.shogun_client, 'disconnect'):
-                    self.shogun_client.disconnect()
-                elif hasattr(self.shogun_client, 'close'):
-                    self.shogun_client.close()
-            except Exception as e:
-                self.logger.debug(f"Ошибка при закрытии соединения: {e}")
\ No newline at end of file
+        self._close_client()
\ No newline at end of file
@@ -0,0 +1,41 @@
+"""
+Снимок состояния Shogun Live, получаемый один раз за такт мониторинга.
+Сигналы интерфейсу отправляются только для полей, изменившихся по сравнению
+с предыдущим снимком; команды могут использовать свежий снимок вместо
+собственных запросов к API.
+"""
+
+import time
+from typing import NamedTuple, Optional, Tuple
+
+# Поля, изменения которых сравниваются между снимками
+SNAPSHOT_FIELDS = ("connected", "recording", "take_name", "capture_name")
+
+class ShogunStateSnapshot(NamedTuple):
+    """Состояние Shogun Live на момент опроса"""
+    taken_at: float     # Время опроса (time.monotonic)
+    connected: bool
+    recording: bool
+    take_name: str      # Имя последнего тейка для отображения
+    capture_name: str   # Имя следующего захвата
+
+    @property
+    def age(self) -> float:
+        """Возраст снимка, с"""
+        return time.monotonic() - self.taken_at
+
+def diff_snapshots(previous: Optional[ShogunStateSnapshot],
+                   current: ShogunStateSnapshot) -> Tuple[str, ...]:
+    """
+    Находит изменившиеся поля
+
+    Args:
+        previous: Предыдущий снимок или None
+        current: Новый снимок
+
+    Returns:
+        Tuple[str, ...]: Имена изменившихся полей (все поля, если предыдущего снимка нет)
+    """
+    if previous is None:
+        return SNAPSHOT_FIELDS
+    return tuple(field for field in SNAPSHOT_FIELDS if getattr(previous, field) != getattr(current, field))
@@ -0,0 +1,105 @@
+"""
+Подписка на уведомления Shogun Live об изменении состояния.
+Если API предоставляет подписку на изменение состояния записи, имени тейка
+и имени захвата, уведомление сразу запускает внеочередной такт мониторинга,
+и изменение проходит тот же путь снимков и сигналов, что и при опросе.
+Для тем без подписки изменения обнаруживаются опросом.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+# Темы уведомлений: состояние записи, имя последнего тейка, имя следующего захвата
+SUBSCRIPTION_TOPICS = ("latest_capture_state", "latest_capture_name", "capture_name")
+
+class ShogunSubscription:
+    """Регистрация обработчиков уведомлений в CaptureServices"""
+
+    def __init__(self, on_change: Callable[[str], None]):
+        """
+        Args:
+            on_change: Вызывается с названием темы при каждом уведомлении
+                       (из потока доставки уведомлений API)
+        """
+        self.logger = logging.getLogger('ShogunOSC')
+        self.on_change = on_change
+        self._capture: Any = None
+        self._callback_ids: List[Any] = []
+        self.topics: List[str] = []  # Темы, на которые удалось подписаться
+        self._lock = threading.Lock()
+        self.events = 0
+        self.events_by_topic: Dict[str, int] = {}
+        self.last_event_at: Optional[float] = None
+
+    @property
+    def active(self) -> bool:
+        """Подписка действует на все темы, опрос нужен только для подстраховки"""
+        return len(self.topics) == len(SUBSCRIPTION_TOPICS)
+
+    def attach(self, capture: Any) -> bool:
+        """
+        Подписывается на уведомления нового подключения
+
+        Args:
+            capture: Объект CaptureServices
+
+        Returns:
+            bool: True если подписка действует на все темы
+        """
+        self.detach()
+        self._capture = capture
+        for topic in SUBSCRIPTION_TOPICS:
+            register = getattr(capture, f"add_{topic}_changed_callback", None)
+            if register is None:
+                continue
+            try:
+                self._callback_ids.append(register(lambda *args, topic=topic: self._handle(topic)))
+                self.topics.append(topic)
+            except Exception as e:
+                self.logger.debug(f"Не удалось подписаться на '{topic}': {e}")
+        if self.active:
+            self.logger.info("Подписка на уведомления Shogun Live активна")
+        elif self.topics:
+            self.logger.info(f"Подписка на уведомления Shogun Live частичная: {', '.join(self.topics)}; "
+                             f"остальные изменения отслеживаются опросом")
+        else:
+            self.logger.info("Shogun Live не поддерживает подписку на уведомления, используется опрос")
+        return self.active
+
+    def detach(self) -> None:
+        """Отменяет подписку прежнего подключения"""
+        remove = getattr(self._capture, "remove_callback", None)
+        if remove is not None:
+            for callback_id in self._callback_ids:
+                try:
+                    remove(callback_id)
+                except Exception as e:
+                    self.logger.debug(f"Ошибка отмены подписки: {e}")
+        self._capture = None
+        self._callback_ids = []
+        self.topics = []
+
+    def _handle(self, topic: str) -> None:
+        """Учитывает уведомление и передает его обработчику"""
+        with self._lock:
+            self.events += 1
+            self.events_by_topic[topic] = self.events_by_topic.get(topic, 0) + 1
+            self.last_event_at = time.monotonic()
+        self.on_change(topic)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Возвращает состояние подписки и счетчики уведомлений
+
+        Returns:
+            Dict[str, Any]: Режим получения изменений, темы и число уведомлений
+        """
+        with self._lock:
+            return {
+                "state_source": "push" if self.active else ("push+poll" if self.topics else "poll"),
+                "push_topics": list(self.topics),
+                "push_events": self.events,
+                "push_events_by_topic": dict(self.events_by_topic),
+            }